@@ -0,0 +1,162 @@
+"""
+.. module:: adapter_chain
+   :synopsis: Module with single pass solvers for the joltage adapter chain
+   (day 10). Both solvers consume sorted adapter joltages as a stream: the
+   difference histogram is a Counter and the arrangement count is a dynamic
+   program over a sliding window of the last three joltages. An accumulator
+   keeps both up to date as adapters arrive one at a time.
+"""
+
+import bisect
+from collections import Counter, deque
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+MAX_JOLTAGE_DIFF = 3
+
+
+def joltage_diff_histogram(sorted_adapters):
+    """Histogram of joltage differences along the full chain (outlet at 0,
+adapters, device at max + 3) in a single pass
+
+    Args:
+        sorted_adapters (iterable): Adapter joltages in ascending order
+
+    Returns:
+        Counter: difference -> count
+    """
+
+    histogram = Counter()
+    prev_joltage = 0
+    for joltage in sorted_adapters:
+        histogram[joltage - prev_joltage] += 1
+        prev_joltage = joltage
+    histogram[MAX_JOLTAGE_DIFF] += 1  # Device adapter
+    return histogram
+
+
+def joltage_diff_histogram_numpy(adapters):
+    """NumPy variant of joltage_diff_histogram using sort, diff and bincount
+
+    Args:
+        adapters (array like): Adapter joltages (any order)
+
+    Returns:
+        Counter: difference -> count
+    """
+
+    if np is None:
+        raise ImportError('joltage_diff_histogram_numpy requires NumPy')
+    joltages = np.sort(np.asarray(adapters, dtype=np.int64))
+    diffs = np.diff(joltages, prepend=0)
+    histogram = Counter({diff: int(count) for diff, count in enumerate(np.bincount(diffs)) if count})
+    histogram[MAX_JOLTAGE_DIFF] += 1  # Device adapter
+    return histogram
+
+
+def count_arrangements(sorted_adapters):
+    """Count the distinct adapter arrangements connecting the outlet to the
+device. ways(j) is the sum of ways of the joltages within 3 below j, so only a
+window of the last three joltages is kept (python ints never overflow).
+
+    Args:
+        sorted_adapters (iterable): Adapter joltages in ascending order
+
+    Returns:
+        int: Number of arrangements
+    """
+
+    window = deque([(0, 1)])  # (joltage, ways) of the outlet
+    for joltage in sorted_adapters:
+        while window and joltage - window[0][0] > MAX_JOLTAGE_DIFF:
+            window.popleft()
+        if not window:
+            return 0  # Gap in the chain
+        window.append((joltage, sum(ways for _, ways in window)))
+    return window[-1][1]
+
+
+class AdapterAccumulator:
+    """Online joltage statistics over a stream of adapters arriving in any
+order. Joltages are kept in a sorted list (binary search insert) and the
+difference histogram is updated from the two neighbours of each new adapter.
+Arrangement counts extend the sliding window while adapters arrive in
+ascending order, and are recomputed lazily after an insert in the middle.
+
+    Args:
+        adapters (iterable, optional): Initial adapter joltages
+    """
+
+    def __init__(self, adapters=()):
+        self.joltages = []
+        self.histogram = Counter({MAX_JOLTAGE_DIFF: 1})  # Device adapter
+        self._window = deque([(0, 1)])  # Arrangement window, None when stale
+        self.extend(adapters)
+
+    def __len__(self):
+        return len(self.joltages)
+
+    def add(self, joltage: int):
+        """Ingest one adapter
+
+        Args:
+            joltage (int): Adapter joltage
+        """
+
+        joltages = self.joltages
+        index = bisect.bisect_right(joltages, joltage)
+        lower = joltages[index - 1] if index else 0
+        if index < len(joltages):
+            # New adapter splits the gap between its neighbours
+            upper = joltages[index]
+            self._count_diff(upper - lower, -1)
+            self._count_diff(upper - joltage, 1)
+            self._window = None
+        elif self._window is not None:
+            self._extend_window(joltage)
+        self._count_diff(joltage - lower, 1)
+        joltages.insert(index, joltage)
+
+    def extend(self, adapters):
+        """Ingest a batch of adapters
+
+        Args:
+            adapters (iterable): Adapter joltages
+        """
+
+        for joltage in adapters:
+            self.add(joltage)
+
+    def diff_product(self):
+        """Product of the 1 and 3 joltage difference counts (question_10)"""
+
+        return self.histogram[1]*self.histogram[MAX_JOLTAGE_DIFF]
+
+    def arrangements(self):
+        """Number of adapter arrangements, see count_arrangements"""
+
+        if self._window is None:
+            self._window = deque([(0, 1)])
+            for joltage in self.joltages:
+                self._extend_window(joltage)
+        return self._window[-1][1] if self._window else 0
+
+    def _count_diff(self, diff: int, change: int):
+        """Update the histogram count of a difference"""
+
+        self.histogram[diff] += change
+        if not self.histogram[diff]:
+            del self.histogram[diff]
+
+    def _extend_window(self, joltage: int):
+        """Append the largest adapter to the arrangement window"""
+
+        window = self._window
+        while window and joltage - window[0][0] > MAX_JOLTAGE_DIFF:
+            window.popleft()
+        # An empty window (gap in the chain) stays empty, no arrangements
+        if window:
+            window.append((joltage, sum(ways for _, ways in window)))
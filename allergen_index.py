@@ -0,0 +1,128 @@
+"""
+.. module:: allergen_index
+   :synopsis: Module with an inverted index over food items (day 21). The
+   index is built in a single pass and supports counting allergen free
+   ingredients and resolving the allergen -> ingredient assignment with
+   constraint propagation.
+"""
+
+from collections import Counter, deque
+
+
+def parse_food_line(line: str):
+    """Parse a food item line, e.g. 'mxmxvkd kfcds (contains dairy, fish)'
+
+    Args:
+        line (str): Food item line
+
+    Returns:
+        tuple: (list of ingredients, list of allergens)
+    """
+
+    ingredients_part, _, allergens_part = line.partition('(')
+    allergens_part = allergens_part.rstrip().rstrip(')')
+    if allergens_part.startswith('contains'):
+        allergens_part = allergens_part[len('contains'):]
+    allergens = [x.strip() for x in allergens_part.split(',') if x.strip()]
+    return ingredients_part.split(), allergens
+
+
+class AllergenIndex:
+    """Inverted index over food items: allergen -> food indices, ingredient
+frequencies (Counter) and, per allergen, the candidate ingredients present in
+every food listing that allergen. Built with one pass over the food items.
+
+    Args:
+        food_lines (iterable): Food item lines (e.g. streamed from file)
+    """
+
+    def __init__(self, food_lines):
+        self.allergen_foods = {}
+        self.ingredient_freq = Counter()
+        self.candidates = {}
+        self.food_count = 0
+        for line in food_lines:
+            if not line.strip():
+                continue
+            ingredients, allergens = parse_food_line(line)
+            self.ingredient_freq.update(ingredients)
+            ingredient_set = None
+            for allergen in allergens:
+                self.allergen_foods.setdefault(allergen, []).append(self.food_count)
+                if ingredient_set is None:
+                    ingredient_set = set(ingredients)
+                candidates = self.candidates.get(allergen)
+                if candidates is None:
+                    self.candidates[allergen] = set(ingredient_set)
+                else:
+                    candidates &= ingredient_set
+            self.food_count += 1
+
+    def __len__(self):
+        return self.food_count
+
+    def allergen_free_ingredients(self):
+        """Ingredients that can not contain any of the allergens
+
+        Returns:
+            set: Allergen free ingredients
+        """
+
+        unsafe = set()
+        for candidates in self.candidates.values():
+            unsafe |= candidates
+        return set(self.ingredient_freq) - unsafe
+
+    def allergen_free_count(self):
+        """Number of appearances (repeats included) of allergen free ingredients
+
+        Returns:
+            int: Appearance count
+        """
+
+        return sum(self.ingredient_freq[x] for x in self.allergen_free_ingredients())
+
+    def resolve_allergens(self):
+        """Resolve which ingredient contains each allergen with constraint
+propagation: an allergen with a single candidate is assigned, and that
+ingredient is removed from the candidates of all other allergens.
+
+        Returns:
+            dict: allergen -> ingredient
+        """
+
+        candidates = {k: set(v) for k, v in self.candidates.items()}
+        ingredient_allergens = {}
+        for allergen, ingredients in candidates.items():
+            for ingredient in ingredients:
+                ingredient_allergens.setdefault(ingredient, set()).add(allergen)
+
+        assignment = {}
+        queue = deque(k for k, v in candidates.items() if len(v) == 1)
+        while queue:
+            allergen = queue.popleft()
+            if allergen in assignment:
+                continue
+            if not candidates[allergen]:
+                raise ValueError('No ingredient left for allergen: ' + allergen)
+            ingredient = next(iter(candidates[allergen]))
+            assignment[allergen] = ingredient
+            for other in ingredient_allergens.pop(ingredient, ()):
+                if other != allergen and other not in assignment:
+                    candidates[other].discard(ingredient)
+                    if len(candidates[other]) <= 1:
+                        queue.append(other)
+
+        if len(assignment) != len(candidates):
+            raise ValueError('Allergen assignment is ambiguous')
+        return assignment
+
+    def canonical_dangerous_list(self):
+        """Dangerous ingredients sorted alphabetically by their allergen
+
+        Returns:
+            str: Comma separated ingredient list
+        """
+
+        assignment = self.resolve_allergens()
+        return ','.join(assignment[allergen] for allergen in sorted(assignment))
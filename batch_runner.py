@@ -0,0 +1,354 @@
+"""
+.. module:: batch_runner
+   :synopsis: Batch driver running question_X solvers over many input files.
+   Tasks come from a directory (files are matched to questions by the name of
+   their default data file, e.g. passport_data_0412.txt runs question_4 and
+   question_4_bonus) or from a JSONL manifest, and are fanned out over a
+   process pool. Results stream to JSONL as tasks complete, and a failing
+   input only fails its own task. Usage examples:
+
+       python -m challenge_solutions batch ./nightly --workers 8 --output results.jsonl
+       python -m challenge_solutions batch manifest.jsonl
+
+   Manifest lines look like {"question": "4b", "input": "passports.txt"} with
+   an optional "args" list; relative inputs are resolved against the manifest
+   directory. A worker process that dies (e.g. killed by the OOM killer)
+   breaks the pool for every queued task, so the pool is rebuilt and the
+   unfinished tasks are run again. Workers record which tasks they are
+   running, and only those (at most one per worker) are run again in pools
+   of their own, concurrently, so a task that keeps killing its worker only
+   fails itself. With a
+   subexpression cache size, every worker memoizes the expression groups of
+   its question_18 tasks, and the cache hits and misses are reported.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import challenge_solutions
+import expression_eval
+import parse_cache
+from expression_eval import configure_subexpression_cache
+from parse_cache import configure_parse_cache
+from solver_cli import DEFAULT_INPUTS, resolve_solver, run_solver
+
+BatchTask = namedtuple('BatchTask', ['question', 'input_file', 'args'])
+
+_task_states = None  # Task states of a batch pool worker, see _init_pool_worker
+TASK_RUNNING = 1
+TASK_DONE = 2
+
+
+def input_prefixes():
+    """Map of default data file stems to question numbers (e.g.
+'passport_data' -> '4'), for solvers that read an input file"""
+
+    return {os.path.splitext(os.path.basename(input_file))[0]: number
+            for number, (input_file, _) in DEFAULT_INPUTS.items() if input_file is not None}
+
+
+def question_solvers(number: str):
+    """Names of the solvers of a question number (question_X and, if it
+exists, question_X_bonus)"""
+
+    names = ['question_' + number, 'question_%s_bonus' % number]
+    return [name for name in names if hasattr(challenge_solutions, name)]
+
+
+def directory_tasks(input_dir: str):
+    """Tasks for all input files of a directory
+
+    Args:
+        input_dir (str): Directory of input files
+
+    Returns:
+        tuple: (tasks, unmatched file names). Every file is matched to the
+            question whose default data file stem is the longest prefix of
+            its name, and gets one task per solver of the question.
+    """
+
+    prefixes = sorted(input_prefixes().items(), key=lambda x: -len(x[0]))
+    tasks = []
+    unmatched = []
+    for file_name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, file_name)
+        if file_name.startswith('.') or not os.path.isfile(path):
+            continue
+        number = next((number for prefix, number in prefixes if file_name.startswith(prefix)), None)
+        if number is None:
+            unmatched.append(path)
+            continue
+        tasks.extend(BatchTask(name, path, None) for name in question_solvers(number))
+    return tasks, unmatched
+
+
+def manifest_tasks(manifest_file: str):
+    """Tasks of a JSONL manifest, one {"question", "input", "args"} object per line
+
+    Args:
+        manifest_file (str): Manifest file
+
+    Returns:
+        tuple: (tasks, malformed lines as 'file:line' strings)
+    """
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_file))
+    tasks = []
+    malformed = []
+    with open(manifest_file) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                question = resolve_solver(str(entry['question']))[0]
+                input_file = entry.get('input')
+                args = entry.get('args')
+            except (ValueError, KeyError, TypeError, AttributeError):
+                malformed.append('%s:%d' % (manifest_file, line_number))
+                continue
+            if input_file is not None:
+                input_file = os.path.join(base_dir, input_file)
+            tasks.append(BatchTask(question, input_file, None if args is None else tuple(args)))
+    return tasks, malformed
+
+
+def collect_tasks(source: str):
+    """Tasks of a directory or of a manifest file, see directory_tasks and
+manifest_tasks"""
+
+    if os.path.isdir(source):
+        return directory_tasks(source)
+    return manifest_tasks(source)
+
+
+def init_worker(cache_dir: str = None, subexpression_cache: int = None):
+    """Set up the caches of a batch process (pool initializer)
+
+    Args:
+        cache_dir (str, optional): On-disk parse cache. Defaults to None.
+        subexpression_cache (int, optional): Size of the subexpression cache
+            of question_18 tasks, None disables it. Defaults to None.
+    """
+
+    configure_parse_cache(16, cache_dir)
+    configure_subexpression_cache(subexpression_cache)
+
+
+def run_task(task: BatchTask):
+    """Run one batch task (process pool task), never raising
+
+    Args:
+        task (BatchTask): Task to run
+
+    Returns:
+        dict: JSON ready record with question, input, status ('ok' or
+            'error'), result, error, wall_time and worker pid, plus the
+            subexpression_cache hits and misses of tasks that used the cache
+    """
+
+    record = {'question': task.question, 'input': task.input_file, 'status': 'ok',
+              'result': None, 'error': None, 'wall_time': None, 'pid': os.getpid()}
+    cache = expression_eval.SUBEXPRESSION_CACHE
+    lookups = None if cache is None else (cache.hits, cache.misses)
+    start = time.perf_counter()
+    try:
+        report = run_solver(task.question, task.input_file, task.args)
+        record['result'] = report['result']
+        record['wall_time'] = report['wall_time']
+    except Exception as error:  # Isolate failures to their own task
+        record['status'] = 'error'
+        record['error'] = '%s: %s' % (type(error).__name__, error)
+        record['wall_time'] = time.perf_counter() - start
+    if cache is not None and (cache.hits, cache.misses) != lookups:
+        record['subexpression_cache'] = {'hits': cache.hits - lookups[0],
+                                         'misses': cache.misses - lookups[1]}
+    return record
+
+
+def error_record(task: BatchTask, error: Exception):
+    """Record of a task that failed outside of run_task (e.g. its worker died)"""
+
+    return {'question': task.question, 'input': task.input_file, 'status': 'error',
+            'result': None, 'error': '%s: %s' % (type(error).__name__, error),
+            'wall_time': None, 'pid': None}
+
+
+def _init_pool_worker(task_states, cache_dir: str = None, subexpression_cache: int = None):
+    """Pool initializer of run_batch: caches (see init_worker) and the shared
+array of task states workers update"""
+
+    global _task_states
+    _task_states = task_states
+    init_worker(cache_dir, subexpression_cache)
+
+
+def _run_pool_task(index: int, task: BatchTask):
+    """run_task in a pool worker, recording when the task runs and is done"""
+
+    _task_states[index] = TASK_RUNNING
+    record = run_task(task)
+    _task_states[index] = TASK_DONE
+    return record
+
+
+def _run_pools(tasks: list, groups: list, workers: int, initargs: tuple):
+    """Generator running groups of tasks concurrently, each group on a new
+process pool of up to workers processes, and yielding their records
+
+    Returns:
+        list: Indices of the tasks left unfinished because a worker died
+    """
+
+    executors = [ProcessPoolExecutor(max_workers=min(workers, len(group)),
+                                     initializer=_init_pool_worker, initargs=initargs)
+                 for group in groups]
+    unfinished = []
+    try:
+        futures = {}
+        for executor, group in zip(executors, groups):
+            for index in group:
+                try:
+                    futures[executor.submit(_run_pool_task, index, tasks[index])] = index
+                except BrokenProcessPool:  # A worker died while tasks were queued
+                    unfinished.append(index)
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                record = future.result()
+            except BrokenProcessPool:
+                unfinished.append(index)
+                continue
+            except Exception as error:
+                record = error_record(tasks[index], error)
+            yield dict(record, task=index)
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+    return sorted(unfinished)
+
+
+def run_batch(tasks: list, workers: int = 1, cache_dir: str = None,
+              subexpression_cache: int = None):
+    """Generator running tasks and yielding their records as they complete
+
+    Args:
+        tasks (list): BatchTask items
+        workers (int, optional): Number of worker processes, 1 runs the tasks
+            in this process (its caches are restored afterwards). Defaults to 1.
+        cache_dir (str, optional): On-disk parse cache shared by the workers.
+            Defaults to None.
+        subexpression_cache (int, optional): Size of the subexpression cache
+            of each worker (see init_worker). Defaults to None.
+
+    Yields:
+        dict: Record of each task (see run_task) with its task index
+    """
+
+    if workers <= 1:
+        # Caches of this process are replaced for the batch only
+        previous = parse_cache.PARSE_CACHE, expression_eval.SUBEXPRESSION_CACHE
+        try:
+            if cache_dir:
+                configure_parse_cache(disk_dir=cache_dir)
+            if subexpression_cache is not None:
+                configure_subexpression_cache(subexpression_cache)
+            for index, task in enumerate(tasks):
+                yield dict(run_task(task), task=index)
+        finally:
+            parse_cache.PARSE_CACHE, expression_eval.SUBEXPRESSION_CACHE = previous
+        return
+
+    # Written by workers to shared memory right away, so they survive a crash
+    task_states = multiprocessing.RawArray('b', len(tasks))
+    initargs = (task_states, cache_dir, subexpression_cache)
+    pending = list(range(len(tasks)))
+    while pending:
+        for index in pending:
+            task_states[index] = 0
+        unfinished = yield from _run_pools(tasks, [pending], workers, initargs)
+        # Only tasks still running (at most one per worker) can have killed a
+        # worker; all unfinished ones if none was, e.g. a worker killed between
+        # tasks. Done tasks whose record was lost with the pool run again.
+        suspects = [index for index in unfinished if task_states[index] == TASK_RUNNING] or unfinished
+        isolated = set(suspects)
+        for start in range(0, len(suspects), workers):
+            # Alone in its pool, a crash can only be the task's own doing
+            batch = suspects[start:start + workers]
+            crashed = yield from _run_pools(tasks, [[index] for index in batch], 1, initargs)
+            for index in crashed:
+                yield dict(error_record(tasks[index], BrokenProcessPool(
+                    'Worker process died running the task')), task=index)
+        pending = [index for index in unfinished if index not in isolated]
+
+
+def write_jsonl(records, stream):
+    """Write records as JSON lines, flushing after each so results stream out
+
+    Args:
+        records (iterable): Records (dict)
+        stream (file): Writable text stream
+
+    Returns:
+        dict: Number of records per status
+    """
+
+    counts = {'ok': 0, 'error': 0}
+    for record in records:
+        # Results that are not JSON types (e.g. tuples of sets) are written as repr
+        stream.write(json.dumps(record, default=repr) + '\n')
+        stream.flush()
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+    return counts
+
+
+def main(source: str, workers: int = 1, output: str = None, cache_dir: str = None,
+         subexpression_cache: int = None):
+    """Run a batch and stream its JSONL records to a file or stdout
+
+    Args:
+        source (str): Input directory or manifest file
+        workers (int, optional): Number of worker processes. Defaults to 1.
+        output (str, optional): JSONL output file. Defaults to stdout.
+        cache_dir (str, optional): On-disk parse cache. Defaults to None.
+        subexpression_cache (int, optional): Subexpression cache size per
+            worker, its totals are reported with the summary. Defaults to None.
+
+    Returns:
+        int: Exit code, 1 if any task failed
+    """
+
+    tasks, rejected = collect_tasks(source)
+    for item in rejected:
+        print('skipped: no solver for %s' % item, file=sys.stderr)
+
+    cache_stats = {'hits': 0, 'misses': 0}
+
+    def tally(records):
+        for record in records:
+            for key, value in record.get('subexpression_cache', {}).items():
+                cache_stats[key] += value
+            yield record
+
+    start = time.perf_counter()
+    records = tally(run_batch(tasks, workers, cache_dir, subexpression_cache))
+    if output:
+        with open(output, 'w') as stream:
+            counts = write_jsonl(records, stream)
+    else:
+        counts = write_jsonl(records, sys.stdout)
+    print('%d tasks, %d ok, %d failed, %d skipped in %.3f s'
+          % (len(tasks), counts['ok'], counts['error'], len(rejected), time.perf_counter() - start),
+          file=sys.stderr)
+    if subexpression_cache is not None:
+        lookups = cache_stats['hits'] + cache_stats['misses']
+        print('subexpression cache: %d hits, %d misses, %.1f%% hit rate'
+              % (cache_stats['hits'], cache_stats['misses'],
+                 100.0*cache_stats['hits']/lookups if lookups else 0.0), file=sys.stderr)
+    return 1 if counts['error'] else 0
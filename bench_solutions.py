@@ -0,0 +1,113 @@
+"""
+.. module:: bench_solutions
+   :synopsis: pytest-benchmark suite timing every question_X solver on
+   synthetic inputs of 10^3 up to 10^7 records (see synthetic_inputs). The
+   module is not collected by the default test run, execute it explicitly:
+
+       pytest bench_solutions.py --benchmark-storage=./benchmarks --benchmark-save=baseline
+
+   and compare a later run against the stored JSON baseline with:
+
+       pytest bench_solutions.py --benchmark-storage=./benchmarks --benchmark-compare \
+           --benchmark-compare-fail=mean:20%
+
+   The largest input size is set with the BENCH_MAX_SIZE environment variable
+   (defaults to 10^5). Every timed run also checks the known answer.
+"""
+
+import os
+
+import pytest
+
+import challenge_solutions
+import parse_cache
+from synthetic_inputs import GENERATORS
+
+pytest.importorskip('pytest_benchmark')
+
+BENCH_MAX_SIZE = int(os.environ.get('BENCH_MAX_SIZE', 10**5))
+SIZES = [10**k for k in range(3, 8) if 10**k <= BENCH_MAX_SIZE]
+
+# Solver -> input format
+SOLVER_FORMATS = {
+    'question_1': 'expense_report',
+    'question_1_bonus': 'expense_report',
+    'question_2': 'passwords',
+    'question_2_bonus': 'passwords',
+    'question_4': 'passports',
+    'question_4_bonus': 'passports',
+    'question_5': 'boarding_passes',
+    'question_5_bonus': 'boarding_passes',
+    'question_6': 'customs_answers',
+    'question_6_bonus': 'customs_answers',
+    'question_10': 'adapters',
+    'question_10_bonus': 'adapters',
+    'question_12': 'navigation',
+    'question_12_bonus': 'navigation',
+    'question_13': 'bus_notes',
+    'question_13_bonus': 'bus_notes',
+    'question_18': 'expressions',
+    'question_18_bonus': 'expressions',
+    'question_21': 'food_allergies',
+    'question_21_bonus': 'food_allergies',
+}
+
+# Arrangement counts grow exponentially with the chain length, so the
+# answer itself gets huge for long chains
+SIZE_LIMITS = {'question_10_bonus': 10**5}
+
+
+@pytest.fixture(autouse=True)
+def no_parse_cache():
+    """Time full runs, without parsed inputs kept between rounds"""
+
+    saved_cache = parse_cache.PARSE_CACHE
+    parse_cache.configure_parse_cache(maxsize=0)
+    yield
+    parse_cache.PARSE_CACHE = saved_cache
+
+
+@pytest.fixture(scope='module')
+def synthetic_input(tmp_path_factory):
+    """Factory generating (and caching) synthetic input files per format and size"""
+
+    cache = {}
+    directory = tmp_path_factory.mktemp('synthetic_inputs')
+
+    def make_input(input_format: str, size: int):
+        key = (input_format, size)
+        if key not in cache:
+            file_name = str(directory / ('%s_%d.txt' % key))
+            cache[key] = file_name, GENERATORS[input_format](file_name, size)
+        return cache[key]
+
+    return make_input
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('solver_name', sorted(SOLVER_FORMATS))
+def test_bench_file_solver(benchmark, synthetic_input, solver_name, size):
+    if size > SIZE_LIMITS.get(solver_name, size):
+        pytest.skip('size above limit of ' + solver_name)
+    file_name, answers = synthetic_input(SOLVER_FORMATS[solver_name], size)
+    extra_args, expected = answers[solver_name]
+    solver = getattr(challenge_solutions, solver_name)
+    benchmark.group = solver_name
+    benchmark.extra_info['records'] = size
+    result = benchmark.pedantic(solver, args=(file_name,) + extra_args, rounds=3, iterations=1)
+    assert result == expected
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('backend', ['dict', 'array'])
+def test_bench_question_15(benchmark, backend, size):
+    benchmark.group = 'question_15'
+    benchmark.extra_info['records'] = size
+    result = benchmark.pedantic(challenge_solutions.question_15, args=([0, 3, 6], size, backend),
+                                rounds=3, iterations=1)
+    assert result == challenge_solutions.question_15([0, 3, 6], size, 'dict')
+
+
+def test_bench_question_25(benchmark):
+    benchmark.group = 'question_25'
+    assert benchmark(challenge_solutions.question_25, 10705932, 12301431) == 11328376
@@ -0,0 +1,106 @@
+"""
+.. module:: boarding_passes
+   :synopsis: Module with a bulk boarding pass decoder (day 5). A boarding
+   pass is a 10-bit binary number where B/R are ones and F/L are zeros, so the
+   whole (memory-mapped) file is decoded as a single NumPy dot product when
+   NumPy is installed. A pure python fallback is used otherwise.
+"""
+
+from record_readers import map_line_windows, read_lines
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+PASS_LENGTH = 10
+BINARY_TABLE = str.maketrans('FBLR', '0101')
+
+
+def decode_seat_ids(boarding_seq_file_name: str):
+    """Decode all boarding passes of a file to seat ids
+
+    Args:
+        boarding_seq_file_name (str): File with one boarding pass per line
+
+    Returns:
+        array like: Seat ids (NumPy array if NumPy is installed, else list)
+    """
+
+    if np is None:
+        return [int(seq.translate(BINARY_TABLE), 2)
+                for seq in read_lines(boarding_seq_file_name, skip_blank=True)]
+
+    # Windows are line aligned, so every window holds whole passes
+    seat_ids = list(map_line_windows(boarding_seq_file_name, decode_seat_bytes))
+    return np.concatenate(seat_ids) if seat_ids else np.zeros(0, dtype=np.int64)
+
+
+def decode_seat_bytes(data):
+    """Decode a byte buffer of boarding passes to seat ids
+
+    Args:
+        data (array like): uint8 buffer of boarding passes, separated by
+            whitespace (line breaks)
+
+    Returns:
+        numpy.ndarray: Seat ids
+    """
+
+    data = np.asarray(data, dtype=np.uint8)
+    passes = _fixed_stride_view(data)
+    if passes is None:
+        # Drop line breaks and other whitespace, leaving fixed length passes
+        data = data[data > ord(' ')]
+        if data.size % PASS_LENGTH:
+            raise ValueError('Boarding passes must be %d characters long' % PASS_LENGTH)
+        passes = data.reshape(-1, PASS_LENGTH)
+    bits = (passes == ord('B')) | (passes == ord('R'))
+    # Exact in float32 for 10 bits, and lets the dot product use BLAS
+    weights = (1 << np.arange(PASS_LENGTH - 1, -1, -1)).astype(np.float32)
+    return (bits.astype(np.float32) @ weights).astype(np.int64)
+
+
+def _fixed_stride_view(data):
+    """(n, PASS_LENGTH) view of a buffer where every pass is followed
+by the same line break, or None if the buffer is not laid out that way"""
+
+    stride = PASS_LENGTH + 1
+    if data.size > PASS_LENGTH and data[PASS_LENGTH] == ord('\r'):
+        stride += 1
+    if data.size % stride:
+        # Only the last pass may lack its line break
+        if data.size % stride != PASS_LENGTH:
+            return None
+        data = np.append(data, np.full(stride - PASS_LENGTH, ord('\n'), dtype=np.uint8))
+    rows = data.reshape(-1, stride)
+    if not (rows[:, PASS_LENGTH:] <= ord(' ')).all():
+        return None
+    return rows[:, :PASS_LENGTH]
+
+
+def find_missing_seat(seat_ids):
+    """Find the empty seat whose neighbouring seat ids are both occupied
+
+    Args:
+        seat_ids (array like): Occupied seat ids
+
+    Returns:
+        int: Missing seat id, None if there is no such seat
+    """
+
+    if np is None:
+        occupied = set(seat_ids)
+        for seat_id in range(min(occupied) + 1, max(occupied)):
+            if seat_id not in occupied and seat_id - 1 in occupied \
+                    and seat_id + 1 in occupied:
+                return seat_id
+        return None
+
+    seat_ids = np.asarray(seat_ids, dtype=np.int64)
+    first_seat = int(seat_ids.min())
+    occupied = np.bincount(seat_ids - first_seat) > 0
+    gaps = np.flatnonzero(~occupied[1:-1] & occupied[:-2] & occupied[2:])
+    if gaps.size == 0:
+        return None
+    return first_seat + 1 + int(gaps[0])
@@ -0,0 +1,68 @@
+"""
+.. module:: bus_schedule
+   :synopsis: Module with bus timetable solvers (day 13). The earliest
+   timestamp where every bus departs at its offset is found with the
+   generalized Chinese Remainder Theorem, so bus ids need not be coprime.
+"""
+
+from number_theory import crt
+
+
+def parse_bus_ids(bus_line: str):
+    """Parse a bus id line, e.g. '7,13,x,x,59'
+
+    Args:
+        bus_line (str): Comma separated bus ids, 'x' for out of service
+
+    Returns:
+        list: (offset, bus id) of each bus in service
+    """
+
+    return [(offset, int(bus_id))
+            for offset, bus_id in enumerate(bus_line.strip().split(','))
+            if bus_id.strip() != 'x']
+
+
+def earliest_bus(start_time: int, bus_ids: list):
+    """Find the first bus departing at or after start_time
+
+    Args:
+        start_time (int): Earliest departure time
+        bus_ids (list): Bus ids (departure intervals)
+
+    Returns:
+        tuple: (bus id, wait time), wait time is 0 for a bus departing at
+            start_time
+    """
+
+    return min(((bus_id, -start_time % bus_id) for bus_id in bus_ids),
+               key=lambda x: x[1])
+
+
+def earliest_aligned_timestamp(buses: list):
+    """Find the earliest timestamp t where every bus departs at t + offset
+
+    Args:
+        buses (list): (offset, bus id) pairs, see parse_bus_ids
+
+    Returns:
+        int: Earliest aligned timestamp, None if buses can never align
+    """
+
+    solution = crt([-offset % bus_id for offset, bus_id in buses],
+                   [bus_id for _, bus_id in buses])
+    return None if solution is None else solution[0]
+
+
+def earliest_aligned_timestamps(timetables):
+    """Batch variant of earliest_aligned_timestamp
+
+    Args:
+        timetables (iterable): Bus id lines or lists of (offset, bus id)
+
+    Returns:
+        list: Earliest aligned timestamp per timetable
+    """
+
+    return [earliest_aligned_timestamp(parse_bus_ids(x) if isinstance(x, str) else x)
+            for x in timetables]
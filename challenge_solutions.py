@@ -7,8 +7,61 @@
 .. moduleauthor:: Taimoor Akhtar <taimoor.akhtar@gmail.com>,
 """
 
-import re
+import sys
 
+from adapter_chain import count_arrangements, joltage_diff_histogram
+from allergen_index import AllergenIndex
+from boarding_passes import decode_seat_ids, find_missing_seat
+from bus_schedule import earliest_aligned_timestamp, earliest_bus, parse_bus_ids
+from customs_answers import group_counts_mapped
+from expression_eval import ADDITION_FIRST, EQUAL_PRECEDENCE, sum_expressions_file
+from instrumentation import instrumented, parse_phase
+from ksum import k_sum
+from memory_game import play_memory_game
+from navigation import manhattan_distance, navigate, parse_instructions
+from number_theory import discrete_log, mod_pow
+from parse_cache import cached_parser
+from passport_validation import REQUIRED_FIELDS, PassportStore, PassportValidator
+from password_policy import count_valid_passwords_mapped
+from record_readers import read_ints, read_lines
+
+
+# Streamed input readers of single use inputs, timed and counted as parse phases
+stream_ints = parse_phase(read_ints)
+
+# Cached input parsers, shared by the question_X and question_X_bonus solvers
+# that need the same parsed input (parsed inputs are shared between callers
+# and must not be modified). Single use inputs are streamed instead.
+@cached_parser
+def load_sorted_ints(file_name: str):
+    """Parse a file of whitespace separated integers in ascending order"""
+
+    return sorted(read_ints(file_name))
+
+
+@cached_parser
+def load_lines(file_name: str):
+    """Parse a file into its non-blank lines"""
+
+    return list(read_lines(file_name, skip_blank=True))
+
+
+@cached_parser
+def load_allergen_index(file_name: str):
+    """Parse food items into an allergen inverted index"""
+
+    return AllergenIndex(read_lines(file_name, skip_blank=True))
+
+
+# Byte oriented parsers work on memory-mapped files when NumPy is installed
+load_password_counts = cached_parser(count_valid_passwords_mapped)
+load_group_counts = cached_parser(group_counts_mapped)
+load_seat_ids = cached_parser(decode_seat_ids)
+load_passport_store = cached_parser(PassportStore.from_file)
+load_instructions = cached_parser(parse_instructions)
+
+
+@instrumented
 def question_1(exp_report_file: str, sum_val: int):
     """Find two numbers in expense report array that sum to a given number
 
@@ -20,20 +73,14 @@ def question_1(exp_report_file: str, sum_val: int):
         [int]: Multiple of items that sum to sum_val
     """
 
-    # Load expense report
-    with open(exp_report_file, 'r') as f:
-        exp_report = [int(x) for x in f.read().split()]
-
-    if len(exp_report) < 2: # Some basic error checking
-        return None
-    else:
-        while len(exp_report) > 0: 
-            item = sum_val - exp_report.pop(0)
-            if item in exp_report:
-                return item*(sum_val - item)
+    # Pairs are found in a single pass over the streamed expense report
+    items = k_sum(stream_ints(exp_report_file), sum_val, 2)
+    if items is None:
         return None
+    return items[0]*items[1]
 
 
+@instrumented
 def question_1_bonus(exp_report_file: str, sum_val: int):
     """Find three numbers in expense report array that sum to a given number
 
@@ -44,27 +91,15 @@ def question_1_bonus(exp_report_file: str, sum_val: int):
     Returns:
         [int]: Multiple of items that sum to sum_val
     """
-    # NOTE: The general solution would use recursion or maybe dynamic
-    # programming for improving efficiency 
-    # Load expense report
-    with open(exp_report_file, 'r') as f:
-        exp_report = [int(x) for x in f.read().split()]
 
-    if len(exp_report) < 3: # Some basic error checking
-        return None
-    else:
-        while len(exp_report) > 0: 
-            item_1 = exp_report.pop(0)
-            sum_val_rem = sum_val - item_1
-            remaining_items = exp_report.copy()
-            while len(remaining_items) > 0:
-                item_2 = remaining_items.pop(0)
-                item_3 = sum_val_rem - item_2
-                if item_3 in remaining_items:
-                    return item_1*item_2*item_3
+    # The expense report is loaded and sorted once inside k_sum
+    items = k_sum(stream_ints(exp_report_file), sum_val, 3)
+    if items is None:
         return None
+    return items[0]*items[1]*items[2]
 
 
+@instrumented
 def question_2(password_list_file: str):
     """Find valid passwords given policy. The complete description of problem
 given at https://adventofcode.com/2020/day/2
@@ -76,26 +111,13 @@ given at https://adventofcode.com/2020/day/2
         int: Count of valid passwords 
     """
 
-    # Read password list from file
-    with open(password_list_file, 'r') as f:
-        password_list = [line.rstrip() for line in f]
-
-    # Loop over list to count valid passwords
-    valid_count = 0
-    for password_item in password_list:
-        temp_1 = password_item.split()
-        temp_2 = temp_1[0].split('-')
-        min_repeat = int(temp_2[0])
-        max_repeat = int(temp_2[1])
-        repeat_letter = temp_1[1][0]
-        password = temp_1[2]
-        actual_repeat = password.count(repeat_letter)
-        if (actual_repeat >= min_repeat) and (actual_repeat <= max_repeat):
-            valid_count += 1
-    
+    # Both policies are evaluated in the same pass over the file
+    valid_count = load_password_counts(password_list_file)[0]
+
     return valid_count
 
 
+@instrumented
 def question_2_bonus(password_list_file: str):
     """Find valid passwords given policy. The complete description of problem
 given at https://adventofcode.com/2020/day/2
@@ -107,25 +129,13 @@ given at https://adventofcode.com/2020/day/2
         int: Count of valid passwords 
     """
 
-    # Read password list from file
-    with open(password_list_file, 'r') as f:
-        password_list = [line.rstrip() for line in f]
-
-    # Loop over list to count valid passwords
-    valid_count = 0
-    for password_item in password_list:
-        temp_1 = password_item.split()
-        temp_2 = temp_1[0].split('-')
-        first_loc = int(temp_2[0]) - 1
-        second_loc = int(temp_2[1]) - 1
-        repeat_letter = temp_1[1][0]
-        password = temp_1[2]
-        if (((password[first_loc] == repeat_letter) and (password[second_loc]  != repeat_letter)) or ((password[first_loc] != repeat_letter) and (password[second_loc]  == repeat_letter))):
-            valid_count += 1
-    
+    # Both policies are evaluated in the same pass over the file
+    valid_count = load_password_counts(password_list_file)[1]
+
     return valid_count
 
 
+@instrumented
 def question_4(passport_file: str):
     """This function processes a passport data batch file to count number of
 valid passport entries. Exact problem solved here is described at https://adventofcode.com/2020/day/4
@@ -137,39 +147,14 @@ valid passport entries. Exact problem solved here is described at https://advent
         int: Number of valid passports in file
     """
 
-    with open(passport_file, 'r') as f:
-        passport_lines = f.readlines()   
-    valid_passport_count = 0
-    
-    passports = [] # list of passports (maybe needed later)
-    passport_data = [] # data for each passport
-    net_valid_fields = ['byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid', 'cid']
-    for line in passport_lines:
-        if line == '\n':
-            passports.append(dict(passport_data))
-            passport_data = []
-            # TODO: Check validity of fields in future
-            if len(net_valid_fields) == 0:
-                valid_passport_count += 1
-            elif len(net_valid_fields) == 1 and net_valid_fields[0] == 'cid':
-                valid_passport_count += 1
-            net_valid_fields = ['byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid', 'cid']    
-        line = line.split()
-        for item in line:
-            passport_field = item.split(':')
-            if passport_field[0] in net_valid_fields:
-                net_valid_fields.remove(passport_field[0])
-            passport_data.append(passport_field)
-    # Check last passport
-    # TODO: Check validity of fields in future
-    if len(net_valid_fields) == 0:
-            valid_passport_count += 1
-    elif len(net_valid_fields) == 1 and net_valid_fields[0] == 'cid':
-        valid_passport_count += 1
+    # Presence bitmask check over the (cached) columnar passport store, cid
+    # is optional
+    valid_passport_count = load_passport_store(passport_file).count_present(REQUIRED_FIELDS)
 
     return valid_passport_count
 
 
+@instrumented
 def question_4_bonus(passport_file: str):
     """This function processes a passport data batch file to count number of
 valid passport entries. Exact problem solved here is described at https://adventofcode.com/2020/day/4#part2
@@ -181,105 +166,14 @@ valid passport entries. Exact problem solved here is described at https://advent
         int: Number of valid passports in file
     """
 
-    with open(passport_file, 'r') as f:
-        passport_lines = f.readlines()   
-    valid_passport_count = 0
-    
-    passports = [] # list of passports 
-    passport_data = [] # data for each passport
-    net_valid_fields = ['byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid', 'cid']
-    for line in passport_lines:
-        if line == '\n':
-            passports.append(dict(passport_data))
-            passport_data = []
-            # TODO: Check validity of fields in future
-            if len(net_valid_fields) == 0:
-                valid_passport_count += 1
-            elif len(net_valid_fields) == 1 and net_valid_fields[0] == 'cid':
-                valid_passport_count += 1
-            net_valid_fields = ['byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid', 'cid']  
-        line = line.rstrip()  
-        line = line.split()
-        for item in line:
-            passport_field = item.split(':')
-             #  Check validity of fields here
-            if passport_field[0] == 'byr':
-                try:
-                    if int(passport_field[1]) >= 1920 and int(passport_field[1]) <= 2002: 
-                        net_valid_fields.remove(passport_field[0])
-                except ValueError:
-                    pass
-            elif passport_field[0] == 'iyr':
-                try:
-                    if int(passport_field[1]) >= 2010 and int(passport_field[1]) <= 2020: 
-                        net_valid_fields.remove(passport_field[0])
-                except ValueError:
-                    pass
-            elif passport_field[0] == 'eyr':
-                try:
-                    if int(passport_field[1]) >= 2020 and int(passport_field[1]) <= 2030: 
-                        net_valid_fields.remove(passport_field[0])
-                except ValueError:
-                    pass
-            elif passport_field[0] == 'hgt': 
-                height_data = re.split(r'(\d+)', passport_field[1])
-                try:
-                    height_data = re.split(r'(\d+)', passport_field[1])
-                    height_data = list(filter(None, height_data))
-                    if len(height_data) == 2:
-                        if height_data[1] == 'cm':
-                            if int(height_data[0]) >= 150 and int(height_data[0]) <= 193:
-                                net_valid_fields.remove(passport_field[0])
-                        if height_data[1] == 'in':
-                            if int(height_data[0]) >= 59 and int(height_data[0]) <= 76:
-                                net_valid_fields.remove(passport_field[0])  
-                except ValueError:
-                    pass
-            elif passport_field[0] == 'hcl':
-                try:
-                    color = passport_field[1]
-                    if color[0] == '#' and len(color) == 7:
-                        valid_characters = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'a', 'b', 'c', 'd', 'e', 'f']
-                        color_code = color[1:]
-                        count_chars = 0
-                        for code in color_code:
-                            if code in valid_characters:
-                                count_chars += 1
-                        if count_chars == 6:
-                            net_valid_fields.remove(passport_field[0])  
-                except ValueError:
-                    pass 
-            elif passport_field[0] == 'ecl':
-                try:
-                    color = passport_field[1]
-                    valid_colors = ['amb', 'blu' , 'brn', 'gry', 'grn', 'hzl', 'oth']
-                    if color in valid_colors:
-                        net_valid_fields.remove(passport_field[0])
-                except ValueError:
-                    pass
-            elif passport_field[0] == 'pid':
-                try:
-                    pid = passport_field[1]
-                    valid_pid_chars = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
-                    count_digits = 0
-                    for id in pid:
-                        if id in valid_pid_chars:
-                            count_digits += 1
-                    if count_digits == 9:
-                        net_valid_fields.remove(passport_field[0])   
-                except ValueError:
-                    pass
-            
-            passport_data.append(passport_field)
-    # Check last passport
-    if len(net_valid_fields) == 0:
-            valid_passport_count += 1
-    elif len(net_valid_fields) == 1 and net_valid_fields[0] == 'cid':
-        valid_passport_count += 1
+    # Field rules are compiled once and checked once per distinct value of
+    # the (cached) columnar passport store
+    valid_passport_count = load_passport_store(passport_file).count_valid(PassportValidator())
 
     return valid_passport_count
 
 
+@instrumented
 def question_5(boarding_seq_file_name: str):
     """This question finds coresponding seat IDs given boarding sequences. The
 sequence to id conversion is defined at https://adventofcode.com/2020/day/5
@@ -291,32 +185,15 @@ sequence to id conversion is defined at https://adventofcode.com/2020/day/5
         list: seat ids corresponding to given boarding sequences
     """
 
-    # Read password list from file
-    with open(boarding_seq_file_name, 'r') as f:
-        boarding_seq_list = [line.rstrip() for line in f]
-    
-    # iterate through file to get seat ids
-    seat_ids = []
-    for boarding_sequence in boarding_seq_list:
-
-        # Determine row number
-        row_number = 0
-        for i in range(7):
-            if boarding_sequence[i] == 'B':
-                row_number = row_number + 2**(6-i)
-        
-        # Determine column number
-        col_number = 0
-        for i in range(7,10):
-            if boarding_sequence[i] == 'R':
-                col_number = col_number + 2**(9-i)
-        
-        seat_id = row_number*8 + col_number
-        seat_ids.append(seat_id)
+    # Decode all boarding passes in bulk (vectorized if NumPy is installed)
+    # Copy, as the cached seat ids are shared with question_5_bonus
+    seat_ids = load_seat_ids(boarding_seq_file_name)
+    seat_ids = list(seat_ids) if isinstance(seat_ids, list) else seat_ids.tolist()
 
     return seat_ids
 
 
+@instrumented
 def question_5_bonus(boarding_seq_file_name: str):
     """This questions finds the unknown seat id via process of elimination. The
 exact question answered here is given in https://adventofcode.com/2020/day/5
@@ -327,24 +204,14 @@ exact question answered here is given in https://adventofcode.com/2020/day/5
     Returns:
         int: My seat id
     """
-    # Get occupied seat ids
-    seat_ids = question_5(boarding_seq_file_name)
-    seat_ids = sorted(seat_ids)
-    # Estimate all possible seats
-    valid_seats = list(range(min(seat_ids),max(seat_ids)+1))
-    possible_seats = list(set(valid_seats) - set(seat_ids))
-    final_seat = possible_seats[0]
-    # Find first seat that has two adjacent filled seats
-    while len(possible_seats) > 2:
-        if (possible_seats[1] - final_seat) == 1:
-            final_seat = possible_seats[2]
-            possible_seats.pop(0)
-        else:
-            break
-    
+    # Find the empty seat that has two adjacent filled seats
+    seat_ids = load_seat_ids(boarding_seq_file_name)
+    final_seat = find_missing_seat(seat_ids)
+
     return final_seat
     
 
+@instrumented
 def question_6(customs_questions_file: str):
     """This function counts and returns the number of customs questions asked.
 The solutions corresponds to the puzzle given at https://adventofcode.com/2020/day/6
@@ -356,26 +223,30 @@ The solutions corresponds to the puzzle given at https://adventofcode.com/2020/d
         tuple: distribution and sum of yes answers
     """
 
-    with open(customs_questions_file, 'r') as f:
-        q_lines = f.readlines() 
-    
-    yes_counts = []
-    yes_answers_all = []
-    yes_answers_group = ''
-    for line in q_lines:
-        if line == '\n':
-            yes_answers_all.append(set(yes_answers_group))
-            yes_counts.append(len(set(yes_answers_group)))
-            yes_answers_group = ''
-        else:
-            yes_answers_group = yes_answers_group + line.strip()
-
-    yes_answers_all.append(set(yes_answers_group))
-    yes_counts.append(len(set(yes_answers_group)))
+    # Answer groups are aggregated as bitsets
+    yes_counts = [anyone for anyone, _ in load_group_counts(customs_questions_file)]
+
+    return yes_counts, sum(yes_counts)
+
+
+@instrumented
+def question_6_bonus(customs_questions_file: str):
+    """This function counts the customs questions to which everyone in a group
+answered yes. The solutions corresponds to the puzzle given at https://adventofcode.com/2020/day/6#part2
+
+    Args:
+        customs_questions_file (str): Customs file name
+
+    Returns:
+        tuple: distribution and sum of yes answers
+    """
+
+    yes_counts = [everyone for _, everyone in load_group_counts(customs_questions_file)]
 
     return yes_counts, sum(yes_counts)
 
 
+@instrumented
 def question_10(adapter_file_name: str):
     """This function solves Day 10, Part 1 of the code challenge given in
 https://adventofcode.com/2020/day/10. Given a list of adapters we find
@@ -388,49 +259,57 @@ distribution of differences.
         int: multiple of 1-diff count and 3-diff count
     """
 
-    with open(adapter_file_name, 'r') as f:
-        adapter_list = [int(x) for x in f.read().split()]
-
-    sorted_adapters = sorted(adapter_list)
-    sorted_adapters.insert(0,0)
-    sorted_adapters.append(sorted_adapters[-1] + 3)
-    diff_list = [y - x for x, y in zip(sorted_adapters, sorted_adapters[1:])]
-    diff_distribution = {x:diff_list.count(x) for x in set(diff_list)}
+    # Single pass histogram of differences over the sorted chain
+    sorted_adapters = load_sorted_ints(adapter_file_name)
+    diff_distribution = joltage_diff_histogram(sorted_adapters)
 
     return diff_distribution[1]*diff_distribution[3]
 
 
-def question_15(starting_numbers: list, end_turn: int):
+@instrumented
+def question_10_bonus(adapter_file_name: str):
+    """This function solves Day 10, Part 2 of the code challenge given in
+https://adventofcode.com/2020/day/10#part2. Given a list of adapters we count
+the distinct adapter arrangements that connect the outlet to the device.
+
+    Args:
+        adapter_file_name (str): Name of adapter file
+
+    Returns:
+        int: Number of distinct arrangements
+    """
+
+    sorted_adapters = load_sorted_ints(adapter_file_name)
+
+    return count_arrangements(sorted_adapters)
+
+
+@instrumented
+def question_15(starting_numbers: list, end_turn: int, backend: str = 'array',
+                checkpoint_file: str = None, progress=None):
     """This function creates a sequence as given in the challenge at
 https://adventofcode.com/2020/day/15 and returns the nth number (end_turn)
 
     Args:
         starting_numbers (list): Starting sequence
         end_turn (int): Ending turn number
+        backend (str, optional): Engine used to store last seen turns, one of
+            'dict', 'array' (uint32 array) or 'numpy'. Defaults to 'array'.
+        checkpoint_file (str, optional): File to periodically save the game
+            to and to resume from. Defaults to None.
+        progress (callable, optional): Called as progress(turn, end_turn,
+            turns_per_second) during the game. Defaults to None.
 
     Returns:
         int: Number in sequence at end_turn (2020)
     """
 
     # Note: solved both Part 1 and Part 2 through this code
-    prev_number = starting_numbers[-1]
-    memory_dict = {}
-    i = 1
-    for number in starting_numbers:
-        memory_dict[number] = i
-        i += 1
-    
-    for turn in range(len(starting_numbers)+1, end_turn+1):
-        if prev_number in memory_dict.keys():
-            curr_number = (turn - 1) - memory_dict[prev_number]
-        else:
-            curr_number = 0
-        memory_dict[prev_number] = turn - 1
-        prev_number = curr_number
-
-    return curr_number   
+    return play_memory_game(starting_numbers, end_turn, backend,
+                            checkpoint_file=checkpoint_file, progress=progress)
 
 
+@instrumented
 def question_21(food_allergy_file: str):
     """Function for finding ingredients that are not associated with allergies.
 Full puzzle related to question described at https://adventofcode.com/2020/day/21
@@ -442,104 +321,74 @@ Full puzzle related to question described at https://adventofcode.com/2020/day/2
         int: Count of ingredients in food items that are without allergens (repeat count included)
     """
 
+    # Inverted index of food items is built in a single pass over the file
+    index = load_allergen_index(food_allergy_file)
+
+    return index.allergen_free_count()
 
-    # Parse file to store data in dictionary
-    with open(food_allergy_file, 'r') as f:
-        lines = [line.rstrip() for line in f]
-
-    food_items = []
-    for line in lines:
-        ingredients = line.split('(')[0].split()
-        allergens = line.split('(')[1].split(')')[0].replace('contains ', '').replace(',', '').split()
-        food_item = {
-            'ingredients': ingredients,
-            'allergens': allergens
-        }
-        food_items.append(food_item)
-
-    allergens = [x['allergens'] for x in food_items]
-    allergens = set([val for sublist in allergens for val in sublist])
-    ingredients =[x['ingredients'] for x in food_items]
-    ingredients = [val for sublist in ingredients for val in sublist]
-    ingredients_freq = {x:ingredients.count(x) for x in set(ingredients)}
-    ingredients = set(ingredients)
-
-    allergen_ingredients = {}
-
-    for allergen in allergens:
-        allergen_ingredients[allergen] = None
-        for item in food_items:
-            if allergen in item['allergens']:
-                if allergen_ingredients[allergen] is None:
-                    allergen_ingredients[allergen] = set(item['ingredients'])
-                else:
-                    allergen_ingredients[allergen] =  set.intersection(allergen_ingredients[allergen], set(item['ingredients']))
-    
-    # Find common ingredients
-    common_ingredients =[list(x) for x in allergen_ingredients.values()]
-    common_ingredients = set([val for sublist in common_ingredients for val in sublist])
-    
-    # Find ingredients without allergens (No error check done)
-    ingredients_without_allergens = ingredients - common_ingredients
-    count_ingredients_without_allergens = 0
-    for item in ingredients_without_allergens:
-        count_ingredients_without_allergens += ingredients_freq[item]
-    
-    return count_ingredients_without_allergens
 
+@instrumented
+def question_21_bonus(food_allergy_file: str):
+    """Function for finding the canonical dangerous ingredient list, i.e. the
+ingredients containing allergens sorted by allergen. Full puzzle described at
+https://adventofcode.com/2020/day/21#part2
+
+    Args:
+        food_allergy_file (str): Allergies file name
+
+    Returns:
+        str: Comma separated list of dangerous ingredients
+    """
 
+    index = load_allergen_index(food_allergy_file)
 
-def question_18(expression_list_file: str):
+    return index.canonical_dangerous_list()
+
+
+@instrumented
+def question_18(expression_list_file: str, workers: int = 1, cache=None):
     """This function implements a basic calculator as described at
 https://adventofcode.com/2020/day/18 to compute answers to a list of expressions
 given from a file. Returns the sum of all expressions.
 
     Args:
         expression_list_file (str): File with list of expressions
+        workers (int, optional): Number of worker processes. Defaults to 1.
+        cache (SubexpressionCache, optional): Memoize parenthesized groups,
+            pass the same cache to share it across files. Defaults to None.
 
     Returns:
         int: sum of expression outputs
     """
     
-    # Parse expression list file to get all expressions
-    with open(expression_list_file, 'r') as f:
-        expressions = [line.rstrip() for line in f]
-
-    final_sum_val = 0
-    # The following loop evaluates each expression
-    for expression in expressions:
-        value = 0
-        expression = expression.strip()
-        operation = '+'
-        expression_stack = []
-        for i in range(len(expression)):
-            s = expression[i]
-            if s.isdigit():
-                if operation == '+':
-                    value = value + int(s)
-                else:
-                    value = value * int(s)
-            if s == '+' or s == '*':
-                operation = s
-            if s == '(':
-                expression_item = {
-                    'value': value,
-                    'operation': operation
-                }
-                expression_stack.append(expression_item)
-                value = 0
-                operation = '+'
-            if s == ')':
-                if expression_stack[-1]['operation'] == '+':
-                    value = value + expression_stack[-1]['value']
-                else:
-                    value =  value * expression_stack[-1]['value']
-                expression_stack = expression_stack[:-1]
-        final_sum_val += value
-        
+    # Each expression streamed from file is compiled to postfix and evaluated
+    final_sum_val = sum_expressions_file(expression_list_file, EQUAL_PRECEDENCE, workers, cache)
+
     return final_sum_val
 
 
+@instrumented
+def question_18_bonus(expression_list_file: str, workers: int = 1, cache=None):
+    """This function implements the advanced calculator described at
+https://adventofcode.com/2020/day/18#part2, where addition is evaluated before
+multiplication. Returns the sum of all expressions.
+
+    Args:
+        expression_list_file (str): File with list of expressions
+        workers (int, optional): Number of worker processes. Defaults to 1.
+        cache (SubexpressionCache, optional): Memoize parenthesized groups,
+            pass the same cache to share it across files. Defaults to None.
+
+    Returns:
+        int: sum of expression outputs
+    """
+
+    final_sum_val = sum_expressions_file(expression_list_file, ADDITION_FIRST, workers, cache)
+
+    return final_sum_val
+
+
+@instrumented
 def question_13(bus_notes_file: str):
     """This function computes the bus id and wait time for the puzzle problem
 given at https://adventofcode.com/2020/day/13
@@ -550,20 +399,33 @@ given at https://adventofcode.com/2020/day/13
     Returns:
         int: wait time * bus id
     """
-    with open(bus_notes_file, 'r') as f:
-        lines = f.readlines()
+    lines = load_lines(bus_notes_file)
 
     start_time = int(lines[0])
-    bus_ids = lines[1].split(',')
-    bus_ids = [int(x) for x in bus_ids if x != 'x']
-    wait_times = [x - start_time%x for x in bus_ids]
-    wait_times = dict(zip(bus_ids, wait_times))
-    min_bus_id = min(wait_times, key=wait_times.get)
-    min_wait_time = wait_times[min_bus_id]
+    bus_ids = [bus_id for _, bus_id in parse_bus_ids(lines[1])]
+    min_bus_id, min_wait_time = earliest_bus(start_time, bus_ids)
     
     return min_wait_time*min_bus_id
 
 
+@instrumented
+def question_13_bonus(bus_notes_file: str):
+    """This function finds the earliest timestamp at which every bus departs
+at its offset in the bus list, for the puzzle problem given at
+https://adventofcode.com/2020/day/13#part2
+
+    Args:
+        bus_notes_file (str): Bus notes as user input
+
+    Returns:
+        int: Earliest aligned timestamp
+    """
+    lines = load_lines(bus_notes_file)
+
+    return earliest_aligned_timestamp(parse_bus_ids(lines[1]))
+
+
+@instrumented
 def question_25(public_key_card: int, public_key_door: int):
     """This function computes encryption key of a crypto code given public keys
 keys of two interfaces and further information as provided in https://adventofcode.com/2020/day/25
@@ -576,29 +438,15 @@ keys of two interfaces and further information as provided in https://adventofco
         int: Common encryption code
     """
 
-    key_value = 1
-    subject_number = 7
-    loop_size_card = 0
-    while key_value != public_key_card:
-        key_value = key_value*subject_number
-        key_value = key_value%20201227
-        loop_size_card += 1
-
-    loop_size_door = 0
-    key_value = 1
-    while key_value != public_key_door:
-        key_value = key_value*subject_number
-        key_value = key_value%20201227
-        loop_size_door += 1
-
-    encryption_key = 1
-    for i in range(loop_size_card):
-        encryption_key  = encryption_key * public_key_door
-        encryption_key  = encryption_key%20201227
+    # Card loop size is the discrete log of its public key (base 7), the
+    # door loop size is not needed to derive the key
+    loop_size_card = discrete_log(7, public_key_card, 20201227)
+    encryption_key = mod_pow(public_key_door, loop_size_card, 20201227)
 
     return encryption_key
 
 
+@instrumented
 def question_12(nav_instructions_file: str):
     """Given navigation instructions, this function simulates ship navigation as
 per interpretation rules. The function solves with following question in the
@@ -611,44 +459,30 @@ coding challenge: https://adventofcode.com/2020/day/12
         int: Manhattan distance from point of origini
     """
 
-    # Read navigation instructions
-    with open(nav_instructions_file, 'r') as f:
-        lines = f.readlines()
-    
-    horizontal_distance = 0
-    vertical_distance = 0
-    direction = 3 # 0 means North, 3 Means East, 6 means South, 9 means West
-    # Start navigation 
-    for line in lines:
-        line = line.rstrip('\n')
-        if line[0] == 'F':
-            move_step = int(line[1:])
-            if direction == 3:
-                horizontal_distance += move_step
-            elif direction == 6:
-                vertical_distance -= move_step
-            elif direction == 9:
-                horizontal_distance -= move_step
-            else:
-                vertical_distance += move_step
-        elif line[0] == 'N':
-            move_step = int(line[1:])
-            vertical_distance += move_step
-        elif line[0] == 'S':
-            move_step = int(line[1:])
-            vertical_distance -= move_step
-        elif line[0] == 'E':
-            move_step = int(line[1:])
-            horizontal_distance += move_step
-        elif line[0] == 'W':
-            move_step = int(line[1:])
-            horizontal_distance -= move_step
-        elif line[0] == 'R':
-            chg_dir = int(line[1:])/90
-            direction = (direction + 3*chg_dir)%12
-        elif line[0] == 'L':
-            chg_dir = int(line[1:])/90
-            direction = (direction - 3*chg_dir)%12
-    manhattan_dist = abs(horizontal_distance) + abs(vertical_distance)
+    # Parse all instructions at once, then simulate with complex numbers
+    opcodes, arguments = load_instructions(nav_instructions_file)
+    manhattan_dist = manhattan_distance(navigate(opcodes, arguments))
+    return manhattan_dist
+
+
+@instrumented
+def question_12_bonus(nav_instructions_file: str):
+    """Given navigation instructions, this function simulates ship navigation
+with a waypoint, as per interpretation rules of https://adventofcode.com/2020/day/12#part2
+
+    Args:
+        nav_instructions_file (str): Navigation file
+
+    Returns:
+        int: Manhattan distance from point of origin
+    """
+
+    opcodes, arguments = load_instructions(nav_instructions_file)
+    manhattan_dist = manhattan_distance(navigate(opcodes, arguments, waypoint=True))
     return manhattan_dist
 
+
+if __name__ == '__main__':
+    # Command line runner, e.g. python -m challenge_solutions run 4b --profile
+    from solver_cli import main
+    sys.exit(main())
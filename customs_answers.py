@@ -0,0 +1,157 @@
+"""
+.. module:: customs_answers
+   :synopsis: Module with bitset aggregation of customs declaration answers
+   (day 6). Each answer line is encoded as a 26-bit integer mask, groups are
+   combined with OR (anyone answered yes) and AND (everyone answered yes) and
+   counted with a popcount. Memory-mapped files are aggregated with
+   vectorized NumPy reductions, one bounded window of the file at a time.
+"""
+
+from record_readers import line_bounds, map_line_windows, printable_counts, read_lines
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+QUESTION_BITS = {chr(ord('a') + i): 1 << i for i in range(26)}
+ALL_QUESTIONS = (1 << 26) - 1
+
+
+def answer_mask(answers: str):
+    """Encode the yes answers of one person as a 26-bit mask
+
+    Args:
+        answers (str): Questions answered with yes, e.g. 'abx'
+
+    Returns:
+        int: Mask with bit i set if question chr(ord('a') + i) is answered
+    """
+
+    mask = 0
+    for question in answers:
+        mask |= QUESTION_BITS.get(question, 0)
+    return mask
+
+
+def popcount(mask: int):
+    """Number of set bits of a mask"""
+
+    return bin(mask).count('1')
+
+
+def group_counts(customs_questions_file: str):
+    """Generator that streams per group yes counts from a customs file, one
+group (blank-line separated) at a time
+
+    Args:
+        customs_questions_file (str): Customs file name
+
+    Yields:
+        tuple: (questions anyone answered, questions everyone answered)
+    """
+
+    anyone = 0
+    everyone = ALL_QUESTIONS
+    group_size = 0
+    for line in read_lines(customs_questions_file):
+        if line.strip():
+            mask = answer_mask(line.strip())
+            anyone |= mask
+            everyone &= mask
+            group_size += 1
+        elif group_size:
+            yield popcount(anyone), popcount(everyone)
+            anyone, everyone, group_size = 0, ALL_QUESTIONS, 0
+    if group_size:
+        yield popcount(anyone), popcount(everyone)
+
+
+def group_counts_bytes(data):
+    """Vectorized per group yes counts of a customs file byte buffer, without
+creating a string per line
+
+    Args:
+        data (numpy.ndarray): uint8 buffer of the customs file
+
+    Returns:
+        tuple: (anyone, everyone) int64 arrays with one count per group
+    """
+
+    anyone, everyone, _, _ = _group_masks(data)
+    return _popcount_array(anyone), _popcount_array(everyone)
+
+
+def _group_masks(data):
+    """Answer masks of the groups of a line aligned byte buffer
+
+    Returns:
+        tuple: (anyone, everyone) uint32 mask arrays per group, and whether
+            the first and the last line are non-blank (so the first or last
+            group may continue in a neighbouring buffer)
+    """
+
+    starts, ends = line_bounds(data)
+    # Blank lines are empty or whitespace only
+    printable = printable_counts(data)
+    blank = printable[ends] == printable[starts]
+    line_starts = starts[~blank]
+    if line_starts.size == 0:
+        empty = np.zeros(0, dtype=np.uint32)
+        return empty, empty, False, False
+    bit_table = np.zeros(256, dtype=np.uint32)
+    for question, bit in QUESTION_BITS.items():
+        bit_table[ord(question)] = bit
+
+    # OR over each non-blank line up to the next one; the bytes in between
+    # (line breaks, blank lines) have no bits set
+    line_masks = np.bitwise_or.reduceat(bit_table[data], line_starts)
+
+    # A group starts at the first line after one or more blank lines
+    group_ids = np.cumsum(blank, dtype=np.int32)[~blank]
+    group_starts = np.flatnonzero(np.diff(group_ids, prepend=-1) != 0)
+    anyone = np.bitwise_or.reduceat(line_masks, group_starts)
+    everyone = np.bitwise_and.reduceat(line_masks, group_starts)
+    return anyone, everyone, not blank[0], not blank[-1]
+
+
+def _popcount_array(masks):
+    """Number of set bits of each uint32 mask"""
+
+    bits = np.unpackbits(masks.astype('>u4').view(np.uint8)).reshape(-1, 32)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+def group_counts_mapped(customs_questions_file: str):
+    """Per group yes counts of a memory-mapped customs file, aggregated over
+bounded line aligned windows of the file
+
+    Args:
+        customs_questions_file (str): Customs file name
+
+    Returns:
+        list: (questions anyone answered, questions everyone answered) per
+            group, as group_counts yields them
+    """
+
+    if np is None:
+        return list(group_counts(customs_questions_file))
+
+    counts = []
+    pending = None  # Masks of a group that may continue in the next window
+    for anyone, everyone, first_in_group, last_in_group in map_line_windows(customs_questions_file,
+                                                                            _group_masks):
+        if pending is not None:
+            if first_in_group:
+                anyone[0] |= pending[0]
+                everyone[0] &= pending[1]
+            else:
+                counts.append((popcount(pending[0]), popcount(pending[1])))
+            pending = None
+        if last_in_group:
+            pending = int(anyone[-1]), int(everyone[-1])
+            anyone, everyone = anyone[:-1], everyone[:-1]
+        counts.extend(zip(_popcount_array(anyone).tolist(), _popcount_array(everyone).tolist()))
+    if pending is not None:
+        counts.append((popcount(pending[0]), popcount(pending[1])))
+    return counts
@@ -0,0 +1,327 @@
+"""
+.. module:: expression_eval
+   :synopsis: Module with a tokenizer and shunting-yard compiler for the
+   calculator expressions of day 18. Expressions are compiled once into a
+   compact postfix form, with operator precedence taken from a pluggable
+   precedence table. Values of parenthesized groups can be memoized in a
+   bounded LRU shared across lines and files.
+"""
+
+import itertools
+import operator
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import add_records, parse_phase
+from record_readers import byte_range_chunks, read_lines, read_lines_in_range
+
+# Precedence tables (higher binds tighter), all operators are left associative
+EQUAL_PRECEDENCE = {'+': 1, '*': 1}
+ADDITION_FIRST = {'+': 2, '*': 1}
+
+OPERATORS = {'+': operator.add, '*': operator.mul}
+
+TOKEN_RE = re.compile(r'\s*(?:(\d+)|(.))')
+
+# Process wide subexpression cache, see configure_subexpression_cache
+SUBEXPRESSION_CACHE = None
+
+# Streamed expression lines, timed and counted as the parse phase of
+# instrumented solvers
+read_expression_lines = parse_phase(read_lines)
+
+
+def tokenize(expression: str):
+    """Split an expression into integer operands and operator/paren tokens
+
+    Args:
+        expression (str): Expression, e.g. '12 * (3 + 4)'
+
+    Returns:
+        list: Tokens, operands as int and other tokens as str
+    """
+
+    tokens = []
+    for number, symbol in TOKEN_RE.findall(expression.rstrip()):
+        if number:
+            tokens.append(int(number))
+        elif symbol in OPERATORS or symbol in '()':
+            tokens.append(symbol)
+        else:
+            raise ValueError('Unexpected character in expression: ' + repr(symbol))
+    return tokens
+
+
+def compile_expression(expression: str, precedence: dict = EQUAL_PRECEDENCE):
+    """Compile an expression to postfix form using the shunting-yard algorithm
+
+    Args:
+        expression (str): Expression
+        precedence (dict, optional): Operator -> precedence table. Defaults
+            to EQUAL_PRECEDENCE.
+
+    Returns:
+        tuple: Postfix program of int operands and operator functions
+    """
+
+    return _compile_tokens(tokenize(expression), precedence, expression)
+
+
+def _compile_tokens(tokens: list, precedence: dict, expression: str):
+    """Shunting-yard compiler of a token list (see compile_expression)"""
+
+    output = []
+    op_stack = []
+    for token in tokens:
+        if type(token) is int:
+            output.append(token)
+        elif token == '(':
+            op_stack.append(token)
+        elif token == ')':
+            while op_stack and op_stack[-1] != '(':
+                output.append(OPERATORS[op_stack.pop()])
+            if not op_stack:
+                raise ValueError('Unbalanced parentheses in: ' + expression)
+            op_stack.pop()
+        else:
+            token_precedence = precedence[token]
+            while op_stack and op_stack[-1] != '(' \
+                    and precedence[op_stack[-1]] >= token_precedence:
+                output.append(OPERATORS[op_stack.pop()])
+            op_stack.append(token)
+    while op_stack:
+        token = op_stack.pop()
+        if token == '(':
+            raise ValueError('Unbalanced parentheses in: ' + expression)
+        output.append(OPERATORS[token])
+    return tuple(output)
+
+
+def evaluate_postfix(program: tuple):
+    """Evaluate a compiled postfix program
+
+    Args:
+        program (tuple): Output of compile_expression
+
+    Returns:
+        int: Value of the expression
+    """
+
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    for token in program:
+        if type(token) is int:
+            push(token)
+        elif len(stack) < 2:
+            raise ValueError('Malformed expression program')
+        else:
+            right = pop()
+            push(token(pop(), right))
+    if len(stack) != 1:
+        raise ValueError('Malformed expression program')
+    return stack[0]
+
+
+def evaluate(expression: str, precedence: dict = EQUAL_PRECEDENCE):
+    """Compile and evaluate a single expression
+
+    Args:
+        expression (str): Expression
+        precedence (dict, optional): Precedence table. Defaults to EQUAL_PRECEDENCE.
+
+    Returns:
+        int: Value of the expression
+    """
+
+    return evaluate_postfix(compile_expression(expression, precedence))
+
+
+def sum_expressions(expressions, precedence: dict = EQUAL_PRECEDENCE, cache=None):
+    """Evaluate a batch (e.g. streamed lines) of expressions and sum them
+
+    Args:
+        expressions (iterable): Expressions, blank entries are skipped
+        precedence (dict, optional): Precedence table. Defaults to EQUAL_PRECEDENCE.
+        cache (SubexpressionCache, optional): Memoize parenthesized groups.
+            Defaults to None.
+
+    Returns:
+        int: Sum of expression values
+    """
+
+    total = 0
+    for expression in expressions:
+        if expression.strip():
+            if cache is not None:
+                total += cache.evaluate(expression, precedence)
+            else:
+                total += evaluate_postfix(compile_expression(expression, precedence))
+    return total
+
+
+class SubexpressionCache:
+    """Bounded LRU of parenthesized group values. Groups are canonicalized
+bottom-up: nested groups are replaced by their values, so a group is keyed by
+the precedence table and the tuple of its operand and operator tokens,
+independent of whitespace. Structurally identical groups share one entry
+across lines and files.
+
+    Args:
+        maxsize (int, optional): Number of groups kept. Defaults to 4096.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def stats(self):
+        """Hit/miss statistics, for tuning maxsize
+
+        Returns:
+            dict: hits, misses, hit_rate, size and maxsize
+        """
+
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._values), 'maxsize': self.maxsize}
+
+    def clear(self):
+        """Drop all entries and reset statistics"""
+
+        self._values.clear()
+        self.hits = self.misses = 0
+
+    def evaluate(self, expression: str, precedence: dict = EQUAL_PRECEDENCE):
+        """Evaluate an expression, reusing memoized group values
+
+        Args:
+            expression (str): Expression
+            precedence (dict, optional): Precedence table. Defaults to EQUAL_PRECEDENCE.
+
+        Returns:
+            int: Value of the expression
+        """
+
+        precedence_key = tuple(sorted(precedence.items()))
+        frames = [[]]  # Tokens of the open groups, innermost last
+        for token in tokenize(expression):
+            if token == '(':
+                frames.append([])
+            elif token == ')':
+                if len(frames) == 1:
+                    raise ValueError('Unbalanced parentheses in: ' + expression)
+                group = frames.pop()
+                frames[-1].append(self._group_value(precedence_key, group, precedence, expression))
+            else:
+                frames[-1].append(token)
+        if len(frames) != 1:
+            raise ValueError('Unbalanced parentheses in: ' + expression)
+        return evaluate_postfix(_compile_tokens(frames[0], precedence, expression))
+
+    def _group_value(self, precedence_key: tuple, group: list, precedence: dict, expression: str):
+        """Value of a group without nested groups, from the LRU if present"""
+
+        key = (precedence_key, tuple(group))
+        values = self._values
+        value = values.get(key)
+        if value is not None:
+            values.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = evaluate_postfix(_compile_tokens(group, precedence, expression))
+        values[key] = value
+        if len(values) > self.maxsize:
+            values.popitem(last=False)
+        return value
+
+
+def configure_subexpression_cache(maxsize: int = None):
+    """Replace the process wide subexpression cache, which sum_expressions_file
+uses when no cache is passed (e.g. set up by batch pool workers)
+
+    Args:
+        maxsize (int, optional): Number of group values kept, None disables
+            the cache. Defaults to None.
+
+    Returns:
+        SubexpressionCache: The new cache, None if disabled
+    """
+
+    global SUBEXPRESSION_CACHE
+    SUBEXPRESSION_CACHE = None if maxsize is None else SubexpressionCache(maxsize)
+    return SUBEXPRESSION_CACHE
+
+
+def _sum_expressions_chunk(file_name: str, start: int, end: int, precedence: dict,
+                           cache_size: int = None):
+    """Sum the expressions of one byte range of a file (process pool task).
+With a cache size, groups are memoized in a cache of the worker process.
+
+    Returns:
+        tuple: (sum, lines read, cache hits, cache misses)
+    """
+
+    # zip draws from the counter only after each line, so it ends at the line count
+    counter = itertools.count()
+    lines = (line for line, _ in zip(read_lines_in_range(file_name, start, end), counter))
+    if cache_size is None:
+        return sum_expressions(lines, precedence), next(counter), 0, 0
+    cache = SUBEXPRESSION_CACHE
+    if cache is None or cache.maxsize != cache_size:
+        cache = configure_subexpression_cache(cache_size)
+    hits, misses = cache.hits, cache.misses
+    total = sum_expressions(lines, precedence, cache)
+    return total, next(counter), cache.hits - hits, cache.misses - misses
+
+
+def sum_expressions_file(expression_list_file: str, precedence: dict = EQUAL_PRECEDENCE,
+                         workers: int = 1, cache=None):
+    """Evaluate all expressions of a file and sum them. With workers > 1 the
+file is split into line aligned byte ranges that are evaluated by a process
+pool, and the partial sums are added up (same result as the serial path).
+Lines read are counted as parsed records of instrumented solvers, the serial
+path also times reading them as the parse phase.
+
+    Args:
+        expression_list_file (str): File with one expression per line
+        precedence (dict, optional): Precedence table. Defaults to EQUAL_PRECEDENCE.
+        workers (int, optional): Number of worker processes. Defaults to 1.
+        cache (SubexpressionCache, optional): Memoize parenthesized groups.
+            Worker processes use caches of the same size of their own, and
+            their hits and misses are added to the statistics of this cache.
+            Defaults to None.
+
+    Returns:
+        int: Sum of expression values
+    """
+
+    if cache is None:
+        cache = SUBEXPRESSION_CACHE
+    if workers <= 1:
+        return sum_expressions(read_expression_lines(expression_list_file), precedence, cache)
+
+    # A few chunks per worker keeps the pool busy when line lengths vary
+    chunks = byte_range_chunks(expression_list_file, 4*workers)
+    cache_size = None if cache is None else cache.maxsize
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_sum_expressions_chunk, expression_list_file,
+                                   start, end, precedence, cache_size)
+                   for start, end in chunks]
+        total = 0
+        for future in futures:
+            chunk_total, lines, hits, misses = future.result()
+            total += chunk_total
+            add_records(lines)
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+        return total
@@ -0,0 +1,265 @@
+"""
+.. module:: instrumentation
+   :synopsis: Opt-in per solver metrics. Solvers decorated with instrumented
+   record calls, errors, parse time (time spent in parse_phase loaders),
+   compute time, parsed records and, optionally, peak python allocations.
+   Metrics are exported as JSON or in the Prometheus text format (e.g. for
+   the node_exporter textfile collector). When disabled, the decorator costs a
+   single flag check per solver call. Enable it with enable() or by setting
+   the RWDI_METRICS environment variable (RWDI_METRICS=alloc also traces
+   allocations with tracemalloc, which slows solvers down).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+METRIC_PREFIX = 'rwdi_solver'
+
+# Metric name -> (Prometheus type, help text)
+METRIC_TYPES = {
+    'calls': ('counter', 'Number of solver calls'),
+    'errors': ('counter', 'Number of solver calls that raised'),
+    'parse_seconds': ('counter', 'Time spent loading parsed inputs'),
+    'compute_seconds': ('counter', 'Time spent outside of input loading'),
+    'records': ('counter', 'Number of parsed input records'),
+    'peak_allocated_bytes': ('gauge', 'Largest peak of traced python allocations of a call'),
+}
+
+_enabled = False
+_trace_allocations = False
+_metrics = {}
+_local = threading.local()
+
+
+def enable(trace_allocations: bool = False):
+    """Start recording metrics of instrumented solvers
+
+    Args:
+        trace_allocations (bool, optional): Also record peak allocations with
+            tracemalloc. Defaults to False.
+    """
+
+    global _enabled, _trace_allocations
+    _enabled = True
+    _trace_allocations = trace_allocations
+    if trace_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    """Stop recording metrics (recorded metrics are kept)"""
+
+    global _enabled, _trace_allocations
+    _enabled = False
+    if _trace_allocations and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_allocations = False
+
+
+def is_enabled():
+    """True if metrics are being recorded"""
+
+    return _enabled
+
+
+def reset():
+    """Drop all recorded metrics"""
+
+    _metrics.clear()
+
+
+def metrics():
+    """Recorded metrics
+
+    Returns:
+        dict: solver name -> dict of metric name -> value
+    """
+
+    return {solver: dict(values) for solver, values in sorted(_metrics.items())}
+
+
+def _solver_metrics(solver_name: str):
+    """Metrics dict of a solver, created on first use"""
+
+    values = _metrics.get(solver_name)
+    if values is None:
+        values = _metrics[solver_name] = dict.fromkeys(METRIC_TYPES, 0)
+    return values
+
+
+def record_count(value):
+    """Number of records of a parsed input: its integer records attribute
+(e.g. for aggregates computed while parsing), its length, or the length of
+its first column for a tuple of columns, None if unknown"""
+
+    records = getattr(value, 'records', None)
+    if isinstance(records, int):
+        return records
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+class _Call:
+    """Metrics of one running solver call"""
+
+    __slots__ = ('parse_seconds', 'records')
+
+    def __init__(self):
+        self.parse_seconds = 0.0
+        self.records = 0
+
+
+def _running_call():
+    """Metrics of the innermost running instrumented call, None if none"""
+
+    calls = getattr(_local, 'calls', None)
+    return calls[-1] if _enabled and calls else None
+
+
+def add_records(count: int):
+    """Add records to the running instrumented call, for inputs parsed outside
+of parse_phase loaders (e.g. by worker processes)"""
+
+    call = _running_call()
+    if call is not None:
+        call.records += count
+
+
+def _timed_records(records, call: _Call):
+    """Generator passing records through, timing their production as parse
+time of call and counting them"""
+
+    records = iter(records)
+    while True:
+        start = time.perf_counter()
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        finally:
+            call.parse_seconds += time.perf_counter() - start
+        call.records += 1
+        yield record
+
+
+def parse_phase(loader):
+    """Decorator timing an input loader (e.g. taking a file name) as the parse
+phase of the running instrumented solver, and counting its records. Loaders
+returning an iterator (streamed records) are timed and counted as the
+records are consumed."""
+
+    @functools.wraps(loader)
+    def wrapper(*args, **kwargs):
+        call = _running_call()
+        if call is None:
+            return loader(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            value = loader(*args, **kwargs)
+        finally:
+            call.parse_seconds += time.perf_counter() - start
+        if isinstance(value, Iterator):
+            return _timed_records(value, call)
+        call.records += record_count(value) or 0
+        return value
+
+    return wrapper
+
+
+def instrumented(solver):
+    """Decorator recording the metrics of a solver while instrumentation is
+enabled, metrics are keyed by the solver name"""
+
+    name = solver.__name__
+
+    @functools.wraps(solver)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return solver(*args, **kwargs)
+
+        calls = getattr(_local, 'calls', None)
+        if calls is None:
+            calls = _local.calls = []
+        call = _Call()
+        calls.append(call)
+        trace = _trace_allocations and tracemalloc.is_tracing()
+        if trace:
+            baseline = tracemalloc.get_traced_memory()[0]
+            if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                tracemalloc.reset_peak()
+        values = _solver_metrics(name)
+        start = time.perf_counter()
+        try:
+            return solver(*args, **kwargs)
+        except Exception:
+            values['errors'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            calls.pop()
+            values['calls'] += 1
+            values['parse_seconds'] += call.parse_seconds
+            values['compute_seconds'] += elapsed - call.parse_seconds
+            values['records'] += call.records
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                values['peak_allocated_bytes'] = max(values['peak_allocated_bytes'], peak)
+
+    return wrapper
+
+
+def to_json():
+    """Recorded metrics as a JSON document"""
+
+    return json.dumps(metrics(), indent=2, sort_keys=True)
+
+
+def to_prometheus():
+    """Recorded metrics in the Prometheus text exposition format"""
+
+    recorded = metrics()
+    lines = []
+    for metric, (metric_type, help_text) in METRIC_TYPES.items():
+        full_name = '%s_%s' % (METRIC_PREFIX, metric)
+        if metric_type == 'counter':
+            full_name += '_total'
+        lines.append('# HELP %s %s' % (full_name, help_text))
+        lines.append('# TYPE %s %s' % (full_name, metric_type))
+        for solver, values in recorded.items():
+            lines.append('%s{solver="%s"} %s' % (full_name, solver, _format_value(values[metric])))
+    return '\n'.join(lines) + '\n'
+
+
+def _format_value(value):
+    """Prometheus sample value"""
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def write_metrics(file_name: str):
+    """Write recorded metrics, in Prometheus text format for .prom files and
+as JSON otherwise. The file is replaced atomically so a textfile collector
+never reads a partial file.
+
+    Args:
+        file_name (str): Output file
+    """
+
+    text = to_prometheus() if file_name.endswith('.prom') else to_json()
+    temp_name = '%s.%d.tmp' % (file_name, os.getpid())
+    with open(temp_name, 'w') as f:
+        f.write(text)
+    os.replace(temp_name, file_name)
+
+
+if os.environ.get('RWDI_METRICS', '0') not in ('', '0'):
+    enable(trace_allocations=os.environ['RWDI_METRICS'] == 'alloc')
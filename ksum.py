@@ -0,0 +1,196 @@
+"""
+.. module:: ksum
+   :synopsis: Module with a general k-sum engine used by the expense report
+   questions (day 1). A hash-set path is used for pairs and a sorted
+   two-pointer path is used for three or more items. A NumPy variant is
+   provided for very large expense reports, if NumPy is installed.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+def two_sum(values: list, target: int):
+    """Find two items (at different positions) in a list that sum to target
+using a single pass over the list and a hash set
+
+    Args:
+        values (iterable): Integers
+        target (int): The sum value
+
+    Returns:
+        tuple: The two items that sum to target, or None if no such pair exists
+    """
+
+    seen = set()
+    for value in values:
+        if target - value in seen:
+            return target - value, value
+        seen.add(value)
+    return None
+
+
+def _k_sum_sorted(sorted_values: list, start: int, target: int, k: int):
+    """Recursive sorted k-sum search that ends in a two-pointer scan"""
+
+    n = len(sorted_values)
+    if n - start < k:
+        return None
+    if k == 2:
+        lo, hi = start, n - 1
+        while lo < hi:
+            pair_sum = sorted_values[lo] + sorted_values[hi]
+            if pair_sum == target:
+                return sorted_values[lo], sorted_values[hi]
+            elif pair_sum < target:
+                lo += 1
+            else:
+                hi -= 1
+        return None
+
+    for i in range(start, n - k + 1):
+        # Skip repeated values, they lead to the same sub-problem
+        if i > start and sorted_values[i] == sorted_values[i - 1]:
+            continue
+        item = sorted_values[i]
+        # Prune when even the smallest/largest possible sums miss target
+        if item + sum(sorted_values[i + 1:i + k]) > target:
+            break
+        if item + sum(sorted_values[n - k + 1:]) < target:
+            continue
+        found = _k_sum_sorted(sorted_values, i + 1, target - item, k - 1)
+        if found is not None:
+            return (item,) + found
+    return None
+
+
+def k_sum(values: list, target: int, k: int):
+    """Find k items (at different positions) in a list that sum to target.
+Pairs (k=2) are found with a hash set in O(n). For k >= 3 the list is sorted
+once and searched with a two-pointer scan in O(n^(k-1)).
+
+    Args:
+        values (iterable): Integers
+        target (int): The sum value
+        k (int): Number of items that must sum to target
+
+    Returns:
+        tuple: The k items that sum to target, or None if none exist
+    """
+
+    if k < 1:
+        raise ValueError('k must be a positive integer')
+    if k == 2:
+        # Single pass, so values may also be a (streamed) iterable
+        return two_sum(values, target)
+    values = list(values)
+    if len(values) < k:
+        return None
+    if k == 1:
+        return (target,) if target in set(values) else None
+    return _k_sum_sorted(sorted(values), 0, target, k)
+
+
+def k_sum_numpy(values, target: int, k: int):
+    """NumPy variant of k_sum. The last two items are found with a vectorized
+binary search (searchsorted) over the sorted array, so each of the
+O(n^(k-2)) outer combinations costs a single vectorized call.
+
+    Args:
+        values (array like): Integers
+        target (int): The sum value
+        k (int): Number of items that must sum to target
+
+    Returns:
+        tuple: The k items that sum to target, or None if none exist
+    """
+
+    if np is None:
+        raise ImportError('k_sum_numpy requires NumPy')
+    if k < 2:
+        return k_sum(list(values), target, k)
+    arr = np.sort(np.asarray(values, dtype=np.int64))
+    return _k_sum_numpy_sorted(arr, 0, target, k)
+
+
+def _k_sum_numpy_sorted(arr, start: int, target: int, k: int):
+    """Recursive helper of k_sum_numpy working on a sorted array"""
+
+    n = arr.shape[0]
+    if n - start < k:
+        return None
+    if k == 2:
+        rest = arr[start:]
+        complements = target - rest
+        left = np.searchsorted(rest, complements, side='left')
+        right = np.searchsorted(rest, complements, side='right')
+        # A partner must exist and must sit at a later position
+        hits = (right > left) & (right - 1 > np.arange(rest.shape[0]))
+        found = np.flatnonzero(hits)
+        if found.size == 0:
+            return None
+        i = int(found[0])
+        return int(rest[i]), int(complements[i])
+
+    for i in range(start, n - k + 1):
+        if i > start and arr[i] == arr[i - 1]:
+            continue
+        item = int(arr[i])
+        found = _k_sum_numpy_sorted(arr, i + 1, target - item, k - 1)
+        if found is not None:
+            return (item,) + found
+    return None
+
+
+class PairSumAccumulator:
+    """Online two-sum over an append-only stream of values. Values are kept in
+a hash set, so each new value is checked against all earlier ones in O(1) and
+the first matching pair is reported as soon as its second item arrives.
+
+    Args:
+        target (int): The sum value
+    """
+
+    def __init__(self, target: int):
+        self.target = target
+        self.pair = None
+        self.count = 0
+        self._seen = set()
+
+    def add(self, value: int):
+        """Ingest one value
+
+        Args:
+            value (int): New value
+
+        Returns:
+            tuple: The first pair summing to target, if this value completes
+                it, else None
+        """
+
+        self.count += 1
+        if self.pair is None and self.target - value in self._seen:
+            self.pair = (self.target - value, value)
+            return self.pair
+        self._seen.add(value)
+        return None
+
+    def extend(self, values):
+        """Ingest a batch of values
+
+        Args:
+            values (iterable): New values
+
+        Returns:
+            tuple: The first pair summing to target, if found in this batch,
+                else None
+        """
+
+        found = None
+        for value in values:
+            pair = self.add(value)
+            if pair is not None:
+                found = pair
+        return found
@@ -0,0 +1,255 @@
+"""
+.. module:: memory_game
+   :synopsis: Module with engines for the memory game sequence (day 15). The
+   compact engines store the last seen turn of each number in a preallocated
+   uint32 buffer indexed by the number itself, instead of a dict. Long runs
+   can report progress and periodically snapshot their state (turn, previous
+   number and the turn buffer, dumped in bulk) to a checkpoint file to resume
+   from.
+"""
+
+import os
+import struct
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+BACKENDS = ('dict', 'array', 'numpy')
+MAX_TURN = 2**32 - 1
+
+# Checkpoint header: magic, version, number of starting numbers, end turn,
+# next turn, previous number. Starting numbers (uint64) and the uint32 turn
+# buffer follow.
+CHECKPOINT_MAGIC = b'MGCP'
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct('<4sHIQQQ')
+PROGRESS_EVERY = 10**6
+CHECKPOINT_EVERY = 10**8
+
+
+def allocate_turn_buffer(size: int, backend: str = 'array'):
+    """Allocate a zeroed uint32 buffer of last seen turns
+
+    Args:
+        size (int): Number of entries
+        backend (str, optional): 'array' (array('I')) or 'numpy' (np.zeros,
+            accessed through a memoryview). Defaults to 'array'.
+
+    Returns:
+        array like: Zeroed buffer supporting item access
+    """
+
+    if backend == 'array':
+        # Repeating a one item array avoids a temporary of the buffer's size
+        return array('I', [0])*size
+    if backend == 'numpy':
+        if np is None:
+            raise ImportError('numpy backend requires NumPy')
+        # np.zeros gets zeroed pages lazily from the OS and the memoryview
+        # gives plain python ints on item access
+        return memoryview(np.zeros(size, dtype=np.uint32))
+    raise ValueError('Unknown buffer backend: ' + str(backend))
+
+
+def play_memory_game(starting_numbers: list, end_turn: int, backend: str = 'array',
+                     checkpoint_file: str = None, checkpoint_every: int = CHECKPOINT_EVERY,
+                     progress=None, progress_every: int = PROGRESS_EVERY):
+    """Play the memory game and return the number spoken at end_turn
+
+    Args:
+        starting_numbers (list): Starting sequence
+        end_turn (int): Ending turn number
+        backend (str, optional): Last seen turn store, one of 'dict', 'array'
+            or 'numpy'. Defaults to 'array'.
+        checkpoint_file (str, optional): Checkpoint to resume from if it
+            exists, and to save the game state to every checkpoint_every
+            turns ('array' and 'numpy' backends). Defaults to None.
+        checkpoint_every (int, optional): Turns between checkpoints.
+            Defaults to CHECKPOINT_EVERY.
+        progress (callable, optional): Called as progress(turn, end_turn,
+            turns_per_second) every progress_every turns ('array' and
+            'numpy' backends). Defaults to None.
+        progress_every (int, optional): Turns between progress calls.
+            Defaults to PROGRESS_EVERY.
+
+    Returns:
+        int: Number spoken at end_turn
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend: ' + str(backend))
+    if not starting_numbers or end_turn < 1:
+        raise ValueError('Need starting numbers and a positive end turn')
+    if end_turn <= len(starting_numbers):
+        return starting_numbers[end_turn - 1]
+    if backend == 'dict':
+        if checkpoint_file is not None or progress is not None:
+            raise ValueError('Checkpoints and progress need a turn buffer backend')
+        return _play_dict(starting_numbers, end_turn)
+    if end_turn > MAX_TURN:
+        raise ValueError('end_turn too large for a uint32 turn buffer')
+
+    state = None
+    if checkpoint_file is not None:
+        state = load_checkpoint(checkpoint_file, starting_numbers, end_turn, backend)
+    if state is None:
+        state = _start_game(starting_numbers, end_turn, backend)
+    next_turn, prev_number, last_seen = state
+    if checkpoint_file is None and progress is None:
+        return _play_turns(last_seen, next_turn, end_turn, prev_number)
+
+    # Play in segments, with progress reports and checkpoints in between
+    step = min(checkpoint_every if checkpoint_file is not None else end_turn,
+               progress_every if progress is not None else end_turn)
+    last_checkpoint = next_turn
+    start_turn, start = next_turn, time.perf_counter()
+    while next_turn < end_turn:
+        stop = min(end_turn, next_turn + max(step, 1))
+        prev_number = _play_turns(last_seen, next_turn, stop, prev_number)
+        next_turn = stop
+        if checkpoint_file is not None and next_turn - last_checkpoint >= checkpoint_every \
+                and next_turn < end_turn:
+            save_checkpoint(checkpoint_file, starting_numbers, end_turn, next_turn, prev_number, last_seen)
+            last_checkpoint = next_turn
+        if progress is not None:
+            elapsed = time.perf_counter() - start
+            progress(next_turn, end_turn, (next_turn - start_turn)/elapsed if elapsed else float('inf'))
+    return prev_number
+
+
+def _start_game(starting_numbers: list, end_turn: int, backend: str):
+    """Turn buffer after the starting numbers
+
+    Returns:
+        tuple: (next turn, number spoken at next turn, turn buffer)
+    """
+
+    # Every number spoken after the starting ones is a turn difference, so it
+    # is smaller than end_turn. Only starting numbers can be larger, and
+    # those are kept in a small dict.
+    last_seen = allocate_turn_buffer(end_turn, backend)
+    sparse = {}
+    for turn, number in enumerate(starting_numbers[:-1], 1):
+        if number < end_turn:
+            last_seen[number] = turn
+        else:
+            sparse[number] = turn
+
+    turn = len(starting_numbers)
+    prev_number = starting_numbers[-1]
+    if prev_number < end_turn:
+        seen = last_seen[prev_number]
+        last_seen[prev_number] = turn
+    else:
+        seen = sparse.get(prev_number, 0)
+    prev_number = turn - seen if seen else 0
+    return turn + 1, prev_number, last_seen
+
+
+def _play_turns(last_seen, start_turn: int, stop_turn: int, prev_number: int):
+    """Play turns start_turn to stop_turn - 1, where prev_number is spoken at
+start_turn, and return the number spoken at stop_turn"""
+
+    for turn in range(start_turn, stop_turn):
+        seen = last_seen[prev_number]
+        last_seen[prev_number] = turn
+        prev_number = turn - seen if seen else 0
+    return prev_number
+
+
+def save_checkpoint(checkpoint_file: str, starting_numbers: list, end_turn: int,
+                    next_turn: int, prev_number: int, last_seen):
+    """Snapshot a game to a binary file. The turn buffer is written with a
+single bulk write, and the file is replaced atomically.
+
+    Args:
+        checkpoint_file (str): Checkpoint file name
+        starting_numbers (list): Starting sequence
+        end_turn (int): Ending turn number
+        next_turn (int): Turn at which prev_number is spoken
+        prev_number (int): Number spoken at next_turn
+        last_seen (array like): uint32 turn buffer
+    """
+
+    temp_file = '%s.%d.tmp' % (checkpoint_file, os.getpid())
+    with open(temp_file, 'wb') as f:
+        f.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(starting_numbers),
+                                       end_turn, next_turn, prev_number))
+        f.write(array('Q', starting_numbers).tobytes())
+        f.write(last_seen)
+    os.replace(temp_file, checkpoint_file)
+
+
+def load_checkpoint(checkpoint_file: str, starting_numbers: list, end_turn: int,
+                    backend: str = 'array'):
+    """Load a game snapshot written by save_checkpoint
+
+    Args:
+        checkpoint_file (str): Checkpoint file name
+        starting_numbers (list): Starting sequence, must match the snapshot
+        end_turn (int): Ending turn number, must match the snapshot
+        backend (str, optional): Turn buffer backend. Defaults to 'array'.
+
+    Returns:
+        tuple: (next turn, number spoken at next turn, turn buffer), or None
+            if the checkpoint file does not exist
+    """
+
+    try:
+        f = open(checkpoint_file, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        header = f.read(CHECKPOINT_HEADER.size)
+        if len(header) < CHECKPOINT_HEADER.size:
+            raise ValueError('Truncated memory game checkpoint: ' + checkpoint_file)
+        magic, version, n_starting, saved_end_turn, next_turn, prev_number = CHECKPOINT_HEADER.unpack(header)
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError('Not a memory game checkpoint: ' + checkpoint_file)
+        saved_numbers = array('Q', f.read(8*n_starting)).tolist()
+        if saved_numbers != list(starting_numbers) or saved_end_turn != end_turn:
+            raise ValueError('Checkpoint is of another game: ' + checkpoint_file)
+        last_seen = allocate_turn_buffer(end_turn, backend)
+        if f.readinto(last_seen) != 4*end_turn:
+            raise ValueError('Truncated memory game checkpoint: ' + checkpoint_file)
+    return next_turn, prev_number, last_seen
+
+
+def _play_dict(starting_numbers: list, end_turn: int):
+    """Dict based engine (reference implementation)"""
+
+    last_seen = {}
+    for turn, number in enumerate(starting_numbers[:-1], 1):
+        last_seen[number] = turn
+    prev_number = starting_numbers[-1]
+    for turn in range(len(starting_numbers), end_turn):
+        seen = last_seen.get(prev_number, 0)
+        last_seen[prev_number] = turn
+        prev_number = turn - seen if seen else 0
+    return prev_number
+
+
+def benchmark_backends(starting_numbers: list, end_turn: int, backends: tuple = BACKENDS):
+    """Time the memory game engines against each other
+
+    Args:
+        starting_numbers (list): Starting sequence
+        end_turn (int): Ending turn number
+        backends (tuple, optional): Backends to time. Defaults to BACKENDS.
+
+    Returns:
+        dict: backend -> (result, seconds)
+    """
+
+    timings = {}
+    for backend in backends:
+        if backend == 'numpy' and np is None:
+            continue
+        start = time.perf_counter()
+        result = play_memory_game(starting_numbers, end_turn, backend)
+        timings[backend] = (result, time.perf_counter() - start)
+    return timings
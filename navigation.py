@@ -0,0 +1,205 @@
+"""
+.. module:: navigation
+   :synopsis: Module with a ship navigation simulator (day 12). Positions and
+   headings are integer (east, north) pairs and turns are rotations by
+   quarter turns, so coordinates stay exact however far the ship travels.
+   With NumPy, the instruction file is parsed in bulk into opcode/argument
+   arrays and simulated with int64 cumulative sums instead of a per
+   instruction loop, unless the arguments allow coordinates beyond int64 (the
+   loop uses python ints).
+"""
+
+import re
+
+from record_readers import line_bounds, map_line_windows, parse_uint_fields, printable_counts, read_lines, strip_bounds
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+MOVES = {'N': (0, 1), 'S': (0, -1), 'E': (1, 0), 'W': (-1, 0)}
+TURNS = {'L': 1, 'R': -1}  # Counterclockwise quarter turns per 90 degrees
+SHIP_HEADING = (1, 0)  # Ship starts facing east
+WAYPOINT_START = (10, 1)  # Waypoint starts 10 east, 1 north of the ship
+
+# Instruction lines: an opcode and a 1 to 18 digit argument, surrounded by
+# optional whitespace (as parse_instruction_bytes parses them)
+INSTRUCTION_RE = re.compile(r'\s*(\S)([0-9]{1,18})\s*$')
+
+# Bound on the coordinates of the vectorized simulation, with a margin for the
+# float64 estimate of the bound
+INT64_SAFE_BOUND = 2.0**62
+
+# Cosine and sine of k counterclockwise quarter turns
+QUARTER_COS = (1, 0, -1, 0)
+QUARTER_SIN = (0, 1, 0, -1)
+
+
+def parse_instructions(nav_instructions_file: str):
+    """Parse a navigation file into opcode and argument sequences
+
+    Args:
+        nav_instructions_file (str): Navigation file
+
+    Returns:
+        tuple: (opcodes, arguments), uint8 and int64 NumPy arrays if NumPy is
+            installed, else a str and a list of int
+    """
+
+    if np is None:
+        opcodes = []
+        arguments = []
+        for line in read_lines(nav_instructions_file, skip_blank=True):
+            match = INSTRUCTION_RE.match(line)
+            if match is None:
+                raise ValueError('Navigation instruction without integer argument')
+            opcodes.append(match.group(1))
+            arguments.append(int(match.group(2)))
+        return ''.join(opcodes), arguments
+
+    parsed = list(map_line_windows(nav_instructions_file, parse_instruction_bytes))
+    if not parsed:
+        return np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int64)
+    return np.concatenate([x[0] for x in parsed]), np.concatenate([x[1] for x in parsed])
+
+
+def parse_instruction_bytes(data):
+    """Vectorized parser of a byte buffer of navigation instructions: record
+boundaries come from a newline scan and arguments are parsed from their digit
+bytes. Lines follow the INSTRUCTION_RE grammar.
+
+    Args:
+        data (array like): uint8 buffer with one instruction (e.g. 'F10') per line
+
+    Returns:
+        tuple: (opcodes, arguments) as uint8 and int64 NumPy arrays
+    """
+
+    data = np.asarray(data, dtype=np.uint8)
+    starts, ends = line_bounds(data)
+    printable = printable_counts(data)
+    keep = printable[ends] > printable[starts]  # Skip blank lines
+    starts, ends = strip_bounds(printable, starts[keep], ends[keep])
+    opcodes = data[starts]
+    try:
+        arguments = parse_uint_fields(data, starts + 1, ends)
+    except ValueError:
+        raise ValueError('Navigation instruction without integer argument') from None
+    return opcodes, arguments
+
+
+def navigate(opcodes, arguments, waypoint: bool = False):
+    """Simulate navigation instructions and return the final ship position
+
+    Args:
+        opcodes (sequence): Instruction letters (str or uint8 array)
+        arguments (sequence): Instruction arguments
+        waypoint (bool, optional): Use waypoint semantics (N/S/E/W/L/R move
+            and turn the waypoint, F moves towards it). Defaults to False.
+
+    Returns:
+        tuple: Final (east, north) ship position as ints
+    """
+
+    if np is not None and isinstance(opcodes, np.ndarray):
+        return _navigate_vectorized(opcodes, arguments, waypoint)
+
+    east, north = 0, 0
+    heading_east, heading_north = WAYPOINT_START if waypoint else SHIP_HEADING
+    for opcode, argument in zip(opcodes, arguments):
+        if opcode == 'F':
+            east += heading_east*argument
+            north += heading_north*argument
+        elif opcode in MOVES:
+            move_east, move_north = MOVES[opcode]
+            if waypoint:
+                heading_east += move_east*argument
+                heading_north += move_north*argument
+            else:
+                east += move_east*argument
+                north += move_north*argument
+        elif opcode in TURNS:
+            turns = TURNS[opcode]*_quarter_turns(argument) % 4
+            heading_east, heading_north = _rotate(heading_east, heading_north, turns)
+        else:
+            raise ValueError('Unknown navigation instruction: ' + str(opcode))
+    return east, north
+
+
+def _quarter_turns(degrees):
+    """Number of quarter turns in a rotation given in degrees"""
+
+    if degrees % 90:
+        raise ValueError('Turns must be multiples of 90 degrees')
+    return int(degrees // 90) % 4
+
+
+def _rotate(east, north, turns):
+    """Rotate vectors (ints or int arrays) by counterclockwise quarter turns"""
+
+    if np is not None and isinstance(turns, np.ndarray):
+        cos, sin = np.array(QUARTER_COS)[turns], np.array(QUARTER_SIN)[turns]
+    else:
+        cos, sin = QUARTER_COS[turns], QUARTER_SIN[turns]
+    return east*cos - north*sin, east*sin + north*cos
+
+
+def _navigate_vectorized(opcodes, arguments, waypoint: bool):
+    """NumPy implementation of navigate for uint8 opcode arrays"""
+
+    arguments = np.asarray(arguments, dtype=np.int64)
+    if (arguments[(opcodes == ord('L')) | (opcodes == ord('R'))] % 90).any():
+        raise ValueError('Turns must be multiples of 90 degrees')
+    known = np.zeros(256, dtype=bool)
+    known[[ord(x) for x in 'NSEWLRF']] = True
+    if not known[opcodes].all():
+        raise ValueError('Unknown navigation instruction')
+
+    # Bound every coordinate (and partial sum) of the simulation, headings
+    # are unit vectors and the waypoint grows by at most the moves
+    magnitudes = np.abs(arguments).astype(np.float64)
+    is_forward = opcodes == ord('F')
+    forward_total = magnitudes[is_forward].sum()
+    move_total = magnitudes[~is_forward & ~(opcodes == ord('L')) & ~(opcodes == ord('R'))].sum()
+    if waypoint:
+        bound = forward_total*(sum(map(abs, WAYPOINT_START)) + move_total)
+    else:
+        bound = forward_total + move_total
+    if bound >= INT64_SAFE_BOUND:
+        # int64 could wrap around, the loop on python ints stays exact
+        return navigate(opcodes.tobytes().decode('latin-1'), arguments.tolist(), waypoint)
+
+    # Counterclockwise quarter turns of each instruction (mod 4, so their sum
+    # can not overflow), and cumulative rotation after each instruction
+    quarter_turns = np.where(opcodes == ord('L'), arguments // 90,
+                             np.where(opcodes == ord('R'), -(arguments // 90), 0)) % 4
+    rotation = np.cumsum(quarter_turns) % 4
+
+    # Translation of each N/S/E/W instruction
+    east_table = np.zeros(256, dtype=np.int64)
+    north_table = np.zeros(256, dtype=np.int64)
+    for opcode, (move_east, move_north) in MOVES.items():
+        east_table[ord(opcode)] = move_east
+        north_table[ord(opcode)] = move_north
+    move_east = east_table[opcodes]*arguments
+    move_north = north_table[opcodes]*arguments
+    forward = np.where(opcodes == ord('F'), arguments, 0)
+
+    if not waypoint:
+        heading_east, heading_north = _rotate(*SHIP_HEADING, rotation)
+        return (int(move_east.sum() + (forward*heading_east).sum()),
+                int(move_north.sum() + (forward*heading_north).sum()))
+
+    # Waypoint after instruction i: R_i(w0 + sum_{k<=i} R_k^-1(d_k)), where R
+    # is the cumulative rotation
+    unrotated_east, unrotated_north = _rotate(move_east, move_north, -rotation % 4)
+    waypoint_east, waypoint_north = _rotate(WAYPOINT_START[0] + np.cumsum(unrotated_east),
+                                            WAYPOINT_START[1] + np.cumsum(unrotated_north), rotation)
+    return int((forward*waypoint_east).sum()), int((forward*waypoint_north).sum())
+
+
+def manhattan_distance(position: tuple):
+    """Manhattan distance of an (east, north) position from the origin"""
+
+    return abs(position[0]) + abs(position[1])
@@ -0,0 +1,205 @@
+"""
+.. module:: number_theory
+   :synopsis: Module with modular arithmetic helpers used by the challenge
+   questions, e.g. the baby-step giant-step discrete log solver used to crack
+   the card/door handshake (day 25).
+"""
+
+import math
+from functools import lru_cache
+
+
+def extended_gcd(a: int, b: int):
+    """Extended Euclidean algorithm
+
+    Args:
+        a (int): First integer
+        b (int): Second integer
+
+    Returns:
+        tuple: (g, x, y) with g = gcd(a, b) = a*x + b*y
+    """
+
+    old_r, r = a, b
+    old_x, x = 1, 0
+    old_y, y = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q*r
+        old_x, x = x, old_x - q*x
+        old_y, y = y, old_y - q*y
+    return old_r, old_x, old_y
+
+
+def mod_inverse(a: int, mod: int):
+    """Modular multiplicative inverse
+
+    Args:
+        a (int): Integer to invert
+        mod (int): Modulus
+
+    Returns:
+        int: x with a*x = 1 (mod mod)
+    """
+
+    g, x, _ = extended_gcd(a % mod, mod)
+    if g != 1:
+        raise ValueError('%d has no inverse modulo %d' % (a, mod))
+    return x % mod
+
+
+def mod_pow(base: int, exp: int, mod: int):
+    """Fast modular exponentiation (square and multiply), negative exponents
+are supported through the modular inverse
+
+    Args:
+        base (int): Base
+        exp (int): Exponent
+        mod (int): Modulus
+
+    Returns:
+        int: base**exp % mod
+    """
+
+    if exp < 0:
+        return pow(mod_inverse(base, mod), -exp, mod)
+    return pow(base, exp, mod)
+
+
+def _ceil_sqrt(n: int):
+    """Smallest integer m with m*m >= n"""
+
+    m = int(math.sqrt(n))
+    while m*m < n:
+        m += 1
+    while m > 0 and (m - 1)*(m - 1) >= n:
+        m -= 1
+    return m
+
+
+class BabyStepTable:
+    """Precomputed baby steps {base**j % mod: j} for j < step_size. A single
+table answers discrete log queries for any number of targets with the same
+base and modulus in O(sqrt(order)) multiplications each.
+
+    Args:
+        base (int): Base (generator)
+        mod (int): Modulus
+        order (int, optional): Upper bound of the order of base. Defaults to
+            mod - 1 (fine for prime moduli).
+    """
+
+    def __init__(self, base: int, mod: int, order: int = None):
+        self.base = base % mod
+        self.mod = mod
+        self.order = mod - 1 if order is None else order
+        self.step_size = _ceil_sqrt(max(self.order, 1))
+        self.baby_steps = {}
+        value = 1
+        for j in range(self.step_size):
+            # Keep the smallest exponent, so the smallest log is returned
+            if value not in self.baby_steps:
+                self.baby_steps[value] = j
+            value = value*self.base % mod
+        try:
+            # Multiplying by base**(-step_size) takes one giant step
+            self.giant_step = mod_inverse(value, mod)
+        except ValueError:
+            self.giant_step = None
+
+    def discrete_log(self, target: int):
+        """Find the smallest x with base**x = target (mod mod)
+
+        Args:
+            target (int): Target value
+
+        Returns:
+            int: Discrete log of target, None if it does not exist
+        """
+
+        mod = self.mod
+        baby_steps = self.baby_steps
+        value = target % mod
+        if self.giant_step is None:
+            return baby_steps.get(value)
+        for i in range(self.step_size + 1):
+            j = baby_steps.get(value)
+            if j is not None:
+                return i*self.step_size + j
+            value = value*self.giant_step % mod
+        return None
+
+
+@lru_cache(maxsize=32)
+def baby_step_table(base: int, mod: int):
+    """Cached BabyStepTable, shared between calls with the same base and mod
+
+    Args:
+        base (int): Base (generator)
+        mod (int): Modulus
+
+    Returns:
+        BabyStepTable: Precomputed table
+    """
+
+    return BabyStepTable(base, mod)
+
+
+def discrete_log(base: int, target: int, mod: int):
+    """Baby-step giant-step discrete log using a cached baby-step table
+
+    Args:
+        base (int): Base (generator)
+        target (int): Target value
+        mod (int): Modulus
+
+    Returns:
+        int: Smallest x with base**x = target (mod mod), None if none exists
+    """
+
+    return baby_step_table(base, mod).discrete_log(target)
+
+
+def discrete_logs(base: int, targets, mod: int):
+    """Discrete logs of a batch of targets, sharing one baby-step table
+
+    Args:
+        base (int): Base (generator)
+        targets (iterable): Target values
+        mod (int): Modulus
+
+    Returns:
+        list: Discrete log of each target (None where it does not exist)
+    """
+
+    table = baby_step_table(base, mod)
+    return [table.discrete_log(target) for target in targets]
+
+
+def crt(remainders, moduli):
+    """Generalized Chinese Remainder Theorem. Solves x = r_i (mod m_i) for all
+i, where the moduli need not be pairwise coprime.
+
+    Args:
+        remainders (iterable): Remainders r_i
+        moduli (iterable): Positive moduli m_i
+
+    Returns:
+        tuple: (x, lcm of moduli) with 0 <= x < lcm, or None if the system
+            has no solution
+    """
+
+    x, lcm = 0, 1
+    for r, m in zip(remainders, moduli):
+        if m <= 0:
+            raise ValueError('Moduli must be positive')
+        # Solve x + lcm*k = r (mod m) for k
+        g, p, _ = extended_gcd(lcm, m)
+        if (r - x) % g:
+            return None
+        step = m // g
+        k = (r - x) // g * p % step
+        x += lcm*k
+        lcm *= step
+        x %= lcm
+    return x, lcm
@@ -0,0 +1,169 @@
+"""
+.. module:: parse_cache
+   :synopsis: Module with a cache of parsed input files shared by the
+   question_X and question_X_bonus solvers. Entries are keyed by parser and
+   file identity (path, modification time and size, or optionally a content
+   hash), held in an in-memory LRU and optionally persisted as pickles on disk
+   so repeated runs over the same large file skip parsing entirely. Only
+   solver pairs that share a parsed input go through the cache, single use
+   solvers stream their input instead.
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from instrumentation import parse_phase
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_key(file_name: str, use_hash: bool = False):
+    """Identity of a file's current content
+
+    Args:
+        file_name (str): File name / path
+        use_hash (bool, optional): Use a SHA-1 of the content instead of the
+            path, modification time and size. Defaults to False.
+
+    Returns:
+        tuple: Hashable file key
+    """
+
+    if use_hash:
+        digest = hashlib.sha1()
+        with open(file_name, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return ('sha1', digest.hexdigest())
+    stat = os.stat(file_name)
+    return (os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size)
+
+
+class ParseCache:
+    """LRU cache of parsed files with an optional on-disk pickle store. The
+cache is safe to share between threads, files are parsed outside of its lock.
+
+    Args:
+        maxsize (int, optional): Number of parsed files kept in memory.
+            Defaults to 16.
+        disk_dir (str, optional): Directory of the pickle store, None to
+            disable it. Defaults to None.
+        use_hash (bool, optional): Key files by content hash. Defaults to False.
+    """
+
+    def __init__(self, maxsize: int = 16, disk_dir: str = None, use_hash: bool = False):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.use_hash = use_hash
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, parser, file_name: str):
+        """Parsed content of a file, parsing it only on a cache miss
+
+        Args:
+            parser (callable): Parser taking the file name
+            file_name (str): File name / path
+
+        Returns:
+            object: Parser output (shared between callers, do not modify it)
+        """
+
+        key = (parser.__module__, parser.__qualname__, file_key(file_name, self.use_hash))
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._load(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            value = parser(file_name)
+            self._store(key, value)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop all in-memory entries and reset statistics"""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def _disk_path(self, key: tuple):
+        """Pickle file of a cache key"""
+
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, digest + '.pickle')
+
+    def _load(self, key: tuple):
+        """Load an entry from the disk store, None if absent or stale"""
+
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value if stored_key == key else None
+
+    def _store(self, key: tuple, value):
+        """Write an entry to the disk store (atomically via a rename)"""
+
+        if self.disk_dir is None:
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._disk_path(key)
+        temp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+
+PARSE_CACHE = ParseCache()
+
+
+def configure_parse_cache(maxsize: int = 16, disk_dir: str = None, use_hash: bool = False):
+    """Replace the shared parse cache used by cached_parser functions
+
+    Args:
+        maxsize (int, optional): Number of parsed files kept in memory
+        disk_dir (str, optional): Directory of the pickle store
+        use_hash (bool, optional): Key files by content hash
+
+    Returns:
+        ParseCache: The new shared cache
+    """
+
+    global PARSE_CACHE
+    PARSE_CACHE = ParseCache(maxsize, disk_dir, use_hash)
+    return PARSE_CACHE
+
+
+def cached_parser(parser):
+    """Decorator routing a file parser (taking a file name) through the shared
+parse cache. Loading is timed as the parse phase of instrumented solvers."""
+
+    @functools.wraps(parser)
+    def wrapper(file_name: str):
+        return PARSE_CACHE.get(parser, file_name)
+
+    wrapper.uncached = parser
+    return parse_phase(wrapper)
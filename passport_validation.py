@@ -0,0 +1,334 @@
+"""
+.. module:: passport_validation
+   :synopsis: Module with a table driven passport validator (day 4). Field
+   rules are declared once in a rule table and compiled into a validator
+   object, which tracks valid fields of a passport in an integer bitmask.
+   Passport files are parsed once into a columnar store (dictionary encoded
+   field columns and a per passport presence bitmask) that serves presence,
+   validity and aggregate queries without re-parsing.
+"""
+
+import re
+from array import array
+from collections import Counter
+
+from record_readers import read_records
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+# Declarative rule table: field -> (pattern, bounds). A value is valid when
+# it fully matches pattern and, if bounds is a (min, max) tuple, the integer
+# in group 1 lies within bounds. If bounds is a dict, the (min, max) tuple is
+# selected by the unit captured in group 2.
+PASSPORT_RULES = {
+    'byr': (r'(\d{4})', (1920, 2002)),
+    'iyr': (r'(\d{4})', (2010, 2020)),
+    'eyr': (r'(\d{4})', (2020, 2030)),
+    'hgt': (r'(\d+)(cm|in)', {'cm': (150, 193), 'in': (59, 76)}),
+    'hcl': (r'#[0-9a-f]{6}', None),
+    'ecl': (r'amb|blu|brn|gry|grn|hzl|oth', None),
+    'pid': (r'\d{9}', None),
+}
+
+REQUIRED_FIELDS = ('byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid')
+PASSPORT_FIELDS = REQUIRED_FIELDS + ('cid',)
+
+
+class PassportValidator:
+    """Compiled passport validator. Each rule is compiled once, and every
+field that passes its rule sets one bit of the passport's field mask. A
+passport is valid when all required bits are set.
+
+    Args:
+        rules (dict, optional): Rule table. Defaults to PASSPORT_RULES.
+        required_fields (tuple, optional): Fields that must be valid.
+            Defaults to REQUIRED_FIELDS.
+    """
+
+    def __init__(self, rules: dict = PASSPORT_RULES,
+                 required_fields: tuple = REQUIRED_FIELDS):
+        self.rules = dict(rules)
+        self.required_fields = tuple(required_fields)
+        self._checks = {}
+        for bit, (field, (pattern, bounds)) in enumerate(self.rules.items()):
+            self._checks[field] = (1 << bit, re.compile(pattern).fullmatch, bounds)
+        self.required_mask = 0
+        for field in self.required_fields:
+            if field not in self._checks:
+                raise ValueError('No rule defined for required field: ' + field)
+            self.required_mask |= self._checks[field][0]
+
+    def check_field(self, field: str, value: str):
+        """Check a single passport field against its rule
+
+        Args:
+            field (str): Field name, e.g. 'byr'
+            value (str): Field value
+
+        Returns:
+            bool: True if field has a rule and value passes it
+        """
+
+        check = self._checks.get(field)
+        if check is None:
+            return False
+        _, matcher, bounds = check
+        match = matcher(value)
+        if match is None:
+            return False
+        if bounds is None:
+            return True
+        if isinstance(bounds, dict):
+            bounds = bounds.get(match.group(2))
+            if bounds is None:
+                return False
+        return bounds[0] <= int(match.group(1)) <= bounds[1]
+
+    def check(self, field: str, value: str):
+        """Bit of a passport field if its value passes the field's rule
+
+        Args:
+            field (str): Field name, e.g. 'byr'
+            value (str): Field value
+
+        Returns:
+            int: Bit of the field in field masks, 0 if the field has no rule
+                or value fails it
+        """
+
+        check = self._checks.get(field)
+        if check is None or not self.check_field(field, value):
+            return 0
+        return check[0]
+
+    def field_mask(self, record: list):
+        """Compute the bitmask of valid fields of a passport record
+
+        Args:
+            record (list): Lines of a passport record ('key:value' items)
+
+        Returns:
+            int: Bitmask with bits set for fields that pass their rule
+        """
+
+        mask = 0
+        checks = self._checks
+        for line in record:
+            for item in line.split():
+                field, _, value = item.partition(':')
+                check = checks.get(field)
+                if check is not None and not mask & check[0] \
+                        and self.check_field(field, value):
+                    mask |= check[0]
+        return mask
+
+    def is_valid(self, record: list):
+        """Check if passport record has all required fields with valid values
+
+        Args:
+            record (list): Lines of a passport record
+
+        Returns:
+            bool: True if passport is valid
+        """
+
+        required_mask = self.required_mask
+        return self.field_mask(record) & required_mask == required_mask
+
+    def count_valid(self, records):
+        """Count valid passports in a batch (e.g. streamed) of records
+
+        Args:
+            records (iterable): Passport records, each a list of lines
+
+        Returns:
+            int: Number of valid passports
+        """
+
+        required_mask = self.required_mask
+        field_mask = self.field_mask
+        return sum(1 for record in records
+                   if field_mask(record) & required_mask == required_mask)
+
+
+class PassportStore:
+    """Columnar store of passports. Every known field is a dictionary encoded
+column: an unsigned int array with one code per passport (0 if the field is
+absent) and the list of distinct values the codes refer to. A parallel array
+holds the presence bitmask of each passport (bit i for field i). Rules and
+queries are evaluated once per distinct value and broadcast over the codes.
+Columns hold the first occurrence of a repeated field, later occurrences are
+kept in repeated so validity matches PassportValidator.field_mask (a field is
+valid if any of its occurrences is).
+
+    Args:
+        records (iterable, optional): Passport records, each a list of lines
+        fields (tuple, optional): Known fields, others are ignored. Defaults
+            to PASSPORT_FIELDS.
+    """
+
+    def __init__(self, records=(), fields: tuple = PASSPORT_FIELDS):
+        self.fields = tuple(fields)
+        self.field_bits = {field: 1 << bit for bit, field in enumerate(self.fields)}
+        self.presence = array('I')
+        self.codes = {field: array('I') for field in self.fields}
+        self.values = {field: [None] for field in self.fields}  # code -> value
+        self._value_codes = {field: {} for field in self.fields}
+        self.repeated = {}  # (passport index, field) -> later values
+        self.extend(records)
+
+    @classmethod
+    def from_file(cls, passport_file: str, fields: tuple = PASSPORT_FIELDS):
+        """Parse a passport file (blank-line separated records) into a store"""
+
+        return cls(read_records(passport_file), fields)
+
+    def __len__(self):
+        return len(self.presence)
+
+    def add(self, record: list):
+        """Append a passport record (lines of 'key:value' items). The first
+occurrence of a repeated field goes in its column, later ones in repeated."""
+
+        found = {}
+        for line in record:
+            for item in line.split():
+                field, _, value = item.partition(':')
+                if field not in self.field_bits:
+                    continue
+                if field in found:
+                    self.repeated.setdefault((len(self), field), []).append(value)
+                else:
+                    found[field] = value
+        mask = 0
+        for field in self.fields:
+            value = found.get(field)
+            code = 0
+            if value is not None:
+                mask |= self.field_bits[field]
+                value_codes = self._value_codes[field]
+                code = value_codes.get(value)
+                if code is None:
+                    code = value_codes[value] = len(self.values[field])
+                    self.values[field].append(value)
+            self.codes[field].append(code)
+        self.presence.append(mask)
+
+    def extend(self, records):
+        """Append a batch of passport records"""
+
+        for record in records:
+            self.add(record)
+
+    def fields_mask(self, fields: tuple):
+        """Presence bitmask of a set of fields"""
+
+        mask = 0
+        for field in fields:
+            mask |= self.field_bits[field]
+        return mask
+
+    def column(self, field: str):
+        """Values of a field, one per passport (None where absent)"""
+
+        values = self.values[field]
+        return [values[code] for code in self.codes[field]]
+
+    def count_present(self, fields: tuple = REQUIRED_FIELDS):
+        """Count passports that have all given fields (question_4)
+
+        Args:
+            fields (tuple, optional): Fields that must be present. Defaults
+                to REQUIRED_FIELDS.
+
+        Returns:
+            int: Number of passports
+        """
+
+        return _count_mask_matches(self.presence, self.fields_mask(fields))
+
+    def count_by(self, field: str):
+        """Number of passports per value of a field (e.g. count by 'ecl')
+
+        Args:
+            field (str): Field name
+
+        Returns:
+            Counter: value -> count, absent fields are not counted
+        """
+
+        values = self.values[field]
+        if np is not None:
+            counts = np.bincount(np.asarray(self.codes[field]), minlength=len(values))
+            code_counts = enumerate(counts.tolist())
+        else:
+            code_counts = Counter(self.codes[field]).items()
+        return Counter({values[code]: count for code, count in code_counts if code and count})
+
+    def count_where(self, field: str, predicate):
+        """Count passports whose field value passes a predicate (evaluated
+once per distinct value), e.g. byr out of range
+
+        Args:
+            field (str): Field name
+            predicate (callable): Function of a field value returning bool
+
+        Returns:
+            int: Number of passports, absent fields never match
+        """
+
+        passes = [False] + [bool(predicate(value)) for value in self.values[field][1:]]
+        if np is not None:
+            return int(np.asarray(passes)[np.asarray(self.codes[field])].sum())
+        return sum(1 for code in self.codes[field] if passes[code])
+
+    def valid_masks(self, validator: PassportValidator):
+        """Bitmask of valid fields of every passport, as
+PassportValidator.field_mask computes it per record
+
+        Args:
+            validator (PassportValidator): Compiled validator
+
+        Returns:
+            array like: Masks (NumPy int64 array if NumPy is installed)
+        """
+
+        masks = np.zeros(len(self), dtype=np.int64) if np is not None else [0]*len(self)
+        for field in self.fields:
+            if field not in validator.rules:
+                continue
+            table = [0] + [validator.check(field, value) for value in self.values[field][1:]]
+            if np is not None:
+                masks |= np.asarray(table, dtype=np.int64)[np.asarray(self.codes[field])]
+            else:
+                masks = [mask | table[code] for mask, code in zip(masks, self.codes[field])]
+        for (index, field), values in self.repeated.items():
+            for value in values:
+                masks[index] |= validator.check(field, value)
+        return masks
+
+    def count_valid(self, validator: PassportValidator = None):
+        """Count passports whose required fields are all valid (question_4_bonus)
+
+        Args:
+            validator (PassportValidator, optional): Compiled validator.
+                Defaults to PassportValidator().
+
+        Returns:
+            int: Number of valid passports
+        """
+
+        validator = validator or PassportValidator()
+        return _count_mask_matches(self.valid_masks(validator), validator.required_mask)
+
+
+def _count_mask_matches(masks, required_mask: int):
+    """Number of masks with all bits of required_mask set"""
+
+    if np is not None:
+        masks = np.asarray(masks, dtype=np.int64)
+        return int(np.count_nonzero(masks & required_mask == required_mask))
+    return sum(1 for mask in masks if mask & required_mask == required_mask)
@@ -0,0 +1,167 @@
+"""
+.. module:: password_policy
+   :synopsis: Module with a columnar password policy validator (day 2). The
+   password list is parsed once with a compiled regex into columns, and both
+   policies (letter count range and XOR letter position) are evaluated over the
+   columns in a single pass. Memory-mapped files are evaluated with vectorized
+   NumPy operations on the raw bytes instead, one bounded window at a time.
+"""
+
+import re
+from collections import namedtuple
+
+from record_readers import (index_dtype, line_bounds, map_line_windows, parse_uint_fields, printable_counts, read_lines,
+                            strip_bounds)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+# Policy lines: leading and trailing whitespace and empty passwords are
+# allowed, fields are separated by exactly the spaces shown in '1-3 a: abcde'
+# (the one after the colon is optional). count_valid_passwords_bytes parses
+# the same grammar.
+POLICY_RE = re.compile(r'\s*([0-9]{1,18})-([0-9]{1,18}) (\S): ?(\S*)\s*$')
+
+PasswordColumns = namedtuple('PasswordColumns', ['firsts', 'seconds', 'letters', 'passwords'])
+PasswordCounts = namedtuple('PasswordCounts', ['range_valid', 'position_valid', 'records'])
+
+
+def parse_password_lines(lines):
+    """Parse password policy lines (e.g. '1-3 a: abcde') into columns
+
+    Args:
+        lines (iterable): Password policy lines, blank lines are skipped
+
+    Returns:
+        PasswordColumns: Columns of first/second numbers, letters and passwords
+    """
+
+    firsts, seconds, letters, passwords = [], [], [], []
+    match = POLICY_RE.match
+    for line in lines:
+        m = match(line)
+        if m is None:
+            if not line.strip():
+                continue
+            raise ValueError('Malformed password policy line: ' + repr(line))
+        first, second, letter, password = m.groups()
+        firsts.append(int(first))
+        seconds.append(int(second))
+        letters.append(letter)
+        passwords.append(password)
+    return PasswordColumns(firsts, seconds, letters, passwords)
+
+
+def parse_password_file(password_list_file: str):
+    """Parse a password policy file into columns
+
+    Args:
+        password_list_file (str): File with list of passwords and policy
+
+    Returns:
+        PasswordColumns: Parsed columns
+    """
+
+    return parse_password_lines(read_lines(password_list_file))
+
+
+def count_valid_passwords(columns: PasswordColumns):
+    """Evaluate both password policies over parsed columns in one pass
+
+    Args:
+        columns (PasswordColumns): Parsed columns
+
+    Returns:
+        PasswordCounts: Count valid by letter count range, count valid by
+            exactly one of the two (1-based) positions holding the letter, and
+            number of evaluated passwords
+    """
+
+    range_valid = 0
+    position_valid = 0
+    for first, second, letter, password in zip(*columns):
+        if first <= password.count(letter) <= second:
+            range_valid += 1
+        at_first = password[first - 1:first] == letter
+        at_second = password[second - 1:second] == letter
+        if at_first != at_second:
+            position_valid += 1
+    return PasswordCounts(range_valid, position_valid, len(columns.passwords))
+
+
+def count_valid_passwords_bytes(data):
+    """Vectorized evaluation of both password policies on a byte buffer of
+'1-3 a: abcde' lines (e.g. a memory-mapped file), without creating a string
+per line. Lines follow the POLICY_RE grammar.
+
+    Args:
+        data (numpy.ndarray): uint8 buffer of the password policy file
+
+    Returns:
+        PasswordCounts: Counts as count_valid_passwords
+    """
+
+    starts, ends = line_bounds(data)
+    printable = printable_counts(data)
+    keep = printable[ends] > printable[starts]  # Skip blank lines
+    starts, ends = strip_bounds(printable, starts[keep], ends[keep])
+    if starts.size == 0:
+        return PasswordCounts(0, 0, 0)
+
+    # Field separators: first '-' and first ' ' after it on every line
+    dashes = np.flatnonzero(data == ord('-'))
+    spaces = np.flatnonzero(data == ord(' '))
+    dash = dashes[np.minimum(np.searchsorted(dashes, starts), dashes.size - 1)] if dashes.size else starts
+    space = spaces[np.minimum(np.searchsorted(spaces, dash), spaces.size - 1)] if spaces.size else starts
+    colon = space + 2
+    if not ((dash > starts) & (space > dash) & (colon < ends)).all() \
+            or not ((data[colon] == ord(':')) & (data[space + 1] > ord(' '))).all():
+        raise ValueError('Malformed password policy line')
+    # Lines end with a printable byte, so a space after the colon is followed
+    # by the password
+    password_starts = colon + 1
+    password_starts += (password_starts < ends) & (data[np.minimum(password_starts, data.size - 1)] == ord(' '))
+    if (printable[ends] - printable[password_starts] != ends - password_starts).any():
+        raise ValueError('Malformed password policy line')  # Whitespace in a password
+    firsts = parse_uint_fields(data, starts, dash)
+    seconds = parse_uint_fields(data, dash + 1, space)
+    letters = data[space + 1]
+
+    # Letter count of every password via a cumulative sum over its bytes
+    lengths = ends - password_starts
+    offsets = np.cumsum(lengths) - lengths
+    index = np.repeat(password_starts - offsets, lengths) + np.arange(lengths.sum(), dtype=index_dtype(data))
+    matches = data[index] == np.repeat(letters, lengths)
+    del index
+    cumulative = np.zeros(matches.size + 1, dtype=np.int32)
+    np.cumsum(matches, out=cumulative[1:])
+    counts = cumulative[offsets + lengths] - cumulative[offsets]
+    range_valid = (firsts <= counts) & (counts <= seconds)
+
+    def letter_at(position):
+        inside = (position >= 1) & (position <= lengths)
+        index = np.where(inside, password_starts + position - 1, 0)
+        return inside & (data[index] == letters)
+
+    position_valid = letter_at(firsts) != letter_at(seconds)
+    return PasswordCounts(int(range_valid.sum()), int(position_valid.sum()), starts.size)
+
+
+def count_valid_passwords_mapped(password_list_file: str):
+    """Evaluate both password policies on a memory-mapped password file
+
+    Args:
+        password_list_file (str): File with list of passwords and policy
+
+    Returns:
+        PasswordCounts: Counts as count_valid_passwords
+    """
+
+    if np is None:
+        return count_valid_passwords(parse_password_file(password_list_file))
+    totals = [0, 0, 0]
+    for counts in map_line_windows(password_list_file, count_valid_passwords_bytes):
+        totals = [total + count for total, count in zip(totals, counts)]
+    return PasswordCounts(*totals)
@@ -0,0 +1,293 @@
+"""
+.. module:: record_readers
+   :synopsis: Module with streaming readers shared by the file based challenge
+   questions. Files are consumed incrementally through a bounded read buffer,
+   so memory use of a solver does not grow with the size of its input file.
+   Byte oriented solvers can instead memory-map the file and process it in
+   bounded, line aligned windows, finding record boundaries with a vectorized
+   newline scan.
+"""
+
+import mmap
+import os
+import traceback
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+MAP_WINDOW_SIZE = 1 << 22
+
+
+def read_lines(file_name: str, skip_blank: bool = False,
+               buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """Generator that yields the lines of a file one at a time, without the
+trailing line break
+
+    Args:
+        file_name (str): Name of input file / path
+        skip_blank (bool, optional): Do not yield empty lines. Defaults to False.
+        buffer_size (int, optional): Size of read buffer in bytes
+
+    Yields:
+        str: Next line of the file
+    """
+
+    with open(file_name, 'r', buffering=buffer_size) as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if skip_blank and not line.strip():
+                continue
+            yield line
+
+
+def read_records(file_name: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """Generator that yields blank-line separated records (e.g. passports or
+customs answer groups). Only a single record is held in memory at a time.
+
+    Args:
+        file_name (str): Name of input file / path
+        buffer_size (int, optional): Size of read buffer in bytes
+
+    Yields:
+        list: Non-empty lines of the next record
+    """
+
+    record = []
+    for line in read_lines(file_name, buffer_size=buffer_size):
+        if line.strip():
+            record.append(line)
+        elif record:
+            yield record
+            record = []
+    if record:
+        yield record
+
+
+def read_ints(file_name: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """Generator that yields whitespace separated integers from a file
+
+    Args:
+        file_name (str): Name of input file / path
+        buffer_size (int, optional): Size of read buffer in bytes
+
+    Yields:
+        int: Next integer in the file
+    """
+
+    for line in read_lines(file_name, buffer_size=buffer_size):
+        for token in line.split():
+            yield int(token)
+
+
+def byte_range_chunks(file_name: str, n_chunks: int):
+    """Split a file into byte ranges of roughly equal size that start and end
+on line boundaries, so each range can be processed independently
+
+    Args:
+        file_name (str): Name of input file / path
+        n_chunks (int): Requested number of chunks
+
+    Returns:
+        list: (start, end) byte offsets, empty ranges are dropped
+    """
+
+    size = os.path.getsize(file_name)
+    n_chunks = max(1, min(n_chunks, size))
+    boundaries = [0]
+    with open(file_name, 'rb') as f:
+        for i in range(1, n_chunks):
+            offset = max(size*i // n_chunks, boundaries[-1])
+            if offset > 0:
+                # Move to the start of the line following byte offset - 1
+                f.seek(offset - 1)
+                f.readline()
+                offset = f.tell()
+            boundaries.append(min(offset, size))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def read_lines_in_range(file_name: str, start: int, end: int,
+                        skip_blank: bool = False, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """Generator that yields the lines of a byte range of a file (see
+byte_range_chunks), without the trailing line break
+
+    Args:
+        file_name (str): Name of input file / path
+        start (int): Start offset, must be at the start of a line
+        end (int): End offset, must be at the start of a line or end of file
+        skip_blank (bool, optional): Do not yield empty lines. Defaults to False.
+        buffer_size (int, optional): Size of read buffer in bytes
+
+    Yields:
+        str: Next line of the byte range
+    """
+
+    with open(file_name, 'rb', buffering=buffer_size) as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            raw_line = f.readline()
+            if not raw_line:
+                break
+            position += len(raw_line)
+            line = raw_line.decode().rstrip('\r\n')
+            if skip_blank and not line.strip():
+                continue
+            yield line
+
+
+def _clear_exception_frames(error: BaseException):
+    """Clear the local variables of the traceback frames of an exception and
+of the exceptions chained to it (__cause__ and __context__)"""
+
+    pending = [error]
+    seen = set()
+    while pending:
+        error = pending.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        traceback.clear_frames(error.__traceback__)
+        pending.extend((error.__cause__, error.__context__))
+
+
+def map_line_windows(file_name: str, process_window, window_size: int = None):
+    """Generator that memory-maps a file read-only and applies a function to
+consecutive line aligned windows of it, so byte oriented solvers work on the
+file content without copying it, and their temporaries stay bounded by the
+window size. Windows only grow beyond window_size for longer lines.
+
+    Args:
+        file_name (str): Name of input file / path
+        process_window (callable): Function of a window, a uint8 NumPy array
+            viewing the map. Its result must not reference the window.
+        window_size (int, optional): Window size in bytes. Defaults to
+            MAP_WINDOW_SIZE (read at call time).
+
+    Yields:
+        object: Result of process_window for each window
+    """
+
+    window_size = window_size or MAP_WINDOW_SIZE
+    with open(file_name, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return  # Empty files can not be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                end = min(start + window_size, size)
+                if end < size:
+                    # End the window after its last line break, or after the
+                    # first one past it for lines longer than a window
+                    line_break = mapped.rfind(b'\n', start, end)
+                    if line_break < 0:
+                        line_break = mapped.find(b'\n', end)
+                    end = size if line_break < 0 else line_break + 1
+                window = np.frombuffer(mapped, dtype=np.uint8, count=end - start, offset=start)
+                try:
+                    result = process_window(window)
+                except BaseException as error:
+                    # Frames of the tracebacks still reference the window
+                    _clear_exception_frames(error)
+                    raise
+                finally:
+                    del window  # Views must be gone before the map is closed
+                yield result
+                start = end
+
+
+def index_dtype(data):
+    """Smallest integer dtype (int32 or intp) able to index a buffer"""
+
+    return np.int32 if data.size < 2**31 else np.intp
+
+
+def line_bounds(data):
+    """Vectorized newline scan of a byte buffer
+
+    Args:
+        data (numpy.ndarray): uint8 buffer
+
+    Returns:
+        tuple: (starts, ends) offset arrays of every line, ends exclude the
+            line break. Blank lines have starts == ends.
+    """
+
+    dtype = index_dtype(data)
+    newlines = np.flatnonzero(data == ord('\n')).astype(dtype)
+    starts = np.concatenate((np.zeros(1, dtype=dtype), newlines + 1))
+    ends = np.concatenate((newlines, np.full(1, data.size, dtype=dtype)))
+    if starts[-1] == data.size:
+        # No line after a trailing line break
+        starts, ends = starts[:-1], ends[:-1]
+    if data.size:
+        ends = ends - ((ends > starts) & (data[ends - 1] == ord('\r')))
+    return starts, ends
+
+
+def printable_counts(data):
+    """Cumulative counts of the printable (non whitespace) bytes of a buffer
+
+    Args:
+        data (numpy.ndarray): uint8 buffer
+
+    Returns:
+        numpy.ndarray: Array of data.size + 1 counts, element i counts the
+            printable bytes of data[:i]. A line is blank when the counts at
+            its bounds are equal.
+    """
+
+    counts = np.zeros(data.size + 1, dtype=np.int32 if data.size < 2**31 else np.int64)
+    np.cumsum(data > ord(' '), out=counts[1:])
+    return counts
+
+
+def strip_bounds(counts, starts, ends):
+    """Bounds of non-blank lines without their leading and trailing whitespace
+
+    Args:
+        counts (numpy.ndarray): printable_counts of the buffer
+        starts (numpy.ndarray): Start offsets of non-blank lines
+        ends (numpy.ndarray): End offsets (exclusive) of the lines
+
+    Returns:
+        tuple: (starts, ends) of the first printable byte of every line and
+            past its last one
+    """
+
+    # The first printable byte raises the count past the one at the start,
+    # and the count reaches its value at the end just past the last one
+    stripped_starts = np.searchsorted(counts, counts[starts] + 1) - 1
+    stripped_ends = np.searchsorted(counts, counts[ends])
+    return stripped_starts.astype(starts.dtype), stripped_ends.astype(ends.dtype)
+
+
+def parse_uint_fields(data, starts, ends):
+    """Vectorized parse of unsigned decimal integers from byte ranges
+
+    Args:
+        data (numpy.ndarray): uint8 buffer
+        starts (numpy.ndarray): Start offsets of the digit ranges
+        ends (numpy.ndarray): End offsets (exclusive) of the digit ranges
+
+    Returns:
+        numpy.ndarray: int64 values of the ranges
+    """
+
+    lengths = ends - starts
+    if (lengths <= 0).any() or (lengths > 18).any():
+        raise ValueError('Expected an integer of 1 to 18 digits')
+    # Horner's rule over digit positions keeps temporaries per field, not per digit
+    values = np.zeros(starts.size, dtype=np.int64)
+    for position in range(int(lengths.max()) if lengths.size else 0):
+        active = lengths > position
+        digits = data[np.where(active, starts + position, starts)] - np.uint8(ord('0'))
+        if (digits[active] > 9).any():  # Non digits wrap around above 9
+            raise ValueError('Expected an integer')
+        values = np.where(active, values*10 + digits, values)
+    return values
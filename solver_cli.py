@@ -0,0 +1,264 @@
+"""
+.. module:: solver_cli
+   :synopsis: Command line runner for the challenge solvers. Runs any
+   question_X function on a given input and reports wall time, peak memory
+   and, optionally, a cProfile report. Usage examples:
+
+       python -m challenge_solutions list
+       python -m challenge_solutions run 4b --input ./data/passport_data.txt --profile
+       python -m challenge_solutions run 15 --args "[0, 3, 6]" 30000000 --tracemalloc
+       python -m challenge_solutions batch ./nightly --workers 8 --output results.jsonl
+       python -m challenge_solutions serve --port 8765 --workers 4
+"""
+
+import argparse
+import ast
+import cProfile
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+
+import challenge_solutions
+import instrumentation
+from parse_cache import configure_parse_cache
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Question number -> (default input file, default extra arguments). Solvers
+# without an input file have None as default input file.
+DEFAULT_INPUTS = {
+    '1': ('./data/expense_report.txt', (2020,)),
+    '2': ('./data/passwords_policy.txt', ()),
+    '4': ('./data/passport_data.txt', ()),
+    '5': ('./data/boarding_sequences.txt', ()),
+    '6': ('./data/customs_questions.txt', ()),
+    '10': ('./data/adapter_list.txt', ()),
+    '12': ('./data/navigation_instructions.txt', ()),
+    '13': ('./data/bus_notes.txt', ()),
+    '15': (None, ([1, 20, 11, 6, 12, 0], 2020)),
+    '18': ('./data/expressions_list.txt', ()),
+    '21': ('./data/food_allergies.txt', ()),
+    '25': (None, (10705932, 12301431)),
+}
+
+QUESTION_RE = re.compile(r'(?:question_)?(\d+)(?:_?(b|bonus))?$')
+
+
+def list_solvers():
+    """Names of all question_X solver functions
+
+    Returns:
+        list: Solver names sorted by day number
+    """
+
+    names = [x for x in dir(challenge_solutions) if QUESTION_RE.match(x) and x.startswith('question_')]
+    return sorted(names, key=lambda x: (int(QUESTION_RE.match(x).group(1)), x))
+
+
+def resolve_solver(question: str):
+    """Resolve a question id ('4', '4b', '4_bonus' or 'question_4_bonus')
+
+    Args:
+        question (str): Question id
+
+    Returns:
+        tuple: (solver name, question number)
+    """
+
+    match = QUESTION_RE.match(question.strip().lower())
+    if match is None:
+        raise ValueError('Unknown question id: ' + question)
+    name = 'question_' + match.group(1) + ('_bonus' if match.group(2) else '')
+    if not hasattr(challenge_solutions, name):
+        raise ValueError('No solver named ' + name)
+    return name, match.group(1)
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, None where unsupported"""
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak*1024
+
+
+def run_solver(question: str, input_file: str = None, args: tuple = None,
+               profile: bool = False, trace_memory: bool = False):
+    """Run a solver and measure it
+
+    Args:
+        question (str): Question id, see resolve_solver
+        input_file (str, optional): Input file. Defaults to the data file of
+            the question.
+        args (tuple, optional): Extra solver arguments. Defaults to the
+            default arguments of the question.
+        profile (bool, optional): Run under cProfile. Defaults to False.
+        trace_memory (bool, optional): Measure peak python allocations with
+            tracemalloc (slows the run down). Defaults to False.
+
+    Returns:
+        dict: solver, result, wall_time, peak_rss, peak_traced and profile
+            (a cProfile.Profile or None)
+    """
+
+    name, number = resolve_solver(question)
+    default_input, default_args = DEFAULT_INPUTS.get(number, (None, ()))
+    solver_args = tuple(default_args if args is None else args)
+    if default_input is not None:
+        solver_args = (input_file or default_input,) + solver_args
+    elif input_file is not None:
+        raise ValueError(name + ' does not read an input file, use --args')
+
+    profiler = cProfile.Profile() if profile else None
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(getattr(challenge_solutions, name), *solver_args)
+        else:
+            result = getattr(challenge_solutions, name)(*solver_args)
+        wall_time = time.perf_counter() - start
+        peak_traced = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return {
+        'solver': name,
+        'result': result,
+        'wall_time': wall_time,
+        'peak_rss': peak_rss_bytes(),
+        'peak_traced': peak_traced,
+        'profile': profiler,
+    }
+
+
+def _parse_value(text: str):
+    """Parse a command line solver argument as a python literal if possible"""
+
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _format_bytes(n_bytes):
+    """Human readable byte count"""
+
+    if n_bytes is None:
+        return 'n/a'
+    return '%.1f MiB' % (n_bytes / 2**20)
+
+
+def build_parser():
+    """Command line argument parser"""
+
+    parser = argparse.ArgumentParser(prog='python -m challenge_solutions',
+                                     description='Run RWDI challenge solvers.')
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('list', help='list available solvers')
+    run_parser = commands.add_parser('run', help='run a single solver')
+    run_parser.add_argument('question', help="question id, e.g. 4, 4b or question_4_bonus")
+    run_parser.add_argument('--input', dest='input_file', help='input file (default: data file)')
+    run_parser.add_argument('--args', nargs='+', type=_parse_value,
+                            help='extra solver arguments as python literals')
+    run_parser.add_argument('--profile', action='store_true', help='run under cProfile')
+    run_parser.add_argument('--profile-output', help='dump pstats data to this file')
+    run_parser.add_argument('--top', type=int, default=20, help='profile rows to print')
+    run_parser.add_argument('--sort', default='cumulative', help='profile sort key')
+    run_parser.add_argument('--tracemalloc', action='store_true',
+                            help='report peak python allocations (slower)')
+    run_parser.add_argument('--cache-dir', help='on-disk store of parsed inputs, reused across runs')
+    run_parser.add_argument('--metrics', help='write solver metrics (.prom: Prometheus text, else JSON)')
+    batch_parser = commands.add_parser('batch', help='run solvers over a directory or manifest of inputs')
+    batch_parser.add_argument('source', help='input directory or JSONL manifest')
+    batch_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help='worker processes (default: CPU count)')
+    batch_parser.add_argument('--output', help='JSONL results file (default: stdout)')
+    batch_parser.add_argument('--cache-dir', help='on-disk store of parsed inputs, shared by workers')
+    batch_parser.add_argument('--subexpression-cache', type=int, metavar='SIZE',
+                              help='memoize up to SIZE question 18 expression groups per worker')
+    serve_parser = commands.add_parser('serve', help='serve solvers on a local socket (JSON lines)')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='host to bind (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=0, help='TCP port (default: any free port)')
+    serve_parser.add_argument('--socket', help='Unix socket path, instead of host and port')
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help='worker processes, 0 for a thread (default: CPU count)')
+    serve_parser.add_argument('--cache-dir', help='on-disk store of parsed inputs, shared by workers')
+    return parser
+
+
+def main(argv: list = None):
+    """Command line entry point
+
+    Args:
+        argv (list, optional): Arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: Exit code
+    """
+
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    if options.command == 'list':
+        for name in list_solvers():
+            print(name)
+        return 0
+    if options.command == 'batch':
+        import batch_runner  # Deferred import, batch_runner imports this module
+        try:
+            return batch_runner.main(options.source, options.workers, options.output, options.cache_dir,
+                                     options.subexpression_cache)
+        except OSError as error:
+            print('error: %s' % error, file=sys.stderr)
+            return 1
+    if options.command == 'serve':
+        from solver_service import serve  # Deferred import, solver_service imports this module
+        try:
+            serve(options.host, options.port, options.socket, options.workers, options.cache_dir)
+        except OSError as error:  # e.g. address already in use
+            print('error: %s' % error, file=sys.stderr)
+            return 1
+        return 0
+    if options.command != 'run':
+        parser.print_help()
+        return 2
+
+    if options.cache_dir:
+        configure_parse_cache(disk_dir=options.cache_dir)
+    if options.metrics:
+        instrumentation.enable(trace_allocations=options.tracemalloc)
+    try:
+        report = run_solver(options.question, options.input_file, options.args,
+                            profile=options.profile or bool(options.profile_output),
+                            trace_memory=options.tracemalloc)
+    except (ValueError, OSError) as error:
+        print('error: %s' % error, file=sys.stderr)
+        return 1
+
+    print('solver:      %s' % report['solver'])
+    print('result:      %s' % (report['result'],))
+    print('wall time:   %.6f s' % report['wall_time'])
+    print('peak RSS:    %s' % _format_bytes(report['peak_rss']))
+    if options.tracemalloc:
+        print('peak traced: %s' % _format_bytes(report['peak_traced']))
+    if report['profile'] is not None:
+        stats = pstats.Stats(report['profile'], stream=sys.stdout)
+        if options.profile_output:
+            stats.dump_stats(options.profile_output)
+            print('profile:     %s' % options.profile_output)
+        if options.profile:
+            stats.sort_stats(options.sort).print_stats(options.top)
+    if options.metrics:
+        instrumentation.write_metrics(options.metrics)
+        print('metrics:     %s' % options.metrics)
+    return 0
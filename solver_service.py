@@ -0,0 +1,337 @@
+"""
+.. module:: solver_service
+   :synopsis: Local asyncio service exposing every question_X solver, so
+   tools calling the solvers many times skip process start-up and parsing.
+   Requests and responses are JSON lines over a localhost TCP or Unix socket.
+   Concurrent requests for the same solver, input and arguments are coalesced
+   into one computation, solvers run on a process pool whose workers keep
+   their parse caches warm between requests, and SolverClient is a small
+   blocking client. Usage examples:
+
+       python -m challenge_solutions serve --port 8765 --workers 4
+
+       with SolverClient(port=8765) as client:
+           client.solve('4b', './data/passport_data.txt')
+
+   Request lines look like {"id": 1, "question": "4b", "input": "...", "args": []}
+   ("op": "list" and "op": "stats" are also supported) and every request gets
+   a response echoing its id. A worker process that dies fails the requests
+   it was running and the pool is replaced for later requests.
+"""
+
+import asyncio
+import json
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from batch_runner import BatchTask, error_record, run_task
+from parse_cache import configure_parse_cache
+from solver_cli import list_solvers, resolve_solver
+
+DEFAULT_HOST = '127.0.0.1'
+
+
+class SolverError(Exception):
+    """Error reported by the solver service for a request"""
+
+
+class SolverService:
+    """Asyncio solver service
+
+    Args:
+        workers (int, optional): Worker processes, 0 runs solvers on a thread
+            of the service process (sharing its parse cache). Defaults to 1.
+        cache_dir (str, optional): On-disk parse cache shared by the workers.
+            Defaults to None.
+    """
+
+    def __init__(self, workers: int = 1, cache_dir: str = None):
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.requests = 0
+        self.computations = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._connections = set()
+        self._executor = None
+        self._server = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = 0, path: str = None):
+        """Start listening on a TCP port (0 picks a free one) or a Unix socket path
+
+        Returns:
+            tuple: Listening address, (host, port) or the socket path
+        """
+
+        self._executor = self._new_executor()
+        if self.workers <= 0 and self.cache_dir:
+            configure_parse_cache(disk_dir=self.cache_dir)
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=path)
+            return path
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    def _new_executor(self):
+        """Worker pool of the service"""
+
+        if self.workers > 0:
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=configure_parse_cache,
+                                       initargs=(16, self.cache_dir))
+        # Solvers are CPU bound and hold the GIL, a single thread is enough
+        return ThreadPoolExecutor(max_workers=1)
+
+    async def _run_task(self, task: BatchTask):
+        """run_task record of a task run on the worker pool. If a worker
+process died, the task fails and the broken pool is replaced."""
+
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, run_task, task)
+        except BrokenProcessPool as error:
+            if self._executor is executor:  # Other requests may have replaced it already
+                self._executor = self._new_executor()
+                executor.shutdown(wait=False)
+            return error_record(task, error)
+
+    async def serve_forever(self):
+        """Serve until cancelled, then shut down"""
+
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop listening and shut the worker pool down"""
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for connection in list(self._connections):
+            connection.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self):
+        """Request, computation and coalesced request counts"""
+
+        return {'requests': self.requests, 'computations': self.computations,
+                'coalesced': self.coalesced, 'in_flight': len(self._in_flight)}
+
+    async def solve(self, question: str, input_file: str = None, args: list = None):
+        """Run a solver, joining an identical computation already in flight
+
+        Returns:
+            tuple: (run_task record, True if the request was coalesced)
+        """
+
+        self.requests += 1
+        task = BatchTask(resolve_solver(question)[0], input_file,
+                         None if args is None else tuple(args))
+        # Arguments are JSON values, their JSON text identifies them
+        key = (task.question, task.input_file, json.dumps(args))
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future), True
+
+        self.computations += 1
+        future = asyncio.ensure_future(self._run_task(task))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded, so a cancelled request does not cancel coalesced ones
+        return await asyncio.shield(future), False
+
+    async def _respond(self, request: dict):
+        """Response to one decoded request line"""
+
+        op = request.get('op', 'solve')
+        if op == 'list':
+            return {'status': 'ok', 'result': list_solvers()}
+        if op == 'stats':
+            return {'status': 'ok', 'result': self.stats()}
+        if op != 'solve':
+            return {'status': 'error', 'error': 'Unknown op: ' + str(op)}
+        record, coalesced = await self.solve(str(request['question']), request.get('input'),
+                                             request.get('args'))
+        response = {key: record[key] for key in ('status', 'result', 'error', 'wall_time')}
+        response['coalesced'] = coalesced
+        return response
+
+    async def _handle_request(self, line: bytes, writer, write_lock):
+        """Answer one request line, requests of a connection run concurrently
+and write_lock serializes their writes (concurrent drain() calls on one
+StreamWriter fail on Python 3.7 to 3.9)"""
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+        except ValueError as error:
+            response = {'id': None, 'status': 'error', 'error': 'Malformed request: %s' % error}
+        else:
+            try:
+                response = await self._respond(request)
+            except asyncio.CancelledError:
+                raise  # An Exception before Python 3.8
+            except Exception as error:  # Every request gets a response
+                response = {'status': 'error', 'error': '%s: %s' % (type(error).__name__, error)}
+            response = dict(response, id=request.get('id'))
+        async with write_lock:
+            writer.write((json.dumps(response, default=repr) + '\n').encode())
+            await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        """Serve the request lines of a client connection"""
+
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        pending = set()
+        write_lock = asyncio.Lock()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    pending.add(asyncio.ensure_future(self._handle_request(line, writer, write_lock)))
+                    pending = {x for x in pending if not x.done()}
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass  # Client went away
+        except asyncio.CancelledError:
+            pass  # Service is closing, end the connection quietly
+        finally:
+            for request in pending:
+                request.cancel()  # Only left over when the service closes
+            self._connections.discard(connection)
+            writer.close()
+
+
+class SolverClient:
+    """Blocking client of a solver service
+
+    Args:
+        host (str, optional): Service host. Defaults to DEFAULT_HOST.
+        port (int, optional): Service TCP port
+        path (str, optional): Service Unix socket path, used instead of
+            host and port
+        timeout (float, optional): Socket timeout in seconds. Defaults to None.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = None, path: str = None,
+                 timeout: float = None):
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout)
+        self._file = self._socket.makefile('rwb')
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the connection"""
+
+        self._file.close()
+        self._socket.close()
+
+    def request_many(self, requests: list):
+        """Send a batch of requests at once and wait for all responses (the
+service runs them concurrently and coalesces identical ones)
+
+        Args:
+            requests (list): Request dicts without id
+
+        Returns:
+            list: Response dicts, in request order
+        """
+
+        ids = []
+        for request in requests:
+            self._next_id += 1
+            ids.append(self._next_id)
+            self._file.write((json.dumps(dict(request, id=self._next_id)) + '\n').encode())
+        self._file.flush()
+
+        responses = {}
+        while len(responses) < len(ids):
+            line = self._file.readline()
+            if not line:
+                raise ConnectionError('Solver service closed the connection')
+            response = json.loads(line)
+            responses[response['id']] = response
+        return [responses[x] for x in ids]
+
+    def request(self, request: dict):
+        """Send one request and return its response dict"""
+
+        return self.request_many([request])[0]
+
+    def solve(self, question: str, input_file: str = None, args: list = None):
+        """Run a solver on the service
+
+        Args:
+            question (str): Question id, e.g. '4b'
+            input_file (str, optional): Input file (made absolute, the service
+                may run in another directory). Defaults to the data file.
+            args (list, optional): Extra solver arguments as JSON values
+
+        Returns:
+            object: Solver result (JSON decoded, so tuples come back as lists)
+        """
+
+        request = {'question': question, 'args': args,
+                   'input': None if input_file is None else os.path.abspath(input_file)}
+        response = self.request(request)
+        if response['status'] != 'ok':
+            raise SolverError(response['error'])
+        return response['result']
+
+    def list_solvers(self):
+        """Names of the solvers the service exposes"""
+
+        return self.request({'op': 'list'})['result']
+
+    def stats(self):
+        """Request statistics of the service"""
+
+        return self.request({'op': 'stats'})['result']
+
+
+def serve(host: str = DEFAULT_HOST, port: int = 0, path: str = None, workers: int = 1,
+          cache_dir: str = None):
+    """Run a solver service until interrupted
+
+    Args:
+        host (str, optional): Host to bind. Defaults to DEFAULT_HOST.
+        port (int, optional): TCP port, 0 picks a free one. Defaults to 0.
+        path (str, optional): Unix socket path, used instead of host and port
+        workers (int, optional): Worker processes. Defaults to 1.
+        cache_dir (str, optional): On-disk parse cache. Defaults to None.
+    """
+
+    async def run():
+        service = SolverService(workers, cache_dir)
+        address = await service.start(host, port, path)
+        print('serving on %s' % (address,), flush=True)
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,363 @@
+"""
+.. module:: synthetic_inputs
+   :synopsis: Module with deterministic generators of synthetic challenge
+   inputs of any size. Each generator writes an input file and returns the
+   known answers of the solvers reading that format, computed independently of
+   the solvers, so large inputs double as correctness tests.
+"""
+
+import random
+import string
+
+ALLERGEN_NAMES = ('dairy', 'eggs', 'fish', 'nuts', 'peanuts', 'sesame', 'soy', 'wheat')
+EYE_COLORS = ('amb', 'blu', 'brn', 'gry', 'grn', 'hzl', 'oth')
+SMALL_PRIMES = (13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+
+
+def generate_expense_report(file_name: str, n: int, seed: int = 0):
+    """Expense report with exactly one pair and one triple summing to 2020
+
+    Args:
+        file_name (str): Output file name
+        n (int): Number of entries (at least 5)
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: solver name -> (extra arguments, expected answer)
+    """
+
+    rng = random.Random(seed)
+    while True:
+        pair = rng.randint(1, 1009)
+        triple = sorted(rng.sample(range(1, 1000), 2))
+        planted = [pair, 2020 - pair, triple[0], triple[1], 2020 - sum(triple)]
+        if len(set(planted)) < 5 or planted[4] <= 0:
+            continue
+        pairs = [(a, b) for i, a in enumerate(planted) for b in planted[i + 1:] if a + b == 2020]
+        triples = [1 for i, a in enumerate(planted) for j, b in enumerate(planted[i + 1:], i + 1)
+                   for c in planted[j + 1:] if a + b + c == 2020]
+        if len(pairs) == 1 and len(triples) == 1:
+            break
+
+    # Fillers are larger than the target, so they can not be part of a sum
+    values = planted + [rng.randint(2021, 10**6) for _ in range(n - len(planted))]
+    rng.shuffle(values)
+    _write_lines(file_name, (str(x) for x in values))
+    return {
+        'question_1': ((2020,), pair*(2020 - pair)),
+        'question_1_bonus': ((2020,), triple[0]*triple[1]*(2020 - sum(triple))),
+    }
+
+
+def generate_passwords(file_name: str, n: int, seed: int = 0):
+    """Password policy list ('1-3 a: abcde' lines)"""
+
+    rng = random.Random(seed)
+    range_valid = position_valid = 0
+    lines = []
+    for _ in range(n):
+        letter = rng.choice('abcde')
+        password = ''.join(rng.choice('abcde') for _ in range(rng.randint(5, 16)))
+        first = rng.randint(1, 6)
+        second = rng.randint(first + 1, 12)
+        count = sum(1 for x in password if x == letter)
+        range_valid += first <= count <= second
+        at_first = len(password) >= first and password[first - 1] == letter
+        at_second = len(password) >= second and password[second - 1] == letter
+        position_valid += at_first != at_second
+        lines.append('%d-%d %s: %s' % (first, second, letter, password))
+    _write_lines(file_name, lines)
+    return {
+        'question_2': ((), range_valid),
+        'question_2_bonus': ((), position_valid),
+    }
+
+
+def generate_passports(file_name: str, n: int, seed: int = 0):
+    """Passport batch with a known share of missing and invalid fields"""
+
+    rng = random.Random(seed)
+    present_count = valid_count = 0
+    records = []
+    for _ in range(n):
+        fields = {
+            'byr': str(rng.randint(1920, 2002)),
+            'iyr': str(rng.randint(2010, 2020)),
+            'eyr': str(rng.randint(2020, 2030)),
+            'hgt': rng.choice(['%dcm' % rng.randint(150, 193), '%din' % rng.randint(59, 76)]),
+            'hcl': '#' + ''.join(rng.choice('0123456789abcdef') for _ in range(6)),
+            'ecl': rng.choice(EYE_COLORS),
+            'pid': '%09d' % rng.randint(0, 10**9 - 1),
+        }
+        if rng.random() < 0.5:
+            fields['cid'] = str(rng.randint(100, 350))
+        defect = rng.random()
+        if defect < 0.2:
+            del fields[rng.choice(sorted(fields.keys() - {'cid'}))]
+        elif defect < 0.4:
+            field = rng.choice(['byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid'])
+            fields[field] = {
+                'byr': '2003', 'iyr': '2009', 'eyr': '2031', 'hgt': '194cm',
+                'hcl': '123abc', 'ecl': 'wat', 'pid': '0123456789',
+            }[field]
+        present_count += defect >= 0.2
+        valid_count += defect >= 0.4
+        items = ['%s:%s' % x for x in fields.items()]
+        rng.shuffle(items)
+        split = rng.randint(1, len(items))
+        records.append(' '.join(items[:split]) + ('\n' + ' '.join(items[split:]) if items[split:] else ''))
+    _write_lines(file_name, '\n\n'.join(records).split('\n'))
+    return {
+        'question_4': ((), present_count),
+        'question_4_bonus': ((), valid_count),
+    }
+
+
+def generate_boarding_passes(file_name: str, n: int, seed: int = 0):
+    """Boarding passes covering a seat range with one missing seat (seats are
+repeated for n above the plane size)"""
+
+    rng = random.Random(seed)
+    first_seat = rng.randint(8, 40)
+    last_seat = min(1023, first_seat + max(n, 3))
+    missing_seat = rng.randint(first_seat + 1, last_seat - 1)
+    seats = [x for x in range(first_seat, last_seat + 1) if x != missing_seat]
+    seat_ids = seats + [rng.choice(seats) for _ in range(n - len(seats))]
+    rng.shuffle(seat_ids)
+    table = str.maketrans('01', 'FB')
+    col_table = str.maketrans('01', 'LR')
+    _write_lines(file_name, (format(x >> 3, '07b').translate(table) + format(x & 7, '03b').translate(col_table)
+                             for x in seat_ids))
+    return {
+        'question_5': ((), seat_ids),
+        'question_5_bonus': ((), missing_seat),
+    }
+
+
+def generate_customs_answers(file_name: str, n: int, seed: int = 0):
+    """Customs answer groups (n groups)"""
+
+    rng = random.Random(seed)
+    anyone_counts = []
+    everyone_counts = []
+    groups = []
+    for _ in range(n):
+        people = [''.join(rng.sample(string.ascii_lowercase, rng.randint(1, 26)))
+                  for _ in range(rng.randint(1, 5))]
+        answer_sets = [set(x) for x in people]
+        anyone_counts.append(len(set.union(*answer_sets)))
+        everyone_counts.append(len(set.intersection(*answer_sets)))
+        groups.append('\n'.join(people))
+    _write_lines(file_name, '\n\n'.join(groups).split('\n'))
+    return {
+        'question_6': ((), (anyone_counts, sum(anyone_counts))),
+        'question_6_bonus': ((), (everyone_counts, sum(everyone_counts))),
+    }
+
+
+def generate_adapters(file_name: str, n: int, seed: int = 0):
+    """Adapter chain with joltage steps of 1 to 3 (mostly 3, which keeps the
+arrangement count manageable)"""
+
+    rng = random.Random(seed)
+    joltages = []
+    joltage = 0
+    for _ in range(n):
+        joltage += rng.choice((1, 1, 2, 3, 3, 3, 3, 3, 3, 3))
+        joltages.append(joltage)
+
+    histogram = {1: 0, 2: 0, 3: 1}
+    ways = {0: 1}
+    prev_joltage = 0
+    for joltage in joltages:
+        histogram[joltage - prev_joltage] += 1
+        ways[joltage] = sum(ways.get(joltage - d, 0) for d in (1, 2, 3))
+        for old_joltage in [x for x in ways if x < joltage - 3]:
+            del ways[old_joltage]
+        prev_joltage = joltage
+    arrangements = ways[joltages[-1]] if joltages else 1
+
+    shuffled = joltages[:]
+    rng.shuffle(shuffled)
+    _write_lines(file_name, (str(x) for x in shuffled))
+    return {
+        'question_10': ((), histogram[1]*histogram[3]),
+        'question_10_bonus': ((), arrangements),
+    }
+
+
+def generate_navigation(file_name: str, n: int, seed: int = 0):
+    """Navigation instructions, answers from a plain integer simulation"""
+
+    rng = random.Random(seed)
+    directions = {'N': (0, 1), 'S': (0, -1), 'E': (1, 0), 'W': (-1, 0)}
+    lines = []
+    ship = [0, 0, 1, 0]  # x, y, heading dx, dy
+    boat = [0, 0, 10, 1]  # x, y, waypoint dx, dy
+    for _ in range(n):
+        opcode = rng.choice('NSEWLRFFF')
+        argument = rng.choice((90, 180, 270)) if opcode in 'LR' else rng.randint(1, 99)
+        lines.append(opcode + str(argument))
+        if opcode in directions:
+            dx, dy = directions[opcode]
+            ship[0] += dx*argument
+            ship[1] += dy*argument
+            boat[2] += dx*argument
+            boat[3] += dy*argument
+        elif opcode == 'F':
+            for state in (ship, boat):
+                state[0] += state[2]*argument
+                state[1] += state[3]*argument
+        else:
+            for _ in range((argument // 90) if opcode == 'L' else (4 - argument // 90) % 4):
+                for state in (ship, boat):
+                    state[2], state[3] = -state[3], state[2]
+    _write_lines(file_name, lines)
+    return {
+        'question_12': ((), abs(ship[0]) + abs(ship[1])),
+        'question_12_bonus': ((), abs(boat[0]) + abs(boat[1])),
+    }
+
+
+def generate_bus_notes(file_name: str, n: int, seed: int = 0):
+    """Bus notes with n entries in the bus list and a planted aligned timestamp"""
+
+    rng = random.Random(seed)
+    length = max(n, max(SMALL_PRIMES))
+    while True:
+        target = rng.randint(10**6, 10**12)
+        buses = {}
+        for bus_id in rng.sample(SMALL_PRIMES, 9):
+            offset = (-target) % bus_id + bus_id*rng.randint(0, (length - 1) // bus_id)
+            if offset >= length:
+                offset = (-target) % bus_id
+            buses[offset] = bus_id
+        if len(buses) == 9:
+            break
+
+    modulus = 1
+    for bus_id in buses.values():
+        modulus *= bus_id
+    start_time = rng.randint(10**5, 10**7)
+    # Ties go to the bus listed first, as in the solver
+    wait, _, bus = min(((-start_time) % x, offset, x) for offset, x in buses.items())
+    bus_list = ','.join(str(buses[i]) if i in buses else 'x' for i in range(length))
+    _write_lines(file_name, [str(start_time), bus_list])
+    return {
+        'question_13': ((), wait*bus),
+        'question_13_bonus': ((), target % modulus),
+    }
+
+
+def _random_expression(rng: random.Random, depth: int):
+    """Random expression text with its (equal precedence, addition first) values"""
+
+    n_terms = rng.randint(2, 4)
+    texts, equal_values, add_first_values = [], [], []
+    for _ in range(n_terms):
+        if depth > 0 and rng.random() < 0.3:
+            text, equal_value, add_first_value = _random_expression(rng, depth - 1)
+            text = '(' + text + ')'
+        else:
+            equal_value = add_first_value = rng.randint(1, 12)
+            text = str(equal_value)
+        texts.append(text)
+        equal_values.append(equal_value)
+        add_first_values.append(add_first_value)
+    operators = [rng.choice('+*') for _ in range(n_terms - 1)]
+
+    equal_total = equal_values[0]
+    for operator, value in zip(operators, equal_values[1:]):
+        equal_total = equal_total + value if operator == '+' else equal_total*value
+    products = [add_first_values[0]]
+    for operator, value in zip(operators, add_first_values[1:]):
+        if operator == '+':
+            products[-1] += value
+        else:
+            products.append(value)
+    add_first_total = 1
+    for value in products:
+        add_first_total *= value
+
+    text = texts[0] + ''.join(' %s %s' % x for x in zip(operators, texts[1:]))
+    return text, equal_total, add_first_total
+
+
+def generate_expressions(file_name: str, n: int, seed: int = 0):
+    """Calculator expressions with (multi-digit) operands and nested parens"""
+
+    rng = random.Random(seed)
+    lines = []
+    equal_sum = add_first_sum = 0
+    for _ in range(n):
+        text, equal_value, add_first_value = _random_expression(rng, 2)
+        lines.append(text)
+        equal_sum += equal_value
+        add_first_sum += add_first_value
+    _write_lines(file_name, lines)
+    return {
+        'question_18': ((), equal_sum),
+        'question_18_bonus': ((), add_first_sum),
+    }
+
+
+def generate_food_allergies(file_name: str, n: int, seed: int = 0):
+    """Food list where each allergen is in exactly one known ingredient"""
+
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < 200 + len(ALLERGEN_NAMES):
+        names.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))))
+    names = sorted(names)
+    rng.shuffle(names)
+    dangerous = dict(zip(ALLERGEN_NAMES, names))
+    safe = names[len(ALLERGEN_NAMES):]
+
+    safe_count = 0
+    lines = []
+    # Two anchor foods per allergen with disjoint safe ingredients pin each
+    # allergen's candidates to exactly its own ingredient
+    anchors = [[allergen] for allergen in ALLERGEN_NAMES for _ in range(2)]
+    for i in range(max(n, len(anchors))):
+        if i < len(anchors):
+            allergens = anchors[i]
+            ingredients = [dangerous[allergens[0]]]
+            ingredients += safe[(i % 2)*100:(i % 2)*100 + 5]
+        else:
+            allergens = rng.sample(ALLERGEN_NAMES, rng.randint(1, 3))
+            ingredients = [dangerous[x] for x in ALLERGEN_NAMES
+                           if x in allergens or rng.random() < 0.2]
+            ingredients += rng.sample(safe, rng.randint(2, 20))
+        safe_count += sum(1 for x in ingredients if x not in dangerous.values())
+        rng.shuffle(ingredients)
+        lines.append('%s (contains %s)' % (' '.join(ingredients), ', '.join(allergens)))
+    rng.shuffle(lines)
+    _write_lines(file_name, lines)
+    return {
+        'question_21': ((), safe_count),
+        'question_21_bonus': ((), ','.join(dangerous[x] for x in sorted(ALLERGEN_NAMES))),
+    }
+
+
+# Input format -> generator
+GENERATORS = {
+    'expense_report': generate_expense_report,
+    'passwords': generate_passwords,
+    'passports': generate_passports,
+    'boarding_passes': generate_boarding_passes,
+    'customs_answers': generate_customs_answers,
+    'adapters': generate_adapters,
+    'navigation': generate_navigation,
+    'bus_notes': generate_bus_notes,
+    'expressions': generate_expressions,
+    'food_allergies': generate_food_allergies,
+}
+
+
+def _write_lines(file_name: str, lines):
+    """Write lines to a file"""
+
+    with open(file_name, 'w') as f:
+        for line in lines:
+            f.write(line)
+            f.write('\n')
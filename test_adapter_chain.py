@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from adapter_chain import AdapterAccumulator, count_arrangements, joltage_diff_histogram, joltage_diff_histogram_numpy
+
+ADAPTERS = [16, 10, 15, 5, 1, 11, 7, 19, 6, 12, 4]
+
+
+def test_joltage_diff_histogram():
+    histogram = joltage_diff_histogram(iter(sorted(ADAPTERS)))
+    assert histogram[1] == 7 and histogram[3] == 5
+
+
+def test_joltage_diff_histogram_numpy():
+    pytest.importorskip('numpy')
+    assert joltage_diff_histogram_numpy(ADAPTERS) == joltage_diff_histogram(sorted(ADAPTERS))
+
+
+def test_count_arrangements():
+    assert count_arrangements(iter(sorted(ADAPTERS))) == 8
+    assert count_arrangements([]) == 1
+    assert count_arrangements([1, 5]) == 0
+
+
+def test_adapter_accumulator():
+    rng = random.Random(3)
+    for _ in range(20):
+        adapters = rng.sample(range(1, 60), 30)
+        accumulator = AdapterAccumulator()
+        for i, joltage in enumerate(adapters, 1):
+            accumulator.add(joltage)
+            assert accumulator.histogram == joltage_diff_histogram(sorted(adapters[:i]))
+            assert accumulator.arrangements() == count_arrangements(sorted(adapters[:i]))
+    accumulator = AdapterAccumulator(ADAPTERS)
+    assert accumulator.diff_product() == 35 and accumulator.arrangements() == 8
+    accumulator.extend([20, 21])  # Ascending appends extend the window
+    assert accumulator.arrangements() == count_arrangements(sorted(ADAPTERS + [20, 21]))
+    assert len(accumulator) == len(ADAPTERS) + 2
@@ -0,0 +1,30 @@
+import pytest
+
+from allergen_index import AllergenIndex, parse_food_line
+
+FOODS = [
+    'mxmxvkd kfcds sqjhc nhms (contains dairy, fish)',
+    'trh fvjkl sbzzf mxmxvkd (contains dairy)',
+    'sqjhc fvjkl (contains soy)',
+    'sqjhc mxmxvkd sbzzf (contains fish)',
+]
+
+
+def test_parse_food_line():
+    assert parse_food_line(FOODS[0]) == (['mxmxvkd', 'kfcds', 'sqjhc', 'nhms'], ['dairy', 'fish'])
+    assert parse_food_line('a b') == (['a', 'b'], [])
+
+
+def test_allergen_index():
+    index = AllergenIndex(FOODS)
+    assert index.allergen_foods == {'dairy': [0, 1], 'fish': [0, 3], 'soy': [2]}
+    assert index.allergen_free_ingredients() == {'kfcds', 'nhms', 'sbzzf', 'trh'}
+    assert index.allergen_free_count() == 5
+    assert index.resolve_allergens() == {'dairy': 'mxmxvkd', 'fish': 'sqjhc', 'soy': 'fvjkl'}
+    assert index.canonical_dangerous_list() == 'mxmxvkd,sqjhc,fvjkl'
+
+
+def test_resolve_allergens_ambiguous():
+    index = AllergenIndex(['a b (contains dairy, fish)'])
+    with pytest.raises(ValueError):
+        index.resolve_allergens()
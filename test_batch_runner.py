@@ -0,0 +1,126 @@
+import json
+import multiprocessing
+import os
+import shutil
+
+import pytest
+
+import batch_runner
+import challenge_solutions
+import expression_eval
+import parse_cache
+
+from batch_runner import BatchTask, collect_tasks, run_batch, run_task, write_jsonl
+from solver_cli import main
+
+
+def test_collect_tasks(tmp_path):
+    shutil.copy('./data/passport_data.txt', str(tmp_path / 'passport_data_0412.txt'))
+    (tmp_path / 'unknown.txt').write_text('1\n')
+    tasks, unmatched = collect_tasks(str(tmp_path))
+    assert [task.question for task in tasks] == ['question_4', 'question_4_bonus']
+    assert unmatched == [str(tmp_path / 'unknown.txt')]
+
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text('{"question": "1", "input": "expenses.txt", "args": [2020]}\n\n'
+                        '{"question": "15", "args": [[0, 3, 6], 2020]}\n{"question": "99"}\nnot json\n')
+    tasks, malformed = collect_tasks(str(manifest))
+    assert tasks == [BatchTask('question_1', str(tmp_path / 'expenses.txt'), (2020,)),
+                     BatchTask('question_15', None, ([0, 3, 6], 2020))]
+    assert malformed == ['%s:4' % manifest, '%s:5' % manifest]
+
+
+def test_run_batch(tmp_path):
+    (tmp_path / 'bad.txt').write_text('x\n')
+    tasks = [BatchTask('question_1', './data/expense_report.txt', None),
+             BatchTask('question_1', str(tmp_path / 'bad.txt'), None),
+             BatchTask('question_1', str(tmp_path / 'missing.txt'), None),
+             BatchTask('question_15', None, ([0, 3, 6], 2020))]
+    for workers in (1, 2):
+        records = sorted(run_batch(tasks, workers), key=lambda x: x['task'])
+        assert [record['status'] for record in records] == ['ok', 'error', 'error', 'ok']
+        assert records[0]['result'] == 1016964 and records[3]['result'] == 436
+        assert records[2]['error'].startswith('FileNotFoundError')
+        assert all(record['wall_time'] >= 0 for record in records)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='Workers must inherit the patched solver')
+def test_run_batch_worker_crash(monkeypatch):
+    solver = challenge_solutions.question_15
+
+    def crashing_solver(starting, end_turn, *args):
+        if end_turn == 13:
+            os._exit(1)  # Worker process dies, breaking the pool
+        return solver(starting, end_turn, *args)
+
+    monkeypatch.setattr(challenge_solutions, 'question_15', crashing_solver)
+    pool_sizes = []
+
+    class CountedPool(batch_runner.ProcessPoolExecutor):
+        def __init__(self, max_workers, **kwargs):
+            pool_sizes.append(max_workers)
+            super().__init__(max_workers, **kwargs)
+
+    monkeypatch.setattr(batch_runner, 'ProcessPoolExecutor', CountedPool)
+    turns = [2020, 13, 10, 4, 5, 6] + list(range(20, 55))
+    tasks = [BatchTask('question_15', None, ([0, 3, 6], x)) for x in turns]
+    records = sorted(run_batch(tasks, 4), key=lambda x: x['task'])
+    assert [record['task'] for record in records] == list(range(len(tasks)))
+    assert [record['status'] for record in records] == ['ok', 'error'] + ['ok']*(len(tasks) - 2)
+    assert records[0]['result'] == 436 and records[2]['result'] == 0
+    assert records[1]['error'].startswith('BrokenProcessPool')
+    # The shared pool, the tasks that were running when it broke (at most one
+    # per worker) alone, and a new shared pool for the tasks left
+    assert pool_sizes[0] == 4 and pool_sizes[1] == 1
+    assert len(pool_sizes) <= 1 + 4 + 1
+
+
+def test_run_batch_subexpression_cache(tmp_path):
+    caches = parse_cache.PARSE_CACHE, expression_eval.SUBEXPRESSION_CACHE
+    tasks = [BatchTask(name, './data/expressions_list.txt', None)
+             for name in ('question_18', 'question_18_bonus')]*2
+    expected = [run_task(task)['result'] for task in tasks[:2]]*2
+    for workers in (1, 2):
+        records = sorted(run_batch(tasks, workers, subexpression_cache=64), key=lambda x: x['task'])
+        assert [record['result'] for record in records] == expected
+        stats = [record['subexpression_cache'] for record in records]
+        assert all(x['hits'] + x['misses'] == 971 for x in stats)
+    assert sum(x['hits'] for x in stats) > 0
+    assert 'subexpression_cache' not in list(run_batch(tasks[:1], 2))[0]
+
+    # Running in process does not leave the batch caches behind, even when
+    # the batch is abandoned
+    list(run_batch(tasks, 1, str(tmp_path), subexpression_cache=64))
+    assert (parse_cache.PARSE_CACHE, expression_eval.SUBEXPRESSION_CACHE) == caches
+    records = run_batch(tasks, 1, str(tmp_path), subexpression_cache=64)
+    next(records)
+    assert expression_eval.SUBEXPRESSION_CACHE is not caches[1]
+    records.close()
+    assert (parse_cache.PARSE_CACHE, expression_eval.SUBEXPRESSION_CACHE) == caches
+
+
+def test_batch_main(tmp_path, capsys):
+    input_dir = tmp_path / 'inputs'
+    input_dir.mkdir()
+    shutil.copy('./data/customs_questions.txt', str(input_dir / 'customs_questions_a.txt'))
+    shutil.copy('./data/adapter_list.txt', str(input_dir / 'adapter_list_a.txt'))
+    output = tmp_path / 'results.jsonl'
+    assert main(['batch', str(input_dir), '--workers', '2', '--output', str(output)]) == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(record['question'] for record in records) == [
+        'question_10', 'question_10_bonus', 'question_6', 'question_6_bonus']
+    assert '4 tasks, 4 ok, 0 failed' in capsys.readouterr().err
+
+    shutil.copy('./data/expressions_list.txt', str(input_dir / 'expressions_list_a.txt'))
+    assert main(['batch', str(input_dir), '--workers', '2', '--output', str(output),
+                 '--subexpression-cache', '256']) == 0
+    assert 'subexpression cache: ' in capsys.readouterr().err
+
+
+def test_write_jsonl(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    with open(str(path), 'w') as stream:
+        counts = write_jsonl([{'status': 'ok', 'result': {1, 2}}, {'status': 'error'}], stream)
+    assert counts == {'ok': 1, 'error': 1}
+    assert json.loads(path.read_text().splitlines()[0])['result'] == '{1, 2}'
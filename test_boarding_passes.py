@@ -0,0 +1,40 @@
+import pytest
+
+import boarding_passes
+import record_readers
+from boarding_passes import decode_seat_ids, find_missing_seat
+
+
+@pytest.mark.parametrize('window_size', [12, 30, 1 << 22])
+def test_decode_seat_ids(tmp_path, monkeypatch, window_size):
+    monkeypatch.setattr(record_readers, 'MAP_WINDOW_SIZE', window_size)
+    file_name = tmp_path / 'passes.txt'
+    file_name.write_text('FBFBBFFRLR\r\nBFFFBBFRRR\nFFFBBBFRRR\nBBFFBBFRLL\n')
+    seat_ids = [int(x) for x in decode_seat_ids(str(file_name))]
+    assert seat_ids == [357, 567, 119, 820]
+
+
+def test_decode_seat_ids_fallback(monkeypatch):
+    file_name = './data/boarding_sequences.txt'
+    seat_ids = [int(x) for x in decode_seat_ids(file_name)]
+    monkeypatch.setattr(boarding_passes, 'np', None)
+    assert decode_seat_ids(file_name) == seat_ids
+    assert find_missing_seat(seat_ids) == 696
+
+
+def test_find_missing_seat():
+    assert find_missing_seat([5, 3, 7, 2, 8, 4]) == 6
+    assert find_missing_seat([3, 4, 5]) is None
+
+
+def test_decode_seat_bytes_invalid():
+    np = pytest.importorskip('numpy')
+    with pytest.raises(ValueError):
+        boarding_passes.decode_seat_bytes(np.frombuffer(b'FBFB\n', dtype=np.uint8))
+
+
+def test_decode_seat_bytes_layouts():
+    np = pytest.importorskip('numpy')
+    for text in (b'BBFFBBFRLL', b'FBFBBFFRLR\nBBFFBBFRLL', b'FBFBBFFRLR\r\nBBFFBBFRLL\r\n'):
+        seat_ids = boarding_passes.decode_seat_bytes(np.frombuffer(text, dtype=np.uint8))
+        assert seat_ids.tolist()[-1] == 820
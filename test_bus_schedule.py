@@ -0,0 +1,20 @@
+from bus_schedule import (earliest_aligned_timestamp, earliest_aligned_timestamps, earliest_bus,
+                          parse_bus_ids)
+
+
+def test_earliest_bus():
+    bus_ids = [bus_id for _, bus_id in parse_bus_ids('7,13,x,x,59,x,31,19')]
+    assert earliest_bus(939, bus_ids) == (59, 5)
+    assert earliest_bus(940, [7, 10, 13]) == (10, 0)
+
+
+def test_earliest_aligned_timestamp():
+    assert earliest_aligned_timestamp(parse_bus_ids('7,13,x,x,59,x,31,19')) == 1068781
+    assert earliest_aligned_timestamps(['17,x,13,19', '67,7,59,61', '1789,37,47,1889']) == \
+        [3417, 754018, 1202161486]
+
+
+def test_earliest_aligned_timestamp_non_coprime():
+    # t = 0 (mod 4), t + 2 = 0 (mod 6)
+    assert earliest_aligned_timestamp([(0, 4), (2, 6)]) == 4
+    assert earliest_aligned_timestamp([(0, 4), (1, 6)]) is None
@@ -0,0 +1,40 @@
+import pytest
+
+import record_readers
+
+from customs_answers import answer_mask, group_counts, group_counts_mapped, popcount
+
+
+def test_answer_mask():
+    assert answer_mask('a') == 1
+    assert answer_mask('abz') == 1 | 2 | 1 << 25
+    assert popcount(answer_mask('abcabc')) == 3
+
+
+def test_group_counts(tmp_path):
+    file_name = tmp_path / 'customs.txt'
+    file_name.write_text('abc\n\na\nb\nc\n\nab\nac\n\n\na\na\na\na\n\nb\n')
+    assert list(group_counts(str(file_name))) == [(3, 3), (3, 0), (3, 1), (1, 1), (1, 1)]
+
+
+@pytest.mark.parametrize('window_size', [1, 5, 16, 1 << 22])
+def test_group_counts_mapped(tmp_path, monkeypatch, window_size):
+    # Small windows split groups between windows
+    monkeypatch.setattr(record_readers, 'MAP_WINDOW_SIZE', window_size)
+    file_name = tmp_path / 'customs.txt'
+    file_name.write_text('\nabc\r\n \r\na\nb\nc\n\nab\nac\n\n\na\na\na\na\n\nb')
+    expected = list(group_counts(str(file_name)))
+    assert expected == [(3, 3), (3, 0), (3, 1), (1, 1), (1, 1)]
+    assert group_counts_mapped(str(file_name)) == expected
+    assert group_counts_mapped('./data/customs_questions.txt') == list(group_counts('./data/customs_questions.txt'))
+
+    file_name.write_text('')
+    assert group_counts_mapped(str(file_name)) == []
+
+
+def test_group_counts_bytes():
+    np = pytest.importorskip('numpy')
+    from customs_answers import group_counts_bytes
+    anyone, everyone = group_counts_bytes(np.frombuffer(b'ab\nb\n\nxyz\n', dtype=np.uint8))
+    assert anyone.tolist() == [2, 3]
+    assert everyone.tolist() == [1, 3]
@@ -0,0 +1,69 @@
+import pytest
+
+from expression_eval import (ADDITION_FIRST, EQUAL_PRECEDENCE, SubexpressionCache, compile_expression, evaluate,
+                             sum_expressions, sum_expressions_file, tokenize)
+
+
+def test_tokenize():
+    assert tokenize('12 * (3+45)') == [12, '*', '(', 3, '+', 45, ')']
+    with pytest.raises(ValueError):
+        tokenize('1 - 2')
+
+
+def test_evaluate_equal_precedence():
+    assert evaluate('1 + 2 * 3 + 4 * 5 + 6') == 71
+    assert evaluate('1 + (2 * 3) + (4 * (5 + 6))') == 51
+    assert evaluate('((2 + 4 * 9) * (6 + 9 * 8 + 6) + 6) + 2 + 4 * 2') == 13632
+    assert evaluate('10 * (12 + 3)') == 150
+
+
+def test_evaluate_addition_first():
+    assert evaluate('1 + 2 * 3 + 4 * 5 + 6', ADDITION_FIRST) == 231
+    assert evaluate('5 * 9 * (7 * 3 * 3 + 9 * 3 + (8 + 6 * 4))', ADDITION_FIRST) == 669060
+    assert sum_expressions(['2 * 3 + (4 * 5)', '', '5 + (8 * 3 + 9 + 3 * 4 * 3)'],
+                           ADDITION_FIRST) == 46 + 1445
+
+
+def test_compile_unbalanced():
+    for expression in ('(1 + 2', '1 + 2)'):
+        with pytest.raises(ValueError):
+            compile_expression(expression)
+
+
+def test_evaluate_malformed():
+    for expression in ('1 +', '* 2', '1 2', '()', ''):
+        with pytest.raises(ValueError):
+            evaluate(expression)
+
+
+def test_sum_expressions_file_workers():
+    file_name = './data/expressions_list.txt'
+    serial = sum_expressions_file(file_name, ADDITION_FIRST)
+    assert sum_expressions_file(file_name, ADDITION_FIRST, workers=3) == serial
+
+
+def test_subexpression_cache():
+    cache = SubexpressionCache(maxsize=2)
+    assert cache.evaluate('1 + (2 * 3) + (4 * (5 + 6))') == 51
+    assert cache.stats()['misses'] == 3 and len(cache) == 2
+    assert cache.evaluate('(5+6) * 2') == 22  # Whitespace is not part of keys
+    assert cache.hits == 1
+    assert cache.evaluate('(5 + 6) * 2', ADDITION_FIRST) == 22  # Precedence is
+    assert cache.evaluate('(2 * 3)') == 6  # Least recently used, evicted
+    assert (cache.hits, cache.misses, len(cache)) == (1, 5, 2)
+    for expression in ('(1 + 2', '1 + 2)', '(1 +)', '2 * ()', '(1 2)', '((3) *)'):
+        with pytest.raises(ValueError):
+            cache.evaluate(expression)
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'size': 0, 'maxsize': 2}
+
+
+def test_sum_expressions_file_cache():
+    file_name = './data/expressions_list.txt'
+    cache = SubexpressionCache()
+    for precedence in (EQUAL_PRECEDENCE, ADDITION_FIRST):
+        expected = sum_expressions_file(file_name, precedence)
+        assert sum_expressions_file(file_name, precedence, cache=cache) == expected
+        assert sum_expressions_file(file_name, precedence, workers=2, cache=cache) == expected
+    stats = cache.stats()
+    assert stats['hits'] > 0 and stats['hits'] + stats['misses'] == 4*971
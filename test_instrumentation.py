@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+import instrumentation
+import parse_cache
+from challenge_solutions import question_4_bonus, question_15
+from instrumentation import instrumented, parse_phase
+from solver_cli import DEFAULT_INPUTS, list_solvers, main, resolve_solver, run_solver
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch):
+    """Instrumentation enabled with an empty registry and a cold parse cache"""
+
+    monkeypatch.setattr(parse_cache, 'PARSE_CACHE', parse_cache.ParseCache())
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_records_nothing():
+    instrumentation.reset()
+    assert not instrumentation.is_enabled()
+    assert question_15([0, 3, 6], 10) == 0
+    assert instrumentation.metrics() == {}
+
+
+def test_solver_metrics(metrics_enabled):
+    for _ in range(2):
+        assert question_4_bonus('./data/passport_data.txt') == 116
+    question_15([0, 3, 6], 10)
+    recorded = instrumentation.metrics()
+    assert recorded['question_4_bonus']['calls'] == 2
+    assert recorded['question_4_bonus']['records'] == 2*265
+    assert recorded['question_4_bonus']['parse_seconds'] > 0
+    assert recorded['question_15']['records'] == 0
+
+    @instrumented
+    def failing(file_name):
+        return parse_phase(lambda x: [1, 2, 3])(file_name) + 1
+
+    with pytest.raises(TypeError):
+        failing('x')
+    failing_metrics = instrumentation.metrics()['failing']
+    assert (failing_metrics['calls'], failing_metrics['errors'], failing_metrics['records']) == (1, 1, 3)
+
+
+def test_records_of_every_solver(metrics_enabled):
+    solvers = [name for name in list_solvers()
+               if DEFAULT_INPUTS.get(resolve_solver(name)[1], (None,))[0] is not None]
+    assert {'question_1', 'question_2', 'question_18', 'question_21'} <= set(solvers)
+    for name in solvers:
+        run_solver(name)
+    recorded = instrumentation.metrics()
+    assert {name: recorded[name]['records'] for name in solvers if recorded[name]['records'] <= 0} == {}
+    assert all(recorded[name]['parse_seconds'] > 0 for name in solvers if not name.endswith('_bonus'))
+
+
+def test_streamed_parse_phase(metrics_enabled):
+    @instrumented
+    def streaming(count):
+        return sum(parse_phase(lambda x: iter(range(x)))(count))
+
+    assert streaming(5) == 10
+    recorded = instrumentation.metrics()['streaming']
+    assert recorded['records'] == 5 and recorded['parse_seconds'] > 0
+
+    @instrumented
+    def pooled():
+        instrumentation.add_records(7)
+
+    pooled()
+    instrumentation.add_records(3)  # No running call, ignored
+    assert instrumentation.metrics()['pooled']['records'] == 7
+
+
+def test_allocations(metrics_enabled):
+    instrumentation.enable(trace_allocations=True)
+    question_15([0, 3, 6], 20000, 'dict')
+    assert instrumentation.metrics()['question_15']['peak_allocated_bytes'] > 0
+
+
+def test_export(metrics_enabled, tmp_path):
+    question_15([0, 3, 6], 10)
+    text = instrumentation.to_prometheus()
+    assert '# TYPE rwdi_solver_calls_total counter' in text
+    assert 'rwdi_solver_calls_total{solver="question_15"} 1' in text
+    instrumentation.write_metrics(str(tmp_path / 'metrics.json'))
+    assert json.loads((tmp_path / 'metrics.json').read_text())['question_15']['calls'] == 1
+
+
+def test_main_metrics(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(parse_cache, 'PARSE_CACHE', parse_cache.ParseCache())
+    metrics_file = tmp_path / 'solvers.prom'
+    try:
+        assert main(['run', '21', '--metrics', str(metrics_file)]) == 0
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    assert 'rwdi_solver_records_total{solver="question_21"}' in metrics_file.read_text()
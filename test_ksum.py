@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from ksum import PairSumAccumulator, k_sum, k_sum_numpy
+
+
+def test_k_sum_pair():
+    assert k_sum([1721, 979, 366, 299, 675, 1456], 2020, 2) == (1721, 299)
+    assert k_sum([1010, 5], 2020, 2) is None
+    assert sorted(k_sum([1010, 5, 1010], 2020, 2)) == [1010, 1010]
+
+
+def test_k_sum_triple_and_more():
+    values = [1721, 979, 366, 299, 675, 1456]
+    assert sorted(k_sum(values, 2020, 3)) == [366, 675, 979]
+    assert k_sum(values, 1, 3) is None
+    assert sum(k_sum(values, 979 + 366 + 299 + 675, 4)) == 2319
+
+
+def test_k_sum_numpy_matches_k_sum():
+    pytest.importorskip('numpy')
+    rng = random.Random(7)
+    for _ in range(50):
+        values = [rng.randint(0, 60) for _ in range(25)]
+        target = rng.randint(0, 150)
+        for k in (2, 3):
+            expected = k_sum(values, target, k)
+            found = k_sum_numpy(values, target, k)
+            assert (expected is None) == (found is None)
+            if found is not None:
+                assert sum(found) == target
+
+
+def test_pair_sum_accumulator():
+    accumulator = PairSumAccumulator(2020)
+    assert accumulator.extend([1721, 979, 366]) is None
+    assert accumulator.add(299) == (1721, 299)
+    assert accumulator.add(1654) is None  # Only the first pair is reported
+    assert accumulator.pair == (1721, 299) and accumulator.count == 5
+    assert PairSumAccumulator(2020).extend([1010, 5, 1010]) == (1010, 1010)
@@ -0,0 +1,68 @@
+import pytest
+
+import memory_game
+from memory_game import benchmark_backends, load_checkpoint, play_memory_game, save_checkpoint
+
+
+@pytest.mark.parametrize('backend', ['dict', 'array', 'numpy'])
+def test_play_memory_game(backend):
+    if backend == 'numpy':
+        pytest.importorskip('numpy')
+    assert play_memory_game([0, 3, 6], 4, backend) == 0
+    assert play_memory_game([0, 3, 6], 10, backend) == 0
+    assert play_memory_game([0, 3, 6], 2020, backend) == 436
+    assert play_memory_game([3, 1, 2], 2020, backend) == 1836
+    assert play_memory_game([1, 20, 11, 6, 12, 0], 2020, backend) == 1085
+    assert play_memory_game([0, 3, 6], 2, backend) == 3
+
+
+def test_play_memory_game_large_starting_numbers():
+    for seq in ([5000, 1, 5000], [7, 5000, 3, 5000], [1, 10**12]):
+        expected = play_memory_game(seq, 500, 'dict')
+        assert play_memory_game(seq, 500, 'array') == expected
+
+
+def test_benchmark_backends():
+    timings = benchmark_backends([0, 3, 6], 30000)
+    assert timings['dict'][0] == timings['array'][0]
+    with pytest.raises(ValueError):
+        play_memory_game([0, 3, 6], 10, 'list')
+
+
+@pytest.mark.parametrize('backend', ['array', 'numpy'])
+def test_checkpoint_resume(tmp_path, monkeypatch, backend):
+    if backend == 'numpy':
+        pytest.importorskip('numpy')
+    checkpoint_file = str(tmp_path / 'game.ckpt')
+    expected = play_memory_game([0, 3, 6], 30000, 'dict')
+    reports = []
+
+    def preempt(turn, end_turn, turns_per_second):
+        reports.append((turn, end_turn))
+        if turn >= 20000:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        play_memory_game([0, 3, 6], 30000, backend, checkpoint_file, checkpoint_every=7000,
+                         progress=preempt, progress_every=5000)
+    assert reports == [(5004, 30000), (10004, 30000), (15004, 30000), (20004, 30000)]
+    next_turn, _, last_seen = load_checkpoint(checkpoint_file, [0, 3, 6], 30000, backend)
+    assert next_turn == 20004 and len(last_seen) == 30000
+
+    # Resumed games continue from the checkpoint
+    monkeypatch.setattr(memory_game, '_start_game', None)
+    assert play_memory_game([0, 3, 6], 30000, backend, checkpoint_file) == expected
+    with pytest.raises(ValueError):
+        play_memory_game([0, 3, 7], 30000, backend, checkpoint_file)
+
+
+def test_checkpoint_errors(tmp_path):
+    checkpoint_file = str(tmp_path / 'game.ckpt')
+    assert load_checkpoint(checkpoint_file, [0, 3, 6], 100) is None
+    save_checkpoint(checkpoint_file, [0, 3, 6], 100, 4, 0, memory_game.allocate_turn_buffer(100))
+    with open(checkpoint_file, 'r+b') as f:
+        f.truncate(100)
+    with pytest.raises(ValueError):
+        load_checkpoint(checkpoint_file, [0, 3, 6], 100)
+    with pytest.raises(ValueError):
+        play_memory_game([0, 3, 6], 100, 'dict', checkpoint_file)
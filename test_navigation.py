@@ -0,0 +1,91 @@
+import pytest
+
+import navigation
+import record_readers
+from navigation import manhattan_distance, navigate, parse_instructions
+
+EXAMPLE = 'F10\nN3\nF7\nR90\nF11\n'
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_navigate(tmp_path, monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(navigation, 'np', None)
+    file_name = tmp_path / 'nav.txt'
+    file_name.write_text(EXAMPLE)
+    opcodes, arguments = parse_instructions(str(file_name))
+    assert list(arguments) == [10, 3, 7, 90, 11]
+    assert navigate(opcodes, arguments) == (17, -8)
+    assert manhattan_distance(navigate(opcodes, arguments, waypoint=True)) == 286
+
+
+def test_parse_instructions_windows(tmp_path, monkeypatch):
+    pytest.importorskip('numpy')
+    file_name = tmp_path / 'nav.txt'
+    file_name.write_text(EXAMPLE*50)
+    expected = parse_instructions(str(file_name))
+    monkeypatch.setattr(record_readers, 'MAP_WINDOW_SIZE', 7)
+    opcodes, arguments = parse_instructions(str(file_name))
+    assert opcodes.tolist() == expected[0].tolist() and arguments.tolist() == expected[1].tolist()
+    file_name.write_text('')
+    assert [x.size for x in parse_instructions(str(file_name))] == [0, 0]
+
+
+def test_vectorized_matches_loop():
+    np = pytest.importorskip('numpy')
+    rng = np.random.default_rng(12)
+    opcodes = rng.choice(np.frombuffer(b'NSEWLRF', dtype=np.uint8), 2000)
+    arguments = rng.integers(1, 100, 2000)
+    turns = (opcodes == ord('L')) | (opcodes == ord('R'))
+    arguments[turns] = rng.choice([90, 180, 270], turns.sum())
+    text_opcodes = opcodes.tobytes().decode()
+    for waypoint in (False, True):
+        assert navigate(opcodes, arguments, waypoint) == \
+            navigate(text_opcodes, arguments.tolist(), waypoint)
+
+
+def test_parse_instruction_bytes_errors():
+    np = pytest.importorskip('numpy')
+    for text in (b'F10\nR\n', b'F1x\n'):
+        with pytest.raises(ValueError):
+            navigation.parse_instruction_bytes(np.frombuffer(text, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        navigate('R', [45])
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_parse_instructions_grammar(tmp_path, monkeypatch, use_numpy):
+    # The byte parser and the text fallback accept the same lines
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(navigation, 'np', None)
+    file_name = tmp_path / 'navigation.txt'
+    file_name.write_text(' N3\nF10 \n \n\tR90\t\n')
+    opcodes, arguments = parse_instructions(str(file_name))
+    assert bytes(bytearray(opcodes)) == b'NFR' if use_numpy else opcodes == 'NFR'
+    assert list(arguments) == [3, 10, 90]
+    for text in ('F10\nFx\n', 'F10\nR\n', 'N 3\n', 'N+3\n', 'N1234567890123456789\n'):
+        file_name.write_text(text)
+        with pytest.raises(ValueError, match='integer argument'):
+            parse_instructions(str(file_name))
+
+
+def test_navigate_exact_large_coordinates():
+    # Waypoint coordinates far beyond 2**53 stay exact
+    opcodes, arguments = 'NFNF', [10**9, 10**9, 1, 3]
+    expected = (10*10**9 + 30, (10**9 + 1)*10**9 + (10**9 + 2)*3)
+    assert navigate(opcodes, arguments, waypoint=True) == expected
+    np = pytest.importorskip('numpy')
+    vector_opcodes = np.frombuffer(opcodes.encode(), dtype=np.uint8)
+    assert navigate(vector_opcodes, arguments, waypoint=True) == expected
+
+    # Beyond int64 the vectorized path falls back to the exact loop
+    opcodes, arguments = 'NF'*3, [10**9, 10**10]*3
+    expected = (3*10**11, 60000000030000000000)
+    assert navigate(opcodes, arguments, waypoint=True) == expected
+    vector_opcodes = np.frombuffer(opcodes.encode(), dtype=np.uint8)
+    assert navigate(vector_opcodes, np.array(arguments), waypoint=True) == expected
+    assert navigate(np.frombuffer(b'FFF', dtype=np.uint8), [9*10**17]*3) == (27*10**17, 0)
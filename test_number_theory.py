@@ -0,0 +1,35 @@
+import pytest
+
+from number_theory import BabyStepTable, crt, discrete_log, discrete_logs, mod_inverse, mod_pow
+
+
+def test_mod_inverse_and_pow():
+    assert mod_inverse(3, 11) == 4
+    assert mod_pow(3, -1, 11) == 4
+    assert mod_pow(7, 11, 20201227) == 17807724
+    with pytest.raises(ValueError):
+        mod_inverse(6, 9)
+
+
+def test_discrete_log():
+    assert discrete_log(7, 5764801, 20201227) == 8
+    assert discrete_log(7, 17807724, 20201227) == 11
+    assert discrete_log(7, 1, 20201227) == 0
+    assert discrete_logs(7, [5764801, 17807724], 20201227) == [8, 11]
+
+
+def test_baby_step_table_small_moduli():
+    for mod in (3, 5, 13, 101):
+        table = BabyStepTable(2, mod)
+        for x in range(mod):
+            y = pow(2, x, mod)
+            log = table.discrete_log(y)
+            assert log is not None and log <= x and pow(2, log, mod) == y
+    assert BabyStepTable(4, 13).discrete_log(2) is None
+
+
+def test_crt():
+    assert crt([2, 3, 2], [3, 5, 7]) == (23, 105)
+    assert crt([1, 3], [4, 6]) == (9, 12)
+    assert crt([1, 2], [4, 6]) is None
+    assert crt([], []) == (0, 1)
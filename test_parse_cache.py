@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from parse_cache import ParseCache, file_key
+
+
+def count_lines(file_name):
+    count_lines.calls += 1
+    with open(file_name) as f:
+        return len(f.readlines())
+
+
+def test_parse_cache_memory(tmp_path):
+    file_name = tmp_path / 'data.txt'
+    file_name.write_text('1\n2\n')
+    count_lines.calls = 0
+    cache = ParseCache(maxsize=1)
+    assert cache.get(count_lines, str(file_name)) == 2
+    assert cache.get(count_lines, str(file_name)) == 2
+    assert count_lines.calls == 1 and cache.hits == 1 and cache.misses == 1
+
+    # Modified file (size changes) is parsed again
+    file_name.write_text('1\n2\n3\n')
+    assert cache.get(count_lines, str(file_name)) == 3
+    assert count_lines.calls == 2
+
+
+def test_parse_cache_disk(tmp_path):
+    file_name = tmp_path / 'data.txt'
+    file_name.write_text('1\n2\n')
+    count_lines.calls = 0
+    disk_dir = str(tmp_path / 'cache')
+    assert ParseCache(disk_dir=disk_dir).get(count_lines, str(file_name)) == 2
+    cache = ParseCache(disk_dir=disk_dir)
+    assert cache.get(count_lines, str(file_name)) == 2
+    assert count_lines.calls == 1 and cache.disk_hits == 1
+    assert len(os.listdir(disk_dir)) == 1
+
+
+def test_file_key_hash(tmp_path):
+    first = tmp_path / 'first.txt'
+    second = tmp_path / 'second.txt'
+    first.write_text('abc')
+    second.write_text('abc')
+    assert file_key(str(first), use_hash=True) == file_key(str(second), use_hash=True)
+    assert file_key(str(first)) != file_key(str(second))
+
+
+def test_parse_cache_threads(tmp_path):
+    file_names = []
+    for i in range(8):
+        file_name = tmp_path / ('data_%d.txt' % i)
+        file_name.write_text('1\n'*(i + 1))
+        file_names.append(str(file_name))
+    count_lines.calls = 0
+    cache = ParseCache(maxsize=2)  # Constant evictions while threads read
+
+    def read_all(_):
+        return [cache.get(count_lines, file_name) for file_name in file_names*20]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for counts in executor.map(read_all, range(16)):
+            assert counts == list(range(1, 9))*20
+    assert cache.hits + cache.misses == 16*160 and len(cache._entries) == 2
@@ -0,0 +1,90 @@
+import pytest
+
+import passport_validation
+from passport_validation import PASSPORT_RULES, PassportStore, PassportValidator
+
+RECORDS = [
+    ['pid:087499704 hgt:74in ecl:grn iyr:2012 eyr:2030 byr:1980', 'hcl:#623a2f'],
+    ['eyr:2029 ecl:blu cid:129 byr:1989', 'iyr:2014 pid:896056539 hcl:#a97842 hgt:165cm'],
+    ['eyr:1972 cid:100', 'hcl:#18171d ecl:amb hgt:170 pid:186cm iyr:2018 byr:1926'],
+    ['hgt:59cm ecl:zzz', 'eyr:2038 hcl:74454a iyr:2023', 'pid:3556412378 byr:2007'],
+    ['ecl:grn byr:1950 xyz:1'],
+]
+
+
+def test_check_field():
+    validator = PassportValidator()
+    assert validator.check_field('byr', '2002')
+    assert not validator.check_field('byr', '2003')
+    assert validator.check_field('hgt', '60in')
+    assert validator.check_field('hgt', '190cm')
+    assert not validator.check_field('hgt', '190in')
+    assert not validator.check_field('hgt', '190')
+    assert validator.check_field('hcl', '#123abc')
+    assert not validator.check_field('hcl', '#123abz')
+    assert not validator.check_field('hcl', '123abc')
+    assert validator.check_field('ecl', 'brn')
+    assert not validator.check_field('ecl', 'wat')
+    assert validator.check_field('pid', '000000001')
+    assert not validator.check_field('pid', '0123456789')
+    assert not validator.check_field('cid', '100')
+    assert validator.check('byr', '2002') == 1 and validator.check('iyr', '2015') == 2
+    assert validator.check('byr', '2003') == 0 and validator.check('cid', '100') == 0
+
+
+def test_count_valid():
+    validator = PassportValidator()
+    assert [validator.is_valid(record) for record in RECORDS] == [True, True, False, False, False]
+    assert validator.count_valid(iter(RECORDS)) == 2
+
+
+def test_custom_rules():
+    rules = dict(PASSPORT_RULES)
+    rules['cid'] = (r'(\d+)', (100, 199))
+    validator = PassportValidator(rules, tuple(rules))
+    record = ['pid:087499704 hgt:74in ecl:grn iyr:2012 eyr:2030 byr:1980 hcl:#623a2f']
+    assert not validator.is_valid(record)
+    assert validator.is_valid(record + ['cid:150'])
+    with pytest.raises(ValueError):
+        PassportValidator(PASSPORT_RULES, ('byr', 'xyz'))
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_passport_store(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(passport_validation, 'np', None)
+    store = PassportStore(RECORDS)
+    assert len(store) == 5
+    assert store.count_present() == 4
+    assert store.count_present(('ecl', 'byr', 'cid')) == 2
+    assert store.column('cid') == [None, '129', '100', None, None]
+    assert store.count_by('ecl') == {'grn': 2, 'blu': 1, 'amb': 1, 'zzz': 1}
+    assert store.count_where('byr', lambda x: not 1920 <= int(x) <= 2002) == 1
+    validator = PassportValidator()
+    assert list(store.valid_masks(validator)) == [validator.field_mask(record) for record in RECORDS]
+    assert store.count_valid() == 2
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_passport_store_repeated_fields(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(passport_validation, 'np', None)
+    records = [[RECORDS[0][0] + ' byr:1900', RECORDS[0][1]],  # Later invalid value
+               ['byr:1900 ' + RECORDS[0][0], RECORDS[0][1]],  # Earlier invalid value
+               ['byr:1900 byr:3000', 'hgt:1in hgt:2in hgt:60in']]
+    store = PassportStore(records)
+    validator = PassportValidator()
+    assert store.column('byr') == ['1980', '1900', '1900']
+    assert store.repeated[(2, 'hgt')] == ['2in', '60in']
+    assert list(store.valid_masks(validator)) == [validator.field_mask(record) for record in records]
+    assert store.count_valid(validator) == validator.count_valid(records) == 2
+
+
+def test_passport_store_file():
+    store = PassportStore.from_file('./data/passport_data.txt')
+    assert store.count_present() == 200
+    assert store.count_valid() == 116
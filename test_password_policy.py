@@ -0,0 +1,53 @@
+import pytest
+
+import password_policy
+import record_readers
+from password_policy import (count_valid_passwords, count_valid_passwords_mapped, parse_password_file,
+                             parse_password_lines)
+
+
+def test_parse_password_lines():
+    columns = parse_password_lines(['1-3 a: abcde', '', '1-3 b: cdefg', '12-19 c: ccccccccc'])
+    assert columns.firsts == [1, 1, 12]
+    assert columns.seconds == [3, 3, 19]
+    assert columns.letters == ['a', 'b', 'c']
+    assert columns.passwords == ['abcde', 'cdefg', 'ccccccccc']
+    with pytest.raises(ValueError):
+        parse_password_lines(['1-3 a abcde'])
+
+
+def test_count_valid_passwords():
+    columns = parse_password_lines(['1-3 a: abcde', '1-3 b: cdefg', '2-9 c: ccccccccc', '1-20 c: xc'])
+    assert count_valid_passwords(columns) == (3, 1, 4)
+    assert count_valid_passwords(parse_password_file('./data/passwords_policy.txt')) == (643, 388, 1000)
+
+
+@pytest.mark.parametrize('window_size', [1, 20, 1 << 22])
+def test_count_valid_passwords_mapped(tmp_path, monkeypatch, window_size):
+    monkeypatch.setattr(record_readers, 'MAP_WINDOW_SIZE', window_size)
+    file_name = tmp_path / 'passwords.txt'
+    file_name.write_text('1-3 a: abcde\r\n\n1-3 b: cdefg\n2-9 c: ccccccccc\n1-20 c: xc\n3-4 a: a')
+    expected = count_valid_passwords(parse_password_file(str(file_name)))
+    assert expected == (3, 1, 5)
+    assert count_valid_passwords_mapped(str(file_name)) == expected
+    assert count_valid_passwords_mapped('./data/passwords_policy.txt') == (643, 388, 1000)
+
+    file_name.write_text('1-3 a abcde\n')
+    with pytest.raises(ValueError):
+        count_valid_passwords_mapped(str(file_name))
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_mapped_grammar(tmp_path, monkeypatch, use_numpy):
+    # The byte parser and the regex fallback accept the same lines
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(password_policy, 'np', None)
+    file_name = tmp_path / 'passwords.txt'
+    file_name.write_text(' 1-3 a: abc\n1-3 a:\n2-9 c:cc \t\n\t3-4 b: bbb')
+    assert count_valid_passwords_mapped(str(file_name)) == (3, 3, 4)
+    for line in ('1-3  a: x', '1-3 a:  x', '1-3 a: a b', '1-3 : x', '-3 a: x', '1-3a: x'):
+        file_name.write_text(line + '\n')
+        with pytest.raises(ValueError):
+            count_valid_passwords_mapped(str(file_name))
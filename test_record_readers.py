@@ -0,0 +1,70 @@
+import pytest
+
+from record_readers import (byte_range_chunks, line_bounds, map_line_windows, parse_uint_fields, read_ints, read_lines,
+                            read_lines_in_range, read_records)
+
+
+def test_read_lines(tmp_path):
+    file_name = tmp_path / 'lines.txt'
+    file_name.write_text('a b\n\nc\r\nd')
+    assert list(read_lines(str(file_name))) == ['a b', '', 'c', 'd']
+    assert list(read_lines(str(file_name), skip_blank=True)) == ['a b', 'c', 'd']
+
+
+def test_read_records(tmp_path):
+    file_name = tmp_path / 'records.txt'
+    file_name.write_text('\nabc\n\na\nb\n\n\nac\n')
+    records = list(read_records(str(file_name), buffer_size=4))
+    assert records == [['abc'], ['a', 'b'], ['ac']]
+
+
+def test_read_ints():
+    values = list(read_ints('./data/expense_report.txt'))
+    assert len(values) == 200
+    assert values[:3] == [1782, 1344, 1974]
+
+
+def test_byte_range_chunks():
+    file_name = './data/expressions_list.txt'
+    lines = list(read_lines(file_name))
+    for n_chunks in (1, 2, 7, 64):
+        chunks = byte_range_chunks(file_name, n_chunks)
+        assert len(chunks) <= n_chunks
+        chunk_lines = [line for start, end in chunks
+                       for line in read_lines_in_range(file_name, start, end)]
+        assert chunk_lines == lines
+
+
+def test_map_line_windows(tmp_path):
+    np = pytest.importorskip('numpy')
+    file_name = tmp_path / 'mapped.txt'
+    file_name.write_bytes(b'F10\r\n\nN3\nF1234567890\nE5')
+    for window_size in (1, 4, 8, 1 << 20):
+        windows = list(map_line_windows(str(file_name), bytes, window_size))
+        assert b''.join(windows) == file_name.read_bytes()
+        assert all(window.endswith(b'\n') for window in windows[:-1])
+    assert list(map_line_windows(str(file_name), bytes, 8)) == [b'F10\r\n\n', b'N3\n', b'F1234567890\n', b'E5']
+
+    data = np.frombuffer(file_name.read_bytes(), dtype=np.uint8)
+    starts, ends = line_bounds(data)
+    assert starts.tolist() == [0, 5, 6, 9, 21]
+    assert ends.tolist() == [3, 5, 8, 20, 23]
+    assert parse_uint_fields(data, np.array([1, 7]), np.array([3, 8])).tolist() == [10, 3]
+    with pytest.raises(ValueError):
+        parse_uint_fields(data, np.array([0]), np.array([3]))
+
+    def check(window):
+        raise IndexError('window too short')  # This frame references the window
+
+    def failing(window):
+        try:
+            check(window)
+        except IndexError:
+            raise ValueError('bad window')  # Only its __context__ has the frame of check
+
+    with pytest.raises(ValueError, match='bad window'):  # Not a BufferError of the map
+        list(map_line_windows(str(file_name), failing))
+
+    file_name.write_bytes(b'')
+    assert list(map_line_windows(str(file_name), bytes)) == []
+    assert [bounds.size for bounds in line_bounds(np.zeros(0, dtype=np.uint8))] == [0, 0]
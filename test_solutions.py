@@ -64,6 +64,13 @@ def test_question_6():
     assert sol == true_sol
 
 
+def test_question_6_bonus():
+    file_name = './data/customs_questions.txt'
+    true_sol = 3427
+    distr, sol = question_6_bonus(file_name)
+    assert sol == true_sol
+
+
 def test_question_10():
     file_name = './data/adapter_list.txt'
     true_sol = 2100
@@ -71,6 +78,13 @@ def test_question_10():
     assert sol == true_sol
 
 
+def test_question_10_bonus():
+    file_name = './data/adapter_list.txt'
+    true_sol = 16198260678656
+    sol = question_10_bonus(file_name)
+    assert sol == true_sol
+
+
 def test_question_15():
     seq = [1, 20, 11, 6, 12, 0]
     end_turn = 2020
@@ -87,12 +101,26 @@ def test_question_21():
     assert sol == true_sol
 
 
+def test_question_21_bonus():
+    file_name = './data/food_allergies.txt'
+    true_sol = 'xncgqbcp,frkmp,qhqs,qnhjhn,dhsnxr,rzrktx,ntflq,lgnhmx'
+    sol = question_21_bonus(file_name)
+    assert sol == true_sol
+
+
 def test_question_18():
     file_name = './data/expressions_list.txt'
     true_sol = 3885386961962
     sol = question_18(file_name)
     assert sol == true_sol
 
+
+def test_question_18_bonus():
+    file_name = './data/expressions_list.txt'
+    true_sol = 112899558798666
+    sol = question_18_bonus(file_name)
+    assert sol == true_sol
+
     
 def test_question_13():
     file_name = './data/bus_notes.txt'
@@ -101,6 +129,13 @@ def test_question_13():
     assert sol == true_sol
 
 
+def test_question_13_bonus():
+    file_name = './data/bus_notes.txt'
+    true_sol = 552612234243498
+    sol = question_13_bonus(file_name)
+    assert sol == true_sol
+
+
 def test_question_25():
     public_key_card = 10705932
     public_key_door = 12301431
@@ -114,3 +149,10 @@ def test_question_12():
     true_sol = 1710
     sol = question_12(file_name)
     assert sol == true_sol
+
+
+def test_question_12_bonus():
+    file_name = './data/navigation_instructions.txt'
+    true_sol = 62045
+    sol = question_12_bonus(file_name)
+    assert sol == true_sol
@@ -0,0 +1,41 @@
+import pytest
+
+import parse_cache
+
+from solver_cli import list_solvers, main, resolve_solver, run_solver
+
+
+def test_resolve_solver():
+    assert resolve_solver('4b') == ('question_4_bonus', '4')
+    assert resolve_solver('4_bonus') == ('question_4_bonus', '4')
+    assert resolve_solver('question_18') == ('question_18', '18')
+    with pytest.raises(ValueError):
+        resolve_solver('99')
+    assert list_solvers()[:3] == ['question_1', 'question_1_bonus', 'question_2']
+
+
+def test_run_solver():
+    report = run_solver('1b', trace_memory=True)
+    assert report['result'] == 182588480
+    assert report['wall_time'] >= 0 and report['peak_traced'] > 0
+    assert run_solver('15', args=([0, 3, 6], 2020))['result'] == 436
+
+
+def test_main(capsys, tmp_path):
+    profile_file = str(tmp_path / 'q4b.pstats')
+    assert main(['run', '4b', '--input', './data/passport_data.txt', '--profile',
+                 '--profile-output', profile_file, '--top', '3']) == 0
+    output = capsys.readouterr().out
+    assert 'result:      116' in output and 'function calls' in output
+    assert (tmp_path / 'q4b.pstats').exists()
+    assert main(['run', '25', '--input', 'x']) == 1
+
+
+def test_main_cache_dir(capsys, tmp_path, monkeypatch):
+    # Restore the shared parse cache after the test
+    monkeypatch.setattr(parse_cache, 'PARSE_CACHE', parse_cache.PARSE_CACHE)
+    cache_dir = tmp_path / 'cache'
+    for _ in range(2):
+        assert main(['run', '21b', '--cache-dir', str(cache_dir)]) == 0
+    assert 'xncgqbcp,frkmp' in capsys.readouterr().out
+    assert len(list(cache_dir.iterdir())) == 1
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+import challenge_solutions
+from solver_service import SolverClient, SolverError, SolverService
+
+
+@pytest.fixture(params=[0, 2], ids=['thread', 'processes'])
+def service_address(request):
+    """Address of a solver service running on a background event loop"""
+
+    loop = asyncio.new_event_loop()
+    service = SolverService(workers=request.param)
+    address = loop.run_until_complete(service.start(port=0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield address
+    asyncio.run_coroutine_threadsafe(service.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_solve(service_address):
+    host, port = service_address
+    with SolverClient(host, port, timeout=30) as client:
+        assert client.solve('4b', './data/passport_data.txt') == 116
+        assert client.solve('question_15', args=[[0, 3, 6], 2020]) == 436
+        assert 'question_25' in client.list_solvers()
+        with pytest.raises(SolverError):
+            client.solve('1', './data/missing.txt')
+        with pytest.raises(SolverError):
+            client.solve('99')
+        assert client.request({'op': 'nope'})['status'] == 'error'
+
+
+def test_coalesced_requests(service_address):
+    host, port = service_address
+    request = {'question': '15', 'args': [[0, 3, 6], 200000]}
+    with SolverClient(host, port, timeout=30) as client:
+        responses = client.request_many([request]*4 + [{'question': '15', 'args': [[0, 3, 6], 10]}])
+        assert [response['result'] for response in responses] == [56909]*4 + [0]
+        assert sum(response['coalesced'] for response in responses) == 3
+        stats = client.stats()
+    assert stats['requests'] == 5 and stats['computations'] == 2 and stats['in_flight'] == 0
+
+
+@pytest.mark.skipif(not hasattr(asyncio, 'start_unix_server'), reason='needs Unix sockets')
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / 'solver.sock')
+
+    async def run():
+        service = SolverService(workers=0)
+        await service.start(path=path)
+        loop = asyncio.get_running_loop()
+
+        def call():
+            with SolverClient(path=path, timeout=30) as client:
+                return client.solve('2', './data/passwords_policy.txt')
+
+        try:
+            return await loop.run_in_executor(None, call)
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == 643
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='Workers must inherit the patched solver')
+def test_worker_crash(monkeypatch):
+    solver = challenge_solutions.question_15
+
+    def crashing_solver(starting, end_turn, *args):
+        if end_turn == 13:
+            os._exit(1)  # Worker process dies, breaking the pool
+        return solver(starting, end_turn, *args)
+
+    monkeypatch.setattr(challenge_solutions, 'question_15', crashing_solver)
+
+    async def run():
+        service = SolverService(workers=1)
+        host, port = await service.start(port=0)
+        loop = asyncio.get_running_loop()
+
+        def call():
+            with SolverClient(host, port, timeout=30) as client:
+                with pytest.raises(SolverError, match='BrokenProcessPool'):
+                    client.solve('15', args=[[0, 3, 6], 13])
+                return client.solve('15', args=[[0, 3, 6], 2020])
+
+        try:
+            return await loop.run_in_executor(None, call)
+        finally:
+            await service.close()
+
+    assert asyncio.run(run()) == 436
+
+
+def test_serialized_writes():
+    class Writer:
+        """StreamWriter stand-in counting concurrent drain() calls, which
+        fail on Python 3.7 to 3.9 streams"""
+
+        def __init__(self):
+            self.lines = []
+            self.draining = False
+            self.overlaps = 0
+
+        def write(self, data):
+            self.lines.append(data)
+
+        async def drain(self):
+            self.overlaps += self.draining
+            self.draining = True
+            await asyncio.sleep(0.001)
+            self.draining = False
+
+        def close(self):
+            pass
+
+    async def run():
+        reader = asyncio.StreamReader()
+        for request_id in range(20):
+            reader.feed_data(b'{"op": "list", "id": %d}\n' % request_id)
+        reader.feed_eof()
+        writer = Writer()
+        await SolverService(workers=0)._handle_connection(reader, writer)
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.overlaps == 0
+    responses = [json.loads(line) for line in writer.lines]
+    assert sorted(response['id'] for response in responses) == list(range(20))
+    assert all(response['status'] == 'ok' for response in responses)
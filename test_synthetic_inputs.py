@@ -0,0 +1,22 @@
+import pytest
+
+import challenge_solutions
+from synthetic_inputs import GENERATORS
+
+
+@pytest.mark.parametrize('input_format', sorted(GENERATORS))
+def test_generated_answers(tmp_path, input_format):
+    file_name = str(tmp_path / (input_format + '.txt'))
+    answers = GENERATORS[input_format](file_name, 1000, seed=3)
+    for solver_name, (extra_args, expected) in answers.items():
+        solver = getattr(challenge_solutions, solver_name)
+        assert solver(file_name, *extra_args) == expected, solver_name
+
+
+def test_generators_are_deterministic(tmp_path):
+    for input_format, generator in GENERATORS.items():
+        first = tmp_path / 'first.txt'
+        second = tmp_path / 'second.txt'
+        generator(str(first), 50, seed=1)
+        generator(str(second), 50, seed=1)
+        assert first.read_text() == second.read_text(), input_format